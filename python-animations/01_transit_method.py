@@ -16,17 +16,19 @@ Physics:
 Usage:
   python 01_transit_method.py           # interactive window
   python 01_transit_method.py --save    # saves transit_method.gif
+  python 01_transit_method.py --save --format apng --jobs 4 --set R_PLANET=0.08
 """
 
-import sys
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import matplotlib.gridspec as gridspec
 from matplotlib.patches import Circle, FancyArrowPatch
 from matplotlib.lines import Line2D
 
-SAVE = "--save" in sys.argv
+import astroanim
+from astroanim.palette import (BG, STAR_COL, TEXT_COL, DIM_COL, ACCENT, GREEN,
+                               PURPLE, GRID_COL, SPINE_COL, BLUE)
+import transit_model
 
 # ── Physical parameters ─────────────────────────────────────────────────────
 R_STAR   = 1.0          # stellar radius (normalised)
@@ -38,7 +40,6 @@ U1, U2   = 0.40, 0.26  # quadratic limb darkening coefficients (solar-type)
 # Animation timing
 FPS       = 30
 DURATION  = 9.0         # seconds
-N_FRAMES  = int(FPS * DURATION)
 NOISE_PPM = 180         # photon noise level in parts per million
 
 # Transit timing (in animation seconds)
@@ -47,47 +48,12 @@ T_CONTACT2 = 2.5   # planet fully on stellar disk
 T_CONTACT3 = 6.5   # planet starts leaving
 T_CONTACT4 = 7.2   # planet fully off disk
 
-# ── Color palette ───────────────────────────────────────────────────────────
-BG         = '#070b12'
-STAR_COL   = '#fff8e0'
+astroanim.configure(globals())     # --fps, --set KEY=VALUE overrides
+N_FRAMES = int(FPS * DURATION)
+
+# ── Color palette (shared colours come from astroanim.palette) ──────────────
 PLANET_COL = '#2d5fa6'
-LC_COL     = '#58a6ff'
-TEXT_COL   = '#c9d1d9'
-DIM_COL    = '#484f58'
-ACCENT     = '#f0883e'
-GREEN      = '#3fb950'
-PURPLE     = '#bc8cff'
-GRID_COL   = '#161b22'
-
-# ── Helper: circular segment overlap (exact geometry) ───────────────────────
-def circle_overlap(d, r1, r2):
-    """Area of intersection of two circles with radii r1, r2 separated by d."""
-    if d >= r1 + r2:
-        return 0.0
-    if d + r2 <= r1:
-        return np.pi * r2 * r2
-    if d + r1 <= r2:
-        return np.pi * r1 * r1
-    cos_a = np.clip((r1**2 + d**2 - r2**2) / (2*r1*d + 1e-14), -1, 1)
-    cos_b = np.clip((r2**2 + d**2 - r1**2) / (2*r2*d + 1e-14), -1, 1)
-    a = np.arccos(cos_a)
-    b = np.arccos(cos_b)
-    return r1**2*(a - np.sin(a)*np.cos(a)) + r2**2*(b - np.sin(b)*np.cos(b))
-
-def transit_flux(px, py):
-    """Flux fraction during transit with limb darkening (numerical integration)."""
-    d = np.sqrt(px**2 + py**2)
-    overlap = circle_overlap(d, R_STAR, R_PLANET)
-    if overlap == 0:
-        return 1.0
-    # Weight blocked area by local intensity at planet centre position
-    r_centre = min(d, R_STAR - 1e-6) / R_STAR
-    mu = np.sqrt(max(0.0, 1.0 - r_centre**2))
-    local_I = 1.0 - U1*(1.0 - mu) - U2*(1.0 - mu)**2
-    # Normalisation (disk-integrated intensity)
-    I_total = 1.0 - U1/3.0 - U2/6.0
-    flux_drop = overlap / (np.pi * R_STAR**2) * local_I / I_total
-    return max(0.0, 1.0 - flux_drop)
+LC_COL     = BLUE
 
 # ── Pre-compute planet trajectory and flux ───────────────────────────────────
 TIMES = np.linspace(0, DURATION, N_FRAMES)
@@ -101,18 +67,15 @@ NOISE = rng.normal(0, NOISE_PPM * 1e-6, N_FRAMES)
 
 PX = X_START + (X_END - X_START) * TIMES / DURATION
 PY = np.full(N_FRAMES, IMPACT)
-FLUXES = np.array([transit_flux(px, py) for px, py in zip(PX, PY)]) + NOISE
+FLUXES = transit_model.transit_flux(np.hypot(PX, PY) / R_STAR, R_PLANET / R_STAR,
+                                    U1, U2) + NOISE
 
 DEPTH = R_PLANET**2  # theoretical depth (no LD)
 
 # ── Figure layout ────────────────────────────────────────────────────────────
-fig = plt.figure(figsize=(15, 8), facecolor=BG)
-fig.text(0.5, 0.965, 'Exoplanet Detection: The Transit Method',
-         ha='center', fontsize=17, color='white', fontweight='bold',
-         fontfamily='DejaVu Sans')
-fig.text(0.5, 0.935, 'A planet crossing its star blocks a tiny fraction of light — '
-         'creating a measurable dip in brightness',
-         ha='center', fontsize=10, color=DIM_COL)
+fig = astroanim.figure('Exoplanet Detection: The Transit Method',
+                       'A planet crossing its star blocks a tiny fraction of light — '
+                       'creating a measurable dip in brightness')
 
 gs = gridspec.GridSpec(2, 2, figure=fig,
                        height_ratios=[1.6, 1.2],
@@ -124,10 +87,7 @@ ax_disk = fig.add_subplot(gs[0, 0], facecolor=BG)  # stellar disk view
 ax_sys  = fig.add_subplot(gs[0, 1], facecolor=BG)  # system side view
 ax_lc   = fig.add_subplot(gs[1, :], facecolor=BG)  # light curve (full width)
 
-for ax in [ax_disk, ax_sys, ax_lc]:
-    ax.set_facecolor(BG)
-    for s in ax.spines.values():
-        s.set_color('#30363d')
+astroanim.style_axes(ax_disk, ax_sys, ax_lc)
 
 # ── Stellar disk panel ───────────────────────────────────────────────────────
 ax_disk.set_xlim(-1.8, 1.8)
@@ -136,19 +96,11 @@ ax_disk.set_aspect('equal')
 ax_disk.set_xticks([]); ax_disk.set_yticks([])
 ax_disk.set_title('Stellar Disk  (Observer View)', color=TEXT_COL, fontsize=10, pad=6)
 
-# Limb-darkened star using nested filled circles
-N_LD = 50
-for i in range(N_LD, 0, -1):
-    r = R_STAR * i / N_LD
-    mu = np.sqrt(1.0 - (r/R_STAR)**2)
-    brightness = 1.0 - U1*(1-mu) - U2*(1-mu)**2
-    brightness = max(0.05, brightness)
-    color_val = brightness * 0.98
-    c = Circle((0, 0), r, color=(min(1, color_val+0.02),
-                                  min(1, color_val*0.96),
-                                  min(1, color_val*0.78)),
-               zorder=2+i)
-    ax_disk.add_patch(c)
+# Limb-darkened star rendered once as an RGBA intensity image (same U1/U2
+# law as the light curve); the planet silhouette composites on top
+ax_disk.imshow(transit_model.disk_image(512, U1, U2),
+               extent=(-R_STAR, R_STAR, -R_STAR, R_STAR),
+               origin='lower', interpolation='bilinear', zorder=2)
 
 # Star edge glow
 star_edge = Circle((0, 0), R_STAR, fill=False,
@@ -223,7 +175,7 @@ ax_lc.set_xlim(0, 24)
 ax_lc.set_ylim(0.978, 1.0045)
 
 # Baseline reference line
-ax_lc.axhline(1.0, color='#30363d', linewidth=0.8, linestyle='--', zorder=2)
+ax_lc.axhline(1.0, color=SPINE_COL, linewidth=0.8, linestyle='--', zorder=2)
 ax_lc.text(0.5, 1.0015, 'Baseline (F = 1.000)', color=DIM_COL, fontsize=7.5,
            fontfamily='monospace')
 
@@ -296,6 +248,14 @@ def animate(frame):
     lc_line.set_data(T_HOURS[:frame+1], FLUXES[:frame+1])
     lc_point.set_data([t_h], [flux])
 
+    # Contact lines and annotations stay once their phase has been reached
+    for ln, t_c in zip(contact_lines, [T_CONTACT1, T_CONTACT2, T_CONTACT3, T_CONTACT4]):
+        ln.set_alpha(0.7 if t >= t_c else 0)
+    show_depth = t >= T_CONTACT2 and frame > N_FRAMES * 0.48
+    depth_ann.set_visible(show_depth)
+    depth_txt.set_visible(show_depth)
+    size_txt.set_visible(t >= T_CONTACT4)
+
     # ── Phase annotation ──
     if t < T_CONTACT1:
         phase_text.set_text('Pre-transit  ·  Baseline flux')
@@ -307,52 +267,37 @@ def animate(frame):
         phase_text.set_color(PURPLE)
         status_txt.set_text('Ingress detected  ↓')
         status_txt.set_color(PURPLE)
-        contact_lines[0].set_alpha(0.7)
     elif t < T_CONTACT3:
         pct = (1 - flux) * 100
         phase_text.set_text(f'Full transit  ·  ΔF = {pct:.2f}%  ·  Rp ≈ {R_PLANET:.2f} R★')
         phase_text.set_color(LC_COL)
         status_txt.set_text(f'Transit in progress  —  ΔF = {pct:.3f}%')
         status_txt.set_color(LC_COL)
-        contact_lines[1].set_alpha(0.7)
-        if frame > N_FRAMES * 0.48:
-            depth_ann.set_visible(True)
-            depth_txt.set_visible(True)
     elif t < T_CONTACT4:
         phase_text.set_text('Egress  ·  Planet leaving disk')
         phase_text.set_color(PURPLE)
         status_txt.set_text('Egress  ↑')
         status_txt.set_color(PURPLE)
-        contact_lines[2].set_alpha(0.7)
     else:
         phase_text.set_text('Post-transit  ·  Baseline restored')
         phase_text.set_color(GREEN)
         status_txt.set_text('Transit complete!  Planet confirmed candidate.')
         status_txt.set_color(GREEN)
-        contact_lines[3].set_alpha(0.7)
-        size_txt.set_visible(True)
 
     return (lc_line, lc_point, planet_disk, planet_sys, phase_text,
             depth_ann, depth_txt, size_txt, status_txt)
 
-ani = animation.FuncAnimation(fig, animate, frames=N_FRAMES,
-                               init_func=init, interval=1000/FPS, blit=False)
-
 # ── Legend ───────────────────────────────────────────────────────────────────
 legend_elements = [
     Line2D([0], [0], color=LC_COL, lw=2, label='Stellar flux'),
     Line2D([0], [0], color=PURPLE, lw=1, linestyle=':', label='Contact points'),
     Line2D([0], [0], color=ACCENT, lw=1.5, label='Transit depth ΔF = (Rp/R★)²'),
 ]
-ax_lc.legend(handles=legend_elements, loc='lower right',
-             facecolor=BG, edgecolor='#30363d',
-             labelcolor=TEXT_COL, fontsize=8)
+astroanim.legend(ax_lc, handles=legend_elements, loc='lower right')
 
 plt.tight_layout(rect=[0, 0, 1, 0.93])
 
-if SAVE:
-    print("Saving transit_method.gif …")
-    ani.save('transit_method.gif', writer='pillow', fps=FPS, dpi=100)
-    print("Saved.")
-else:
-    plt.show()
+scene = astroanim.Scene(fig, animate, N_FRAMES, fps=FPS, init=init, source=__file__)
+
+if __name__ == '__main__':
+    scene.run()
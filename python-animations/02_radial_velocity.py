@@ -10,42 +10,53 @@ Panels:
   Bottom   : Radial velocity curve with measurement scatter
 
 Physics:
-  - Star and planet orbit their common centre of mass
-  - Radial velocity: v_r(t) = K * sin(2π*t/P + φ)
+  - Star and planet orbit their common centre of mass on Keplerian
+    ellipses (Newton-iteration Kepler solver, see rv_model.py)
+  - Radial velocity: v_r(t) = K * [cos(ν(t) + ω) + e cos ω]
   - K (semi-amplitude) = 100 m/s  (typical hot Jupiter)
   - Δλ = λ₀ * v_r / c  (Doppler formula)
+  - Generalised Lomb–Scargle periodogram builds up as points arrive
 
 Usage:
   python 02_radial_velocity.py           # interactive window
   python 02_radial_velocity.py --save    # saves radial_velocity.gif
+  python 02_radial_velocity.py --ccf     # measure each RV point by cross-
+                                         # correlating a synthetic spectrum
+  python 02_radial_velocity.py --save --set ECC=0.5 --set K_AMPLITUDE=40
 """
 
-import sys
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import matplotlib.gridspec as gridspec
 from matplotlib.patches import Circle, FancyArrowPatch
 from matplotlib.lines import Line2D
-from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.colors import LinearSegmentedColormap, to_rgba
+from matplotlib.collections import PolyCollection
+from matplotlib.transforms import Affine2D
 
-SAVE = "--save" in sys.argv
+import astroanim
+from astroanim.palette import (BG, TEXT_COL, DIM_COL, STAR_COL, BLUE, RED,
+                               GRID_COL, ACCENT, SPINE_COL)
+import rv_model
+import rv_spectrum
+
+CCF = False     # --ccf: RVs measured by cross-correlating a synthetic spectrum
 
 # ── Physical parameters ─────────────────────────────────────────────────────
 K_AMPLITUDE  = 100.0    # RV semi-amplitude (m/s) — hot Jupiter
 ORBITAL_P    = 1.486    # orbital period (days) — KOI-17b
 M_STAR       = 1.0      # stellar mass (solar masses)
 M_PLANET     = 0.001    # planet/star mass ratio (MJ/MS ≈ 0.001)
+ECC          = 0.20     # orbital eccentricity
+OMEGA        = np.radians(60.0)   # argument of periastron (star's orbit)
 # Star wobble is exaggerated in the visual for clarity
 WOBBLE_SCALE = 15.0     # visual exaggeration factor
 
-# Orbital radii (normalised)
+# Orbital radius of the planet (normalised)
 ORB_R_PLANET = 3.5
-ORB_R_STAR   = ORB_R_PLANET * M_PLANET * WOBBLE_SCALE   # exaggerated
 
 FPS       = 30
 DURATION  = 10.0
-N_FRAMES  = int(FPS * DURATION)
 N_ORBITS  = 2.5         # number of complete orbits shown
 
 # Absorption lines to show in spectrum (wavelength in nm)
@@ -57,82 +68,91 @@ ABS_LINES = {
     'Hα':   656.3,
 }
 LAMBDA_MIN, LAMBDA_MAX = 460, 680   # nm range shown
+N_WEAK_LINES = 1000  # weak metal lines filling out a realistic stellar spectrum
 C_LIGHT = 3e8   # speed of light m/s
 
 NOISE_MS = 8.0  # RV measurement noise (m/s)
 
-# ── Color palette ───────────────────────────────────────────────────────────
-BG       = '#070b12'
-TEXT_COL = '#c9d1d9'
-DIM_COL  = '#484f58'
-STAR_COL = '#fff8e0'
-PLANET_C = '#4a90e2'
-RV_COL   = '#58a6ff'
-RED_SHIFT = '#ff6b6b'
+astroanim.configure(globals())     # --fps, --ccf, --set KEY=VALUE overrides
+N_FRAMES     = int(FPS * DURATION)
+ORB_R_STAR   = ORB_R_PLANET * M_PLANET * WOBBLE_SCALE   # exaggerated
+
+# ── Color palette (shared colours come from astroanim.palette) ──────────────
+PLANET_C   = '#4a90e2'
+RV_COL     = BLUE
+RED_SHIFT  = RED
 BLUE_SHIFT = '#6bb8ff'
-GRID_COL = '#161b22'
-GREEN    = '#3fb950'
-ACCENT   = '#f0883e'
 
 # ── Wavelength → RGB (approximate) ──────────────────────────────────────────
+# Piecewise-linear colour ramp as interpolation tables (knots in nm)
+RGB_KNOTS = np.array([380, 440, 490, 510, 580, 645, 780])
+RGB_TABLE = np.array([[0.5, 0.0, 0.0, 0.0, 1.0, 1.0, 1.0],    # R
+                      [0.0, 0.0, 1.0, 1.0, 1.0, 0.0, 0.0],    # G
+                      [1.0, 1.0, 1.0, 0.0, 0.0, 0.0, 0.0]])   # B
+
 def wavelength_to_rgb(wl_nm):
-    """Approximate visible wavelength to RGB."""
-    if wl_nm < 380: return (0.5, 0, 1.0)
-    if wl_nm < 440: t = (wl_nm-380)/60;  return (0.5*(1-t), 0, 1.0)
-    if wl_nm < 490: t = (wl_nm-440)/50;  return (0, t, 1.0)
-    if wl_nm < 510: t = (wl_nm-490)/20;  return (0, 1.0, 1-t)
-    if wl_nm < 580: t = (wl_nm-510)/70;  return (t, 1.0, 0)
-    if wl_nm < 645: t = (wl_nm-580)/65;  return (1.0, 1-t, 0)
-    if wl_nm < 780: t = (wl_nm-645)/135; return (1.0, 0, 0)
-    return (0.4, 0, 0)
+    """Approximate visible wavelength(s) to RGB; returns shape (..., 3)."""
+    wl = np.asarray(wl_nm, float)
+    rgb = np.stack([np.interp(wl, RGB_KNOTS, row) for row in RGB_TABLE], axis=-1)
+    return np.select([wl[..., None] >= 780], [np.array([0.4, 0.0, 0.0])], rgb)
 
 # Build spectrum image (static background)
-def build_spectrum_bg(width=500, height=60):
-    """Create rainbow spectrum background with absorption lines."""
-    img = np.zeros((height, width, 3))
+def build_spectrum_bg(width=2000, height=1):
+    """Create rainbow spectrum background (one array expression)."""
     wls = np.linspace(LAMBDA_MIN, LAMBDA_MAX, width)
-    for i, wl in enumerate(wls):
-        rgb = wavelength_to_rgb(wl)
-        # Vignette at edges for aesthetics
-        edge_fade = np.clip(min(i, width-i) / (width*0.08), 0, 1)
-        img[:, i, :] = [c * edge_fade * 0.85 for c in rgb]
-    return img, wls
+    i = np.arange(width)
+    # Vignette at edges for aesthetics
+    edge_fade = np.clip(np.minimum(i, width - i) / (width*0.08), 0, 1)
+    row = wavelength_to_rgb(wls) * (edge_fade * 0.85)[:, None]
+    return np.repeat(row[None, :, :], height, axis=0), wls
 
 # ── Pre-compute orbital dynamics ─────────────────────────────────────────────
 TIMES  = np.linspace(0, DURATION, N_FRAMES)
-PHASES = 2 * np.pi * N_ORBITS * TIMES / DURATION  # orbital phase (radians)
+T_DAYS = TIMES / DURATION * (N_ORBITS * ORBITAL_P)
+
+# Keplerian RV curve (approaching = negative, receding = positive convention)
+VR_TRUE  = rv_model.rv_curve(T_DAYS, ORBITAL_P, K_AMPLITUDE, ECC, OMEGA)  # m/s
+if CCF:
+    # Real measurement pipeline: 3000-line R = 60 000 spectrum observed at
+    # every epoch with photon noise, velocities recovered from the CCF peak
+    VR_MEAS = rv_spectrum.measure_rv_curve(VR_TRUE)
+else:
+    rng = np.random.default_rng(99)
+    VR_MEAS = VR_TRUE + rng.normal(0, NOISE_MS, N_FRAMES)  # with measurement noise
+
+# Star position angle θ = ν + ω about the CoM; +y points away from Earth,
+# so the star's y-velocity is exactly v_r.  The planet sits at θ + π.
+ORB_SEP, ORB_THETA = rv_model.orbit_position(T_DAYS, ORBITAL_P, ECC, OMEGA)
+M_SIN_I = rv_model.minimum_mass(ORBITAL_P, K_AMPLITUDE, ECC, M_STAR)
 
-# RV curve (sinusoidal, approaching = negative, receding = positive convention)
-VR_TRUE  = K_AMPLITUDE * np.sin(PHASES)  # m/s
-rng = np.random.default_rng(99)
-VR_MEAS  = VR_TRUE + rng.normal(0, NOISE_MS, N_FRAMES)  # with measurement noise
+# Periodogram of the measured points (every 4th frame is an observation)
+OBS_STEP = 4
+PG_F0, PG_DF = 0.1, 1.0 / (20 * T_DAYS[-1])     # cycles / day
+PG_N = int((3.0 - PG_F0) / PG_DF)
+PG_PERIODS = 1.0 / (PG_F0 + PG_DF * np.arange(PG_N))
 
 # Doppler shift: Δλ = λ₀ * v_r / c
 def doppler_shift(v_r_ms, lam0_nm):
     return lam0_nm + lam0_nm * v_r_ms / C_LIGHT
 
 # ── Figure layout ────────────────────────────────────────────────────────────
-fig = plt.figure(figsize=(15, 8), facecolor=BG)
-fig.text(0.5, 0.965, 'Exoplanet Detection: The Radial Velocity (Doppler) Method',
-         ha='center', fontsize=17, color='white', fontweight='bold')
-fig.text(0.5, 0.935, 'The planet\'s gravity makes the star wobble — shifting its '
-         'spectral lines blue or red as measured from Earth',
-         ha='center', fontsize=10, color=DIM_COL)
+fig = astroanim.figure('Exoplanet Detection: The Radial Velocity (Doppler) Method',
+                       'The planet\'s gravity makes the star wobble — shifting its '
+                       'spectral lines blue or red as measured from Earth')
 
 gs = gridspec.GridSpec(2, 2, figure=fig,
                        height_ratios=[1.5, 1.2],
                        width_ratios=[1, 1.1],
                        hspace=0.12, wspace=0.32,
                        left=0.06, right=0.97, top=0.90, bottom=0.09)
+gs_bottom = gs[1, :].subgridspec(1, 2, width_ratios=[2.4, 1], wspace=0.16)
 
 ax_orb  = fig.add_subplot(gs[0, 0], facecolor=BG)
 ax_spec = fig.add_subplot(gs[0, 1], facecolor=BG)
-ax_rv   = fig.add_subplot(gs[1, :], facecolor=BG)
+ax_rv   = fig.add_subplot(gs_bottom[0, 0], facecolor=BG)
+ax_pg   = fig.add_subplot(gs_bottom[0, 1], facecolor=BG)
 
-for ax in [ax_orb, ax_spec, ax_rv]:
-    ax.set_facecolor(BG)
-    for s in ax.spines.values():
-        s.set_color('#30363d')
+astroanim.style_axes(ax_orb, ax_spec, ax_rv, ax_pg)
 
 # ── Orbital view ─────────────────────────────────────────────────────────────
 ax_orb.set_xlim(-5.5, 5.5)
@@ -146,10 +166,12 @@ ax_orb.set_title('Top-down Orbital View  (star wobble ×15 exaggerated)',
 ax_orb.plot(0, 0, '+', color='#f0883e', markersize=10, markeredgewidth=1.5, zorder=5)
 ax_orb.text(0.15, 0.25, 'CoM', color=ACCENT, fontsize=8)
 
-# Orbit paths
-for r, col, lbl in [(ORB_R_PLANET, PLANET_C, ''), (ORB_R_STAR, '#aaaaaa', '')]:
-    theta = np.linspace(0, 2*np.pi, 300)
-    ax_orb.plot(r*np.cos(theta), r*np.sin(theta),
+# Orbit paths (Keplerian ellipses with the CoM at one focus)
+nu_path = np.linspace(0, 2*np.pi, 300)
+r_path = (1 - ECC**2) / (1 + ECC*np.cos(nu_path))
+for r, sign, col in [(ORB_R_PLANET, -1, PLANET_C), (ORB_R_STAR, 1, '#aaaaaa')]:
+    ax_orb.plot(sign*r*r_path*np.cos(nu_path + OMEGA),
+                sign*r*r_path*np.sin(nu_path + OMEGA),
                 color=col, linewidth=0.8, linestyle='--', alpha=0.4, zorder=1)
 
 # Observer direction
@@ -180,7 +202,7 @@ ax_spec.set_xticks([]); ax_spec.set_yticks([])
 ax_spec.set_title('Stellar Spectrum  ·  Na D doublet Doppler shift',
                   color=TEXT_COL, fontsize=9, pad=6)
 
-spec_img, wls = build_spectrum_bg(500, 60)
+spec_img, wls = build_spectrum_bg()
 spec_im = ax_spec.imshow(spec_img, extent=[LAMBDA_MIN, LAMBDA_MAX, 0, 1],
                           aspect='auto', origin='lower', zorder=2)
 
@@ -190,15 +212,33 @@ for name, lam in ABS_LINES.items():
         ax_spec.axvline(lam, color='white', linewidth=0.6,
                         linestyle='--', alpha=0.25, zorder=3)
 
-# Animated absorption lines (thick dark bands that shift)
-abs_patches = {}
-for name, lam in ABS_LINES.items():
-    if LAMBDA_MIN <= lam <= LAMBDA_MAX:
-        width = 1.5 if 'Na' in name else 2.5
-        patch = ax_spec.axvspan(lam - width/2, lam + width/2,
-                                 ymin=0, ymax=1,
-                                 color='#000010', alpha=0.92, zorder=5)
-        abs_patches[name] = (patch, lam, width)
+# Animated absorption lines: the named strong lines plus a forest of weak
+# metal lines, drawn as one PolyCollection of rest-frame bands.  A Doppler
+# shift maps every λ to λ · (1 + v_r/c), so each frame only rescales the
+# collection's wavelength axis — one affine update for all lines.
+strong_wl = np.array([lam for lam in ABS_LINES.values()
+                      if LAMBDA_MIN <= lam <= LAMBDA_MAX])
+strong_w  = np.array([1.5 if 'Na' in name else 2.5
+                      for name, lam in ABS_LINES.items()
+                      if LAMBDA_MIN <= lam <= LAMBDA_MAX])
+line_rng  = np.random.default_rng(5)
+weak_wl   = line_rng.uniform(LAMBDA_MIN, LAMBDA_MAX, N_WEAK_LINES)
+weak_w    = line_rng.uniform(0.03, 0.2, N_WEAK_LINES)
+weak_a    = 0.04 + 0.45 * line_rng.random(N_WEAK_LINES) ** 4   # mostly shallow
+
+LINE_WL   = np.concatenate([weak_wl, strong_wl])
+line_w    = np.concatenate([weak_w, strong_w])
+line_rgba = np.tile(to_rgba('#000010'), (len(LINE_WL), 1))
+line_rgba[:, 3] = np.concatenate([weak_a, np.full(len(strong_wl), 0.92)])
+
+lo, hi = LINE_WL - line_w/2, LINE_WL + line_w/2
+y0, y1 = np.zeros(len(LINE_WL)), np.ones(len(LINE_WL))
+band_verts = np.stack([np.column_stack([lo, y0]), np.column_stack([lo, y1]),
+                       np.column_stack([hi, y1]), np.column_stack([hi, y0])], axis=1)
+doppler_tf = Affine2D()
+abs_lines = PolyCollection(band_verts, facecolors=line_rgba, edgecolors='none',
+                           zorder=5, transform=doppler_tf + ax_spec.transData)
+ax_spec.add_collection(abs_lines, autolim=False)
 
 # Wavelength axis label
 ax_spec.set_xlabel('Wavelength (nm)', color=TEXT_COL, fontsize=9)
@@ -213,13 +253,13 @@ ax_spec.text(588.5, 0.85, 'Na D  (589 nm)', color='white',
 # Shift amount display
 shift_txt = ax_spec.text(0.98, 0.08, 'Δλ = 0.00 pm',
                           transform=ax_spec.transAxes, color=TEXT_COL,
-                          fontsize=9, ha='right', fontfamily='monospace')
+                          fontsize=9, ha='right', fontfamily='monospace', zorder=6)
 vr_txt = ax_spec.text(0.02, 0.08, 'v_r = 0 m/s',
                        transform=ax_spec.transAxes, color=TEXT_COL,
-                       fontsize=9, ha='left', fontfamily='monospace')
+                       fontsize=9, ha='left', fontfamily='monospace', zorder=6)
 direction_txt = ax_spec.text(0.5, 0.08, '●',
                               transform=ax_spec.transAxes, color=TEXT_COL,
-                              fontsize=18, ha='center')
+                              fontsize=18, ha='center', zorder=6)
 
 # ── RV panel ─────────────────────────────────────────────────────────────────
 ax_rv.set_title('Radial Velocity Curve', color=TEXT_COL, fontsize=10, pad=4)
@@ -228,10 +268,9 @@ ax_rv.set_ylabel('Radial Velocity (m/s)', color=TEXT_COL, fontsize=9)
 ax_rv.tick_params(colors=TEXT_COL, labelsize=8)
 ax_rv.grid(True, color=GRID_COL, linewidth=0.6, alpha=0.9)
 
-T_DAYS = TIMES / DURATION * (N_ORBITS * ORBITAL_P)
 ax_rv.set_xlim(0, T_DAYS[-1])
 ax_rv.set_ylim(-K_AMPLITUDE * 1.55, K_AMPLITUDE * 1.55)
-ax_rv.axhline(0, color='#30363d', linewidth=0.8, linestyle='--', zorder=2)
+ax_rv.axhline(0, color=SPINE_COL, linewidth=0.8, linestyle='--', zorder=2)
 
 # Zero-line label
 ax_rv.text(0.2, 8, '← receding from Earth', color=DIM_COL, fontsize=8)
@@ -247,10 +286,16 @@ ax_rv.text(T_DAYS[-1]*0.86, K_AMPLITUDE/2,
 
 # Planet mass hint text
 ax_rv.text(T_DAYS[-1]*0.5, -K_AMPLITUDE * 1.4,
-           f'Period P = {ORBITAL_P} d   |   K = {K_AMPLITUDE} m/s   '
-           f'→   Mp sin(i) ≈ {K_AMPLITUDE/28.4:.1f} MJ',
+           f'P = {ORBITAL_P} d   |   K = {K_AMPLITUDE:.0f} m/s   |   e = {ECC}   '
+           f'→   Mp sin(i) = {M_SIN_I:.2f} MJ',
            color=DIM_COL, fontsize=8, ha='center', fontfamily='monospace')
 
+ax_rv.text(0.02, 0.86,
+           'Points: CCF velocities from a synthetic R = 60 000 spectrum' if CCF
+           else f'Points: simulated measurements (σ = {NOISE_MS:.0f} m/s)',
+           transform=ax_rv.transAxes, color=DIM_COL, fontsize=7.5,
+           fontfamily='monospace')
+
 # Pre-draw full theoretical curve (faint)
 ax_rv.plot(T_DAYS, VR_TRUE, color=RV_COL, linewidth=1.0, alpha=0.15, zorder=3)
 
@@ -263,33 +308,45 @@ rv_label   = ax_rv.text(0.02, 0.93, 'Approaching  (blueshift)',
                          transform=ax_rv.transAxes, color=BLUE_SHIFT,
                          fontsize=9, fontfamily='monospace')
 
+# ── Periodogram panel ────────────────────────────────────────────────────────
+ax_pg.set_title('GLS Periodogram  (live)', color=TEXT_COL, fontsize=10, pad=4)
+ax_pg.set_xlabel('Period (days)', color=TEXT_COL, fontsize=9)
+ax_pg.set_ylabel('Power', color=TEXT_COL, fontsize=9)
+ax_pg.tick_params(colors=TEXT_COL, labelsize=8)
+ax_pg.grid(True, color=GRID_COL, linewidth=0.6, alpha=0.9)
+ax_pg.set_xscale('log')
+ax_pg.set_xlim(PG_PERIODS.min(), PG_PERIODS.max())
+ax_pg.set_ylim(0, 1.05)
+ax_pg.axvline(ORBITAL_P, color=ACCENT, linewidth=0.8, linestyle=':', alpha=0.7)
+pg_line, = ax_pg.plot([], [], color=RV_COL, linewidth=1.4, zorder=5)
+pg_peak  = ax_pg.text(0.97, 0.92, '', transform=ax_pg.transAxes, color=ACCENT,
+                       fontsize=8, ha='right', fontfamily='monospace')
+
 # ── Animation ────────────────────────────────────────────────────────────────
 def init():
     rv_line.set_data([], [])
     rv_points.set_data([], [])
     rv_dot.set_data([], [])
-    return rv_line, rv_points, rv_dot
+    pg_line.set_data([], [])
+    return rv_line, rv_points, rv_dot, pg_line
 
 def animate(frame):
     t    = TIMES[frame]
-    phi  = PHASES[frame]
     vr   = VR_TRUE[frame]
     t_d  = T_DAYS[frame]
 
     # ── Orbital positions ──
-    p_angle = phi
-    planet_orb.center = (ORB_R_PLANET * np.cos(p_angle),
-                          ORB_R_PLANET * np.sin(p_angle))
+    sep, s_angle = ORB_SEP[frame], ORB_THETA[frame]
+    planet_orb.center = (-ORB_R_PLANET * sep * np.cos(s_angle),
+                          -ORB_R_PLANET * sep * np.sin(s_angle))
     # Star wobbles around CoM (opposite to planet, tiny but exaggerated)
-    s_angle = phi + np.pi
-    sx = ORB_R_STAR * np.cos(s_angle)
-    sy = ORB_R_STAR * np.sin(s_angle)
+    sx = ORB_R_STAR * sep * np.cos(s_angle)
+    sy = ORB_R_STAR * sep * np.sin(s_angle)
     star_orb.center = (sx, sy)
 
-    # Velocity arrow on star (along y = towards/away from observer at bottom)
-    # Component towards observer (downward in plot = towards Earth)
-    v_y_component = -np.sin(p_angle)  # towards Earth = when planet moves past us
-    arrow_len = v_y_component * 2.0
+    # Velocity arrow on star: +y is away from Earth (receding), so the
+    # arrow is simply the radial velocity scaled to the panel
+    arrow_len = 2.0 * vr / K_AMPLITUDE
     rv_arrow_ax.set_position((sx, sy))
     rv_arrow_ax.xy = (sx, sy + arrow_len)
     rv_arrow_ax.xytext = (sx, sy)
@@ -299,31 +356,12 @@ def animate(frame):
     rv_label_ax.set_color(col)
     rv_label_ax.set_text(f'{vr:+.0f} m/s')
 
-    # ── Spectrum Doppler shift ──
-    delta_lam_pm = {}
-    for name, (patch, lam0, width) in abs_patches.items():
-        new_lam = doppler_shift(vr, lam0)  # shifted wavelength
-        dl = (new_lam - lam0) * 1000  # nm → pm
-        delta_lam_pm[name] = dl
-        # Update patch position (remove and redraw via set_xy)
-        verts = patch.get_xy()
-        shift = new_lam - lam0
-        verts[:, 0] += 0   # we'll use a simpler approach:
-        # set x data of the patch
-        xy = patch.get_xy()
-        mid = (xy[0, 0] + xy[2, 0]) / 2
-        w = xy[2, 0] - xy[0, 0]
-        new_left = new_lam - lam0 + xy[0, 0] - mid + lam0 - w/2
-        patch.set_xy(np.array([
-            [new_lam - w/2, 0],
-            [new_lam - w/2, 1],
-            [new_lam + w/2, 1],
-            [new_lam + w/2, 0],
-            [new_lam - w/2, 0],
-        ]))
+    # ── Spectrum Doppler shift (one transform update for every line) ──
+    doppler_tf.clear().scale(1.0 + vr / C_LIGHT, 1.0)
+    abs_lines.stale = True
 
     # Shift display
-    na_dl = delta_lam_pm.get('Na D₁', 0)
+    na_dl = (doppler_shift(vr, ABS_LINES['Na D₁']) - ABS_LINES['Na D₁']) * 1000  # nm → pm
     shift_txt.set_text(f'Δλ(Na D) = {na_dl:+.3f} pm')
     vr_txt.set_text(f'v_r = {vr:+.1f} m/s')
     if abs(vr) < 5:
@@ -344,14 +382,23 @@ def animate(frame):
 
     # ── RV curve ──
     rv_line.set_data(T_DAYS[:frame+1], VR_TRUE[:frame+1])
-    rv_points.set_data(T_DAYS[:frame+1:4], VR_MEAS[:frame+1:4])  # sparse points
+    rv_points.set_data(T_DAYS[:frame+1:OBS_STEP], VR_MEAS[:frame+1:OBS_STEP])
     rv_dot.set_data([t_d], [vr])
 
-    return (rv_line, rv_points, rv_dot, planet_orb, star_orb,
-            shift_txt, vr_txt, direction_txt, rv_label)
+    # ── Periodogram of the observations so far ──
+    t_obs = T_DAYS[:frame+1:OBS_STEP]
+    if len(t_obs) >= 5:
+        _, power = rv_model.gls_periodogram(t_obs, VR_MEAS[:frame+1:OBS_STEP],
+                                            np.full(len(t_obs), NOISE_MS),
+                                            PG_F0, PG_DF, PG_N)
+        pg_line.set_data(PG_PERIODS, power)
+        pg_peak.set_text(f'{len(t_obs)} obs · peak P = {PG_PERIODS[power.argmax()]:.2f} d')
+    else:
+        pg_line.set_data([], [])
+        pg_peak.set_text(f'{len(t_obs)} obs')
 
-ani = animation.FuncAnimation(fig, animate, frames=N_FRAMES,
-                               init_func=init, interval=1000/FPS, blit=False)
+    return (rv_line, rv_points, rv_dot, planet_orb, star_orb, abs_lines,
+            shift_txt, vr_txt, direction_txt, rv_label, pg_line, pg_peak)
 
 legend_elements = [
     Line2D([0], [0], color=RV_COL, lw=2, label=f'RV curve  K = {K_AMPLITUDE} m/s'),
@@ -360,15 +407,12 @@ legend_elements = [
     Line2D([0], [0], color=RED_SHIFT, lw=0, marker='o', markersize=5,
            label='Redshift  (star receding)'),
 ]
-ax_rv.legend(handles=legend_elements, loc='upper right',
-             facecolor=BG, edgecolor='#30363d',
-             labelcolor=TEXT_COL, fontsize=8)
+astroanim.legend(ax_rv, handles=legend_elements, loc='upper right')
 
 plt.tight_layout(rect=[0, 0, 1, 0.93])
 
-if SAVE:
-    print("Saving radial_velocity.gif …")
-    ani.save('radial_velocity.gif', writer='pillow', fps=FPS, dpi=100)
-    print("Saved.")
-else:
-    plt.show()
+scene = astroanim.Scene(fig, animate, N_FRAMES, fps=FPS, init=init, source=__file__)
+
+if __name__ == '__main__':
+    scene.run()
+
@@ -7,7 +7,8 @@ and how coronagraphs + infrared observation reveal the planet.
 Panels:
   Panel 1 (left)  : Raw optical image — star saturates, planet invisible
   Panel 2 (centre): Coronagraph applied — star blocked, planet revealed
-  Panel 3 (right) : Contrast curve — planet brightness vs angular separation
+  Panel 3 (right) : Contrast curve — 5σ detection limits measured live on
+                    panels 1 and 2, and on a simulated ADI sequence
 
 Animation stages:
   0–3s  : Raw image with star glare obscuring planet
@@ -19,22 +20,30 @@ Physics:
   - Star is ~10⁹ brighter than planet in optical; ~10⁶ in mid-infrared
   - Planet position traces an elliptical orbit over time
   - Angular separation ~ arcseconds (nearby stars / long-period planets)
+  - Detection limits come from `adi.py`: a rotating-field image cube is
+    PCA/KLIP-subtracted, derotated and median-combined at startup
 
 Usage:
   python 03_direct_imaging.py           # interactive window
   python 03_direct_imaging.py --save    # saves direct_imaging.gif
+  python 03_direct_imaging.py --save --jobs 4 --set PLANET_DMAG=18
 """
 
-import sys
+from functools import lru_cache
+
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import matplotlib.gridspec as gridspec
 from matplotlib.patches import Circle, FancyArrowPatch, Ellipse, Wedge
 from matplotlib.lines import Line2D
 from matplotlib.colors import LogNorm
 
-SAVE = "--save" in sys.argv
+import astroanim
+from astroanim.palette import (BG, TEXT_COL, DIM_COL, GREEN, ACCENT, BLUE,
+                               PURPLE, GRID_COL, SPINE_COL)
+import psf
+import adi
+import radial_profile
 
 # ── Physical parameters ─────────────────────────────────────────────────────
 STAR_FLUX     = 1.0e9      # star: 10⁹ (arbitrary units)
@@ -43,6 +52,7 @@ PLANET_FLUX_IR = 1.0e3     # planet in infrared: 10⁶ contrast → 10³ for vis
 
 PLANET_SEP    = 0.55       # angular separation (arcsec) — like beta Pic b
 PLANET_SEP_AU = 10.0       # actual separation in AU for labels
+PLANET_DMAG   = 15.8       # planet/star contrast in the ADI band (Δmag)
 
 ORB_A = 1.6    # orbit semi-major axis in "image units"
 ORB_B = 1.1    # orbit semi-minor axis (inclined orbit)
@@ -50,46 +60,33 @@ ORB_PA = 30    # position angle of orbit (degrees)
 
 FPS       = 30
 DURATION  = 12.0
-N_FRAMES  = int(FPS * DURATION)
-IMG_SIZE  = 200            # pixels per panel image
+IMG_SIZE  = 1024           # pixels per panel image
+
+ADI_FRAMES    = 40         # frames in the simulated ADI sequence
+ADI_ROTATION  = 40.0       # field rotation across the sequence (degrees)
 
 # Timing
 T_CORONAGRAPH = 3.0   # coronagraph applied at t=3s
 T_PLANET_VIS  = 5.5   # planet visible at t=5.5s
 T_ORBIT_START = 8.0   # orbit trace starts at t=8s
 
-# ── Color palette ───────────────────────────────────────────────────────────
-BG       = '#070b12'
-TEXT_COL = '#c9d1d9'
-DIM_COL  = '#484f58'
-GREEN    = '#3fb950'
-ACCENT   = '#f0883e'
-BLUE     = '#58a6ff'
-PURPLE   = '#bc8cff'
-GRID_COL = '#161b22'
+astroanim.configure(globals())     # --fps, --set KEY=VALUE overrides
+N_FRAMES  = int(FPS * DURATION)
+PIX       = IMG_SIZE / 200 # pixel scale relative to the original 200 px layout
+
+ARCSEC_PER_PIX = 2.0 / (IMG_SIZE / 2)  # display scale: panel edge ≈ 2"
+CURVE_STEP    = 4 * PIX    # annulus spacing for the live contrast curves (pixels)
+
+# ── Color palette (shared colours come from astroanim.palette) ──────────────
 PLANET_C = '#e8a030'   # warm orange — infrared planet colour
 
-# ── Build point-spread function (simulated telescope image) ─────────────────
-def gaussian_psf(size, sigma, amplitude=1.0, cx=None, cy=None):
-    """2D Gaussian PSF."""
-    if cx is None: cx = size // 2
-    if cy is None: cy = size // 2
-    y, x = np.mgrid[0:size, 0:size]
-    r2 = (x - cx)**2 + (y - cy)**2
-    return amplitude * np.exp(-r2 / (2 * sigma**2))
-
-def airy_psf(size, sigma, amplitude=1.0, cx=None, cy=None):
-    """Airy-disk-like PSF (more realistic telescope diffraction)."""
-    if cx is None: cx = size // 2
-    if cy is None: cy = size // 2
-    y, x = np.mgrid[0:size, 0:size]
-    r = np.sqrt((x - cx)**2 + (y - cy)**2)
-    r_scaled = r / sigma
-    # Approximate Airy function with Gaussian + Bessel-like rings
-    core = np.exp(-r_scaled**2 / 2)
-    rings = 0.05 * np.exp(-(r_scaled - 3.5)**2 / 0.8) + \
-            0.02 * np.exp(-(r_scaled - 6.0)**2 / 0.8)
-    return amplitude * (core + rings)
+# ── Point-spread functions (simulated telescope image) ──────────────────────
+# Star: true Airy pattern, rendered over the full frame once.
+# Planet: precomputed sub-pixel Gaussian stamps placed into a small window.
+STAR_AIRY_R0  = 33 * PIX     # first dark ring radius (pixels)
+PLANET_SIGMA  = 6 * PIX      # planet PSF width (pixels)
+PLANET_STAMP  = psf.PSFStamp(psf.gaussian_profile(PLANET_SIGMA),
+                             radius=int(np.ceil(4 * PLANET_SIGMA)), oversample=4)
 
 # Planet position on orbit (animated)
 def planet_pos(t):
@@ -103,26 +100,23 @@ def planet_pos(t):
     py = x_orb * np.sin(pa_rad) + y_orb * np.cos(pa_rad)
     return px, py
 
-def pos_to_pixel(px, py, size=IMG_SIZE, scale=60.0):
-    """Convert orbital coordinates to pixel coordinates."""
+def pos_to_pixel(px, py, size=IMG_SIZE, scale=60.0 * PIX):
+    """Convert orbital coordinates to (sub-)pixel coordinates."""
     cx = size // 2 + px * scale
     cy = size // 2 - py * scale  # y flipped (image convention)
-    return int(cx), int(cy)
+    return cx, cy
 
 # Pre-compute static PSF images
-STAR_PSF_RAW = airy_psf(IMG_SIZE, sigma=12, amplitude=STAR_FLUX)
+STAR_PSF_RAW = psf.render_profile((IMG_SIZE, IMG_SIZE), psf.airy_profile(STAR_AIRY_R0),
+                                  IMG_SIZE // 2, IMG_SIZE // 2, amplitude=STAR_FLUX)
 SPECKLE_NOISE = np.random.default_rng(7).exponential(0.008, (IMG_SIZE, IMG_SIZE)) * STAR_FLUX * 0.001
 
 rng2 = np.random.default_rng(42)
 
 # ── Figure setup ─────────────────────────────────────────────────────────────
-fig = plt.figure(figsize=(15, 8), facecolor=BG)
-fig.text(0.5, 0.965, 'Exoplanet Detection: Direct Imaging',
-         ha='center', fontsize=17, color='white', fontweight='bold')
-fig.text(0.5, 0.935,
-         'The star is ~10⁹× brighter than its planet in visible light — '
-         'a coronagraph blocks the star to reveal the planet',
-         ha='center', fontsize=10, color=DIM_COL)
+fig = astroanim.figure('Exoplanet Detection: Direct Imaging',
+                       'The star is ~10⁹× brighter than its planet in visible light — '
+                       'a coronagraph blocks the star to reveal the planet')
 
 gs = gridspec.GridSpec(1, 3, figure=fig,
                        wspace=0.28,
@@ -132,10 +126,7 @@ ax_raw  = fig.add_subplot(gs[0, 0], facecolor=BG)
 ax_cor  = fig.add_subplot(gs[0, 1], facecolor=BG)
 ax_con  = fig.add_subplot(gs[0, 2], facecolor=BG)
 
-for ax in [ax_raw, ax_cor, ax_con]:
-    ax.set_facecolor(BG)
-    for s in ax.spines.values():
-        s.set_color('#30363d')
+astroanim.style_axes(ax_raw, ax_cor, ax_con)
 
 # ── Raw image panel ───────────────────────────────────────────────────────────
 ax_raw.set_xticks([]); ax_raw.set_yticks([])
@@ -182,10 +173,12 @@ occulter = Circle((0, 0), 0.0, facecolor='#111111',
                    edgecolor='#333333', linewidth=2, zorder=10)
 ax_cor.add_patch(occulter)
 
-# Planet blob in coronagraph image (will animate in)
+# Planet blob in coronagraph image (will animate in); the stamp canvas is
+# preallocated and only the planet's window is rewritten each frame
+planet_canvas = psf.StampCanvas((IMG_SIZE, IMG_SIZE))
 planet_cor_img = ax_cor.imshow(
-    np.zeros((IMG_SIZE, IMG_SIZE)), cmap='inferno', origin='lower',
-    norm=LogNorm(vmin=0.1, vmax=PLANET_FLUX_IR * 1.5),
+    planet_canvas.data, cmap=plt.get_cmap('inferno').with_extremes(under='none'),
+    origin='lower', norm=LogNorm(vmin=0.1, vmax=PLANET_FLUX_IR * 1.5),
     extent=[-1, 1, -1, 1], alpha=0)
 
 planet_cor_label = ax_cor.text(0, 0, '', color=PLANET_C,
@@ -207,28 +200,50 @@ ax_con.set_ylabel('Contrast  (Δ magnitudes)', color=TEXT_COL, fontsize=9)
 ax_con.tick_params(colors=TEXT_COL, labelsize=8)
 ax_con.grid(True, color=GRID_COL, linewidth=0.6, alpha=0.9)
 
-# Typical JWST/GPI contrast curve
-sep_arr = np.linspace(0.1, 2.0, 200)
-contrast_optical = 8 - 3.5 * np.log10(sep_arr / 0.1)  # magnitude contrast
-contrast_ir      = 12 - 3.0 * np.log10(sep_arr / 0.1)
-
-ax_con.plot(sep_arr, contrast_optical, color=BLUE, linewidth=2,
-            label='Optical (SPHERE/GPI)', zorder=5)
-ax_con.plot(sep_arr, contrast_ir, color=ACCENT, linewidth=2,
-            linestyle='--', label='Mid-IR (JWST MIRI)', zorder=5)
-
-ax_con.axhline(15, color='#30363d', linewidth=0.8, linestyle=':')
-ax_con.axhline(20, color='#30363d', linewidth=0.8, linestyle=':')
+def panel_contrast(image, mask=None):
+    """5σ annular detection limit (Δmag below the unocculted star) of a panel image."""
+    prof = radial_profile.radial_profile(image, step=CURVE_STEP,
+                                         width=2 * CURVE_STEP, mask=mask)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return prof.radius * ARCSEC_PER_PIX, -2.5 * np.log10(5 * prof.std / STAR_FLUX)
+
+# Panel ① is static.  Panel ②'s speckle residual is static too; only the
+# occulter grows, so its curve is measured once per occulter radius
+# (whole pixels) outside the occulter and reused by every later frame.
+_yy, _xx = np.ogrid[0:IMG_SIZE, 0:IMG_SIZE]
+PANEL_R = np.hypot(_xx - IMG_SIZE // 2, _yy - IMG_SIZE // 2)
+
+@lru_cache(maxsize=None)
+def occulted_contrast(radius_px):
+    """Contrast curve of the speckle residual outside an occulter of `radius_px`."""
+    return panel_contrast(residual, PANEL_R > radius_px)
+
+raw_curve, = ax_con.plot(*panel_contrast(raw_img_data), color=BLUE, linewidth=2,
+                         label='① Raw image', zorder=5)
+cor_curve, = ax_con.plot([], [], color=PURPLE, linewidth=2,
+                         label='② Coronagraph + IR', zorder=5)
+
+# Detection limits measured on a simulated angular-differential-imaging
+# sequence containing this planet
+ADI = adi.run_pipeline(n_frames=ADI_FRAMES, rotation=ADI_ROTATION,
+                       planet_sep=PLANET_SEP,
+                       planet_contrast=10**(-0.4 * PLANET_DMAG))
+ax_con.plot(ADI.separation, -2.5 * np.log10(ADI.contrast), color=ACCENT,
+            linewidth=2, linestyle='--',
+            label=f'ADI + KLIP ({ADI_FRAMES} frames, {ADI_ROTATION:.0f}°)', zorder=5)
+
+ax_con.axhline(15, color=SPINE_COL, linewidth=0.8, linestyle=':')
+ax_con.axhline(20, color=SPINE_COL, linewidth=0.8, linestyle=':')
 ax_con.text(1.8, 15.3, 'Hot Jupiter', color=DIM_COL, fontsize=8, ha='right')
 ax_con.text(1.8, 20.3, 'Earth-like', color=DIM_COL, fontsize=8, ha='right')
 
 ax_con.set_xlim(0, 2.0)
-ax_con.set_ylim(4, 26)
+ax_con.set_ylim(0, 24)
 ax_con.invert_yaxis()  # higher contrast (larger Δmag) at top
 
 # Planet marker on contrast curve
 planet_contrast = PLANET_SEP  # separation
-planet_delta_mag = 15.8        # planet magnitude contrast
+planet_delta_mag = PLANET_DMAG  # planet magnitude contrast
 planet_con_pt, = ax_con.plot([PLANET_CONTRAST := PLANET_SEP],
                               [planet_delta_mag], '*',
                               color=PLANET_C, markersize=0, zorder=8)
@@ -236,8 +251,7 @@ planet_con_label = ax_con.text(PLANET_SEP + 0.05, planet_delta_mag - 0.3,
                                 '', color=PLANET_C, fontsize=8,
                                 fontfamily='monospace')
 
-ax_con.legend(loc='lower right', facecolor=BG, edgecolor='#30363d',
-              labelcolor=TEXT_COL, fontsize=8)
+astroanim.legend(ax_con, loc='lower right')
 
 # Status text
 status_txt = fig.text(0.5, 0.04,
@@ -246,8 +260,15 @@ status_txt = fig.text(0.5, 0.04,
                        fontfamily='monospace')
 
 # ── Animation ────────────────────────────────────────────────────────────────
+# Every per-frame quantity is precomputed for all frames, so frame k's
+# output is a pure function of k (random access, any playback order)
 TIMES = np.linspace(0, DURATION, N_FRAMES)
-orbit_px_list, orbit_py_list = [], []
+PLANET_X, PLANET_Y = planet_pos(TIMES)
+PLANET_PCX, PLANET_PCY = pos_to_pixel(PLANET_X, PLANET_Y)
+# Orbit trace in panel coordinates; frame k draws the view [ORBIT_START, k]
+ORBIT_SCALE = 2.0 / (max(ORB_A, ORB_B) * 2.5)
+ORBIT_XY = np.stack([PLANET_X, PLANET_Y]) * ORBIT_SCALE
+ORBIT_START = int(np.searchsorted(TIMES, T_ORBIT_START))
 
 def init():
     return (im_raw, im_cor, planet_cor_img, orbit_trace,
@@ -255,24 +276,30 @@ def init():
 
 def animate(frame):
     t = TIMES[frame]
-    px, py = planet_pos(t)
+    pcx, pcy = PLANET_PCX[frame], PLANET_PCY[frame]
 
     # ── Raw panel: raw image stays mostly static ──
     # Add a slight pulsing glow to emphasize star glare
+    # (scaling the colour limits is equivalent to scaling the image data)
     glare_mod = 1.0 + 0.03 * np.sin(t * 4)
-    im_raw.set_data(raw_img_data * glare_mod)
+    im_raw.set_clim(1e3 / glare_mod, STAR_FLUX / glare_mod)
 
     # ── Coronagraph panel ──
     stage1 = t < T_CORONAGRAPH       # raw observation
     stage2 = T_CORONAGRAPH <= t < T_PLANET_VIS  # coronagraph applying
     stage3 = t >= T_PLANET_VIS       # planet visible
+    reveal_prog = min(1.0, max(0.0, (t - T_PLANET_VIS) / 1.5))
+
+    # Reset everything the later stages draw, then draw this frame's stage
+    planet_cor_img.set_alpha(0)
+    planet_cor_label.set_text('')
+    sep_ann.arrow_patch.set_alpha(0)
+    sep_txt.set_text('')
 
     if stage1:
         # Occulter not visible yet
         occulter.set_radius(0.0)
         im_cor.set_alpha(0.5)
-        planet_cor_img.set_alpha(0)
-        planet_cor_label.set_text('')
     elif stage2:
         # Occulter growing in
         progress = (t - T_CORONAGRAPH) / (T_PLANET_VIS - T_CORONAGRAPH)
@@ -280,19 +307,15 @@ def animate(frame):
         # Speckles fading
         fade = 1.0 - progress * 0.8
         im_cor.set_alpha(fade * 0.5)
-        planet_cor_img.set_alpha(0)
     elif stage3:
         occulter.set_radius(0.18)
         im_cor.set_alpha(0.1)
 
         # Planet PSF in coronagraph view
-        reveal_prog = min(1.0, (t - T_PLANET_VIS) / 1.5)
-        pcx, pcy = pos_to_pixel(px, py)
-        if 10 <= pcx < IMG_SIZE - 10 and 10 <= pcy < IMG_SIZE - 10:
-            planet_image = gaussian_psf(IMG_SIZE, sigma=6,
-                                         amplitude=PLANET_FLUX_IR * reveal_prog,
-                                         cx=pcx, cy=pcy)
-            planet_cor_img.set_data(planet_image)
+        if 10 * PIX <= pcx < IMG_SIZE - 10 * PIX and 10 * PIX <= pcy < IMG_SIZE - 10 * PIX:
+            planet_canvas.clear()
+            planet_canvas.add(PLANET_STAMP, pcx, pcy, PLANET_FLUX_IR * reveal_prog)
+            planet_cor_img.set_data(planet_canvas.data)
             planet_cor_img.set_alpha(1.0)
 
             # Label
@@ -310,29 +333,27 @@ def animate(frame):
             sep_ann.set_position((0.0, 0.0))
             sep_ann.xy = (pix_to_coord_x, pix_to_coord_y)
             sep_ann.xytext = (0.0, 0.0)
-            sep_ann.get_arrowprops()['alpha'] = reveal_prog * 0.7
+            sep_ann.arrow_patch.set_alpha(reveal_prog * 0.7)
             sep_txt.set_text(f'{PLANET_SEP}" sep.')
             sep_txt.set_position((pix_to_coord_x/2 + 0.06, pix_to_coord_y/2))
             sep_txt.set_alpha(reveal_prog)
 
-        # Orbit trace
-        if t >= T_ORBIT_START:
-            orbit_px_list.append(px)
-            orbit_py_list.append(py)
-            if len(orbit_px_list) > 1:
-                ox_pix = np.array(orbit_px_list)
-                oy_pix = np.array(orbit_py_list)
-                scale_f = 2.0 / (max(ORB_A, ORB_B) * 2.5)
-                ox_plot = ox_pix * scale_f
-                oy_plot = oy_pix * scale_f
-                orbit_trace.set_data(ox_plot, oy_plot)
+    # Orbit trace: a view into the precomputed orbit, no per-frame copies
+    if frame > ORBIT_START:
+        orbit_trace.set_data(*ORBIT_XY[:, ORBIT_START:frame + 1])
+    else:
+        orbit_trace.set_data([], [])
+
+    # ── Contrast curve: panel ② outside the current occulter ──
+    if stage1:
+        cor_curve.set_data([], [])
+    else:
+        cor_curve.set_data(*occulted_contrast(int(round(occulter.get_radius() * IMG_SIZE / 2))))
 
     # ── Contrast curve: mark planet point ──
-    if t >= T_PLANET_VIS:
-        reveal_prog = min(1.0, (t - T_PLANET_VIS) / 1.5)
-        planet_con_pt.set_markersize(10 * reveal_prog)
-        planet_con_label.set_text(f'This\nplanet\n({PLANET_SEP_AU:.0f} AU)')
-        planet_con_label.set_alpha(reveal_prog)
+    planet_con_pt.set_markersize(10 * reveal_prog)
+    planet_con_label.set_text(f'This\nplanet\n({PLANET_SEP_AU:.0f} AU)' if stage3 else '')
+    planet_con_label.set_alpha(reveal_prog)
 
     # ── Status text ──
     if stage1:
@@ -346,7 +367,7 @@ def animate(frame):
                              f'Suppressing star speckles  [{progress_pct}%]')
         status_txt.set_color(PURPLE)
     else:
-        reveal_pct = int(min(1.0, (t - T_PLANET_VIS) / 1.5) * 100)
+        reveal_pct = int(reveal_prog * 100)
         status_txt.set_text(
             f'Stage 3: Planet detected in infrared!  '
             f'Orbital motion visible  [{reveal_pct}%]  —  '
@@ -354,16 +375,12 @@ def animate(frame):
         status_txt.set_color(GREEN)
 
     return (im_raw, im_cor, planet_cor_img, orbit_trace,
-            planet_con_pt, status_txt, occulter)
-
-ani = animation.FuncAnimation(fig, animate, frames=N_FRAMES,
-                               init_func=init, interval=1000/FPS, blit=False)
+            planet_con_pt, status_txt, occulter, cor_curve)
 
 plt.tight_layout(rect=[0, 0.05, 1, 0.93])
 
-if SAVE:
-    print("Saving direct_imaging.gif …")
-    ani.save('direct_imaging.gif', writer='pillow', fps=FPS, dpi=100)
-    print("Saved.")
-else:
-    plt.show()
+scene = astroanim.Scene(fig, animate, N_FRAMES, fps=FPS, init=init, source=__file__)
+
+if __name__ == '__main__':
+    scene.run()
+
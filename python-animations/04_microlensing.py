@@ -8,70 +8,74 @@ light curve with a brief planet-induced spike.
 
 Panels:
   Top-left : Sky view — Einstein ring forming as lens passes
-  Top-right: Caustic geometry — the critical curves and source path
+  Top-right: Lens plane — critical curves, caustics, source path and images
   Bottom   : Magnification light curve — Paczynski profile + planet spike
 
 Physics:
   - Paczynski (1986) point-lens magnification:
       A(u) = (u² + 2) / (u * sqrt(u² + 4))
   - u(t) = sqrt(u_min² + ((t - t₀)/t_E)²)
-  - Planet caustic: binary lens with mass ratio q = 0.001 (MJ/MS)
+  - Planet: point-mass binary lens with mass ratio q = 0.001 (MJ/MS),
+    solved exactly with `binary_lens.py` — images are the roots of the
+    fifth-order complex lens polynomial; the planet spike is the source
+    crossing the planetary caustic
+  - Finite source: the background star is a uniform disk of radius
+    ρ = 0.004 θ_E, so caustic crossings peak at a finite height
+    (`finite_source.py` — disk lookup table for the single lens,
+    ray-shooting magnification map for the binary lens)
 
 Usage:
   python 04_microlensing.py           # interactive window
   python 04_microlensing.py --save    # saves microlensing.gif
+  python 04_microlensing.py --save --set U_MIN=0.3 --set Q=0.005
 """
 
-import sys
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import matplotlib.gridspec as gridspec
 from matplotlib.patches import Circle, FancyArrowPatch
 from matplotlib.lines import Line2D
 
-SAVE = "--save" in sys.argv
+import astroanim
+from astroanim.palette import (BG, TEXT_COL, DIM_COL, ACCENT, BLUE, RED,
+                               GRID_COL, SPINE_COL)
+import binary_lens
+import finite_source
 
 # ── Microlensing parameters ──────────────────────────────────────────────────
 U_MIN    = 0.12    # minimum impact parameter (Einstein radii)  u < 1 → large magnif.
 T_0      = 0.0     # time of closest approach (normalised)
 T_E      = 1.0     # Einstein ring crossing time (normalised units)
 DURATION = 10.0    # animation duration (seconds)
-T_START  = -2.5 * T_E
-T_END    =  2.5 * T_E
 
 # Planet parameters (binary lens)
 Q        = 0.001          # mass ratio M_planet / M_star
-ALPHA_P  = -0.4           # planet-star angle from source trajectory (radians)
+ALPHA_P  = -0.25          # planet-star angle from source trajectory (radians)
 SEP_P    = 1.3            # planet-star separation in Einstein radii
-
-# Planet anomaly timing (when source crosses planet caustic)
-T_PLANET  = 0.6 * T_E    # time of planet anomaly relative to t_0
+N_LC     = 10_000         # light-curve samples (resolves the caustic crossing)
+RHO_S    = 0.004          # source star radius in Einstein radii
 
 FPS       = 30
+
+astroanim.configure(globals())     # --fps, --set KEY=VALUE overrides
 N_FRAMES  = int(FPS * DURATION)
+T_START   = -2.5 * T_E
+T_END     =  2.5 * T_E
 
-# ── Color palette ───────────────────────────────────────────────────────────
-BG       = '#070b12'
-TEXT_COL = '#c9d1d9'
-DIM_COL  = '#484f58'
+# ── Color palette (shared colours come from astroanim.palette) ──────────────
 LENS_C   = '#ffe480'     # lens star colour (yellow-white)
 SOURCE_C = '#88aaff'     # background source star (blue)
-PLANET_C = '#f0883e'     # planet colour (orange)
-RING_C   = '#58a6ff'     # Einstein ring
-CAUST_C  = '#ff6b6b'     # caustic (red)
+PLANET_C = ACCENT        # planet colour (orange)
+RING_C   = BLUE          # Einstein ring
+CAUST_C  = RED           # caustic (red)
 CRIT_C   = '#aaaaff'     # critical curve (blue-grey)
-LC_C     = '#58a6ff'     # light curve colour
-SPIKE_C  = '#f0883e'     # planet spike colour
-GRID_COL = '#161b22'
-GREEN    = '#3fb950'
-PURPLE   = '#bc8cff'
+LC_C     = BLUE          # light curve colour
+SPIKE_C  = ACCENT        # planet spike colour
 
 # ── Paczynski magnification ──────────────────────────────────────────────────
 def magnification(u):
-    """Point-source, point-lens magnification."""
-    u = np.maximum(u, 0.001)  # avoid singularity
-    return (u**2 + 2) / (u * np.sqrt(u**2 + 4))
+    """Point-lens magnification of the finite (uniform disk) source."""
+    return finite_source.single_lens(u, RHO_S)
 
 def impact_param(t):
     """Impact parameter u(t) — source-lens separation in Einstein radii."""
@@ -81,13 +85,20 @@ def impact_param(t):
 TIMES    = np.linspace(0, DURATION, N_FRAMES)
 T_PHYS   = T_START + (T_END - T_START) * TIMES / DURATION  # physical time
 U_T      = impact_param(T_PHYS)
-MAG_PSPL = magnification(U_T)                               # point-source-point-lens
+MAG_PSPL = magnification(U_T)                               # single (point) lens
 
-# Add planet anomaly: simple Gaussian bump centred at T_PLANET
-# (In reality this comes from binary lens caustic crossing)
-T_HALF_WIDTH = 0.08 * T_E
-PLANET_BUMP  = 3.2 * np.exp(-0.5 * ((T_PHYS - T_PLANET) / T_HALF_WIDTH)**2)
-MAG_TOTAL    = MAG_PSPL + PLANET_BUMP
+# Binary lens (star + planet): source positions in the lens frame, where
+# the planet lies on the +x axis, for every frame and for a dense curve
+ZETA_T    = binary_lens.source_trajectory(T_PHYS, T_0, T_E, U_MIN, ALPHA_P)
+MAG_TOTAL = finite_source.binary_lens_curve(ZETA_T, SEP_P, Q, RHO_S)
+IMAGES_T, REAL_T = binary_lens.image_positions(ZETA_T, SEP_P, Q)
+IMAGES_T  = IMAGES_T * np.exp(1j * ALPHA_P)                 # back to the sky frame
+
+T_LC        = np.linspace(T_START, T_END, N_LC)
+MAG_PSPL_LC = magnification(impact_param(T_LC))
+MAG_LC      = finite_source.binary_lens_curve(
+    binary_lens.source_trajectory(T_LC, T_0, T_E, U_MIN, ALPHA_P), SEP_P, Q, RHO_S)
+LC_INDEX    = np.searchsorted(T_LC, T_PHYS, side='right')   # dense samples per frame
 
 # Convert magnification to flux change in millimagnitudes for labelling
 BASELINE_FLUX = 1.0
@@ -96,17 +107,14 @@ FLUX_T = BASELINE_FLUX * MAG_TOTAL / MAG_TOTAL[0]  # normalise to start
 # Max magnification info
 peak_idx  = np.argmax(MAG_PSPL)
 peak_mag  = MAG_PSPL[peak_idx]
-spike_idx = np.argmax(PLANET_BUMP)
-spike_mag = MAG_TOTAL[spike_idx]
+spike_idx = np.argmax(MAG_LC - MAG_PSPL_LC)                 # largest planetary excess
+spike_mag = MAG_LC[spike_idx]
 
 # ── Figure layout ────────────────────────────────────────────────────────────
-fig = plt.figure(figsize=(15, 8.5), facecolor=BG)
-fig.text(0.5, 0.965, 'Exoplanet Detection: Gravitational Microlensing',
-         ha='center', fontsize=17, color='white', fontweight='bold')
-fig.text(0.5, 0.935,
-         'A foreground star (the lens) drifts past a background star '
-         '— gravity bends the light, revealing a planet',
-         ha='center', fontsize=10, color=DIM_COL)
+fig = astroanim.figure('Exoplanet Detection: Gravitational Microlensing',
+                       'A foreground star (the lens) drifts past a background star '
+                       '— gravity bends the light, revealing a planet',
+                       figsize=(15, 8.5))
 
 gs = gridspec.GridSpec(2, 2, figure=fig,
                        height_ratios=[1.3, 1.2],
@@ -118,10 +126,7 @@ ax_sky   = fig.add_subplot(gs[0, 0], facecolor=BG)
 ax_geom  = fig.add_subplot(gs[0, 1], facecolor=BG)
 ax_lc    = fig.add_subplot(gs[1, :], facecolor=BG)
 
-for ax in [ax_sky, ax_geom, ax_lc]:
-    ax.set_facecolor(BG)
-    for s in ax.spines.values():
-        s.set_color('#30363d')
+astroanim.style_axes(ax_sky, ax_geom, ax_lc)
 
 # ── Sky view panel ───────────────────────────────────────────────────────────
 SKY_SIZE = 4.0   # arcseconds
@@ -155,7 +160,7 @@ ax_sky.add_patch(lens_star)
 
 # Lens trajectory line (dashed)
 TRAJ_Y = -U_MIN * 1.5
-ax_sky.axhline(TRAJ_Y, color='#30363d', linewidth=0.8,
+ax_sky.axhline(TRAJ_Y, color=SPINE_COL, linewidth=0.8,
                linestyle='--', alpha=0.5, zorder=2)
 ax_sky.text(2.8, TRAJ_Y - 0.25, 'Lens path', color=DIM_COL, fontsize=7.5)
 
@@ -188,7 +193,7 @@ planet_lbl = ax_sky.text(-3.5, TRAJ_Y + 0.55, '🪐 Planet\ncompanion',
 
 # Angle between lens and source
 angle_arc = ax_sky.annotate('', xy=(0, 0), xytext=(-3.5, TRAJ_Y),
-                             arrowprops=dict(arrowstyle='-', color='#30363d',
+                             arrowprops=dict(arrowstyle='-', color=SPINE_COL,
                                              lw=0.8, linestyle='dashed'),
                              annotation_clip=False, alpha=0.4)
 distance_txt = ax_sky.text(-1.8, TRAJ_Y/2, '', color=DIM_COL, fontsize=8,
@@ -242,16 +247,23 @@ u_ann = ax_geom.annotate(
 ax_geom.text(0.1, -U_MIN/2, f'u_min = {U_MIN}', color=TEXT_COL,
              fontsize=8, fontfamily='monospace')
 
-# Planet caustic (approximate: a small diamond/astroid near the planet)
-# Caustic near planetary Einstein ring
-th_c = np.linspace(0, 2*np.pi, 200)
-caust_r = 0.15 * np.sqrt(Q)
-cx = p_lens_x + caust_r * np.cos(th_c) * 0.8
-cy = p_lens_y + caust_r * np.sin(th_c)
-ax_geom.fill(cx, cy, color=CAUST_C, alpha=0.25, zorder=6)
-ax_geom.plot(cx, cy, color=CAUST_C, linewidth=1.5, alpha=0.6, zorder=7,
-             label='Planet caustic')
-ax_geom.text(p_lens_x + 0.08, p_lens_y - 0.25, 'Caustic', color=CAUST_C, fontsize=8)
+# Critical curves and caustics of the star + planet lens, rotated from
+# the lens frame (planet on +x) into this panel
+CRITICAL, CAUSTIC = binary_lens.critical_curves(SEP_P, Q)
+CRITICAL, CAUSTIC = CRITICAL * np.exp(1j * ALPHA_P), CAUSTIC * np.exp(1j * ALPHA_P)
+for i, (crit, caus) in enumerate(zip(CRITICAL, CAUSTIC)):
+    ax_geom.plot(crit.real, crit.imag, color=CRIT_C, linewidth=1, alpha=0.7, zorder=5,
+                 label='Critical curve' if i == 0 else None)
+    ax_geom.plot(caus.real, caus.imag, color=CAUST_C, linewidth=1.5, alpha=0.9, zorder=7,
+                 label='Caustic' if i == 0 else None)
+planet_caustic = CAUSTIC[np.abs(CAUSTIC).max(axis=1).argmax()]
+ax_geom.text(planet_caustic.real.mean() - 0.25, planet_caustic.imag.min() - 0.5,
+             'Planetary\ncaustic', color=CAUST_C, fontsize=8)
+
+# Lensed images of the source (3 or 5, from the lens polynomial)
+images_geom, = ax_geom.plot([], [], 'o', color=SOURCE_C, markersize=4,
+                            markeredgecolor='white', markeredgewidth=0.5,
+                            alpha=0.9, zorder=11, label='Images')
 
 # Magnification colour bar (text indicator)
 geom_mag_txt = ax_geom.text(0.02, 0.96, 'A = 1.00×',
@@ -259,8 +271,7 @@ geom_mag_txt = ax_geom.text(0.02, 0.96, 'A = 1.00×',
                               color=RING_C, fontsize=10,
                               fontfamily='monospace', fontweight='bold')
 
-ax_geom.legend(loc='lower right', facecolor=BG, edgecolor='#30363d',
-               labelcolor=TEXT_COL, fontsize=7.5)
+astroanim.legend(ax_geom, loc='lower right', fontsize=7.5)
 
 # ── Light curve panel ────────────────────────────────────────────────────────
 ax_lc.set_title('Microlensing Light Curve', color=TEXT_COL, fontsize=10, pad=4)
@@ -271,20 +282,20 @@ ax_lc.grid(True, color=GRID_COL, linewidth=0.6, alpha=0.9)
 
 T_NORM = T_PHYS / T_E  # normalised time axis (in units of t_E)
 ax_lc.set_xlim(T_NORM[0], T_NORM[-1])
-ax_lc.set_ylim(0.85, max(MAG_TOTAL) * 1.12)
+ax_lc.set_ylim(0.85, MAG_LC.max() * 1.12)
 
 # Baseline
-ax_lc.axhline(1.0, color='#30363d', linewidth=0.8, linestyle='--', zorder=2)
+ax_lc.axhline(1.0, color=SPINE_COL, linewidth=0.8, linestyle='--', zorder=2)
 ax_lc.text(T_NORM[0] + 0.05, 1.02, 'Baseline (unmagnified)', color=DIM_COL, fontsize=8)
 
 # Peak annotation
-ax_lc.axvline(T_0 / T_E, color='#30363d', linewidth=0.8, linestyle=':', alpha=0.5)
+ax_lc.axvline(T_0 / T_E, color=SPINE_COL, linewidth=0.8, linestyle=':', alpha=0.5)
 ax_lc.text(T_0/T_E + 0.05, peak_mag * 0.96,
            f'Peak  A = {peak_mag:.2f}×\n(u_min = {U_MIN})',
            color=LC_C, fontsize=8, fontfamily='monospace')
 
 # Planet spike annotation
-spike_t_norm = T_PHYS[spike_idx] / T_E
+spike_t_norm = T_LC[spike_idx] / T_E
 ax_lc.axvspan(spike_t_norm - 0.12, spike_t_norm + 0.12,
                color=SPIKE_C, alpha=0.08, zorder=1)
 ax_lc.text(spike_t_norm + 0.13, spike_mag * 0.97,
@@ -292,11 +303,11 @@ ax_lc.text(spike_t_norm + 0.13, spike_mag * 0.97,
            color=SPIKE_C, fontsize=8, fontfamily='monospace')
 
 # Pre-draw theoretical curves (faint guide)
-ax_lc.plot(T_NORM, MAG_PSPL, color=LC_C, linewidth=0.8, alpha=0.12, zorder=3)
-ax_lc.plot(T_NORM, MAG_TOTAL, color=SPIKE_C, linewidth=0.8, alpha=0.10, zorder=3)
+ax_lc.plot(T_LC / T_E, MAG_PSPL_LC, color=LC_C, linewidth=0.8, alpha=0.12, zorder=3)
+ax_lc.plot(T_LC / T_E, MAG_LC, color=SPIKE_C, linewidth=0.8, alpha=0.10, zorder=3)
 
 # Paczynski model label
-ax_lc.text(T_NORM[0] + 0.05, max(MAG_TOTAL) * 1.06,
+ax_lc.text(T_NORM[0] + 0.05, MAG_LC.max() * 1.06,
            'Black: Paczynski (point-lens) model     '
            'Orange: With planet perturbation',
            color=DIM_COL, fontsize=8, fontfamily='monospace')
@@ -307,8 +318,7 @@ lc_total, = ax_lc.plot([], [], color=SPIKE_C, linewidth=2.0, zorder=7,
                          linestyle='--', label='With planet')
 lc_dot,   = ax_lc.plot([], [], 'o', color='white', markersize=6, zorder=9)
 
-ax_lc.legend(loc='upper left', facecolor=BG, edgecolor='#30363d',
-             labelcolor=TEXT_COL, fontsize=8)
+astroanim.legend(ax_lc, loc='upper left')
 
 # ── Animation ────────────────────────────────────────────────────────────────
 def init():
@@ -356,6 +366,8 @@ def animate(frame):
     einstein_ring.set_alpha(ring_alpha)
 
     # Two images on either side of source (for u < 2)
+    img1.set_radius(0)
+    img2.set_radius(0)
     if u_now < 2.0:
         theta_lens = np.arctan2(lens_y - 0, lens_x - 0)
         img_r = ring_radius * 0.85
@@ -381,25 +393,25 @@ def animate(frame):
     src_geom_x = t_p / T_E  # source moves along trajectory
     src_geom_x = np.clip(src_geom_x, -2.4, 2.4)
     source_geom.set_data([src_geom_x], [-U_MIN])
-    if frame > 1:
-        trail_x = T_PHYS[:frame] / T_E
-        trail_x = np.clip(trail_x, -2.4, 2.4)
-        source_geom_trail.set_data(trail_x, np.full(frame, -U_MIN))
+    trail_x = np.clip(T_PHYS[:frame] / T_E, -2.4, 2.4) if frame > 1 else []
+    source_geom_trail.set_data(trail_x, np.full(len(trail_x), -U_MIN))
+
+    # Current images of the source
+    images = IMAGES_T[frame][REAL_T[frame]]
+    images_geom.set_data(images.real, images.imag)
 
     # Update geometry magnification label
     geom_mag_txt.set_text(f'A = {mag:.2f}×')
     geom_mag_txt.set_color(SPIKE_C if mag > 2.0 else LC_C if mag > 1.3 else RING_C)
 
     # ── Light curve ──
-    lc_pspl.set_data(T_NORM[:frame+1], MAG_PSPL[:frame+1])
-    lc_total.set_data(T_NORM[:frame+1], MAG_TOTAL[:frame+1])
+    n_lc = LC_INDEX[frame]
+    lc_pspl.set_data(T_LC[:n_lc] / T_E, MAG_PSPL_LC[:n_lc])
+    lc_total.set_data(T_LC[:n_lc] / T_E, MAG_LC[:n_lc])
     lc_dot.set_data([t_norm_now], [mag])
 
     return (lc_pspl, lc_total, lc_dot, lens_star, planet_sky,
-            einstein_ring, img1, img2, mag_txt, source_geom)
-
-ani = animation.FuncAnimation(fig, animate, frames=N_FRAMES,
-                               init_func=init, interval=1000/FPS, blit=False)
+            einstein_ring, img1, img2, mag_txt, source_geom, images_geom)
 
 # Info box
 fig.text(0.5, 0.04,
@@ -409,9 +421,8 @@ fig.text(0.5, 0.04,
 
 plt.tight_layout(rect=[0, 0.04, 1, 0.93])
 
-if SAVE:
-    print("Saving microlensing.gif …")
-    ani.save('microlensing.gif', writer='pillow', fps=FPS, dpi=100)
-    print("Saved.")
-else:
-    plt.show()
+scene = astroanim.Scene(fig, animate, N_FRAMES, fps=FPS, init=init, source=__file__)
+
+if __name__ == '__main__':
+    scene.run()
+
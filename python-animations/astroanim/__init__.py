@@ -0,0 +1,24 @@
+"""
+astroanim — shared framework for the exoplanet animations
+=========================================================
+  - `palette`: colours used by every scene
+  - `figure`, `style_axes`, `legend`: the common dark figure scaffolding
+  - `configure(globals())`: applies command-line overrides (`--fps`,
+    `--set KEY=VALUE`) to a script's module-level parameters
+  - `Scene`: figure + pure per-frame draw function, with interactive,
+    GIF / APNG / PNG-frame / MP4 output and multi-process rendering
+  - `python -m astroanim`: headless batch rendering of any subset of
+    the numbered scripts (see `batch.py`)
+
+A script builds its figure at import time and ends with
+
+    scene = astroanim.Scene(fig, animate, N_FRAMES, fps=FPS, init=init,
+                            source=__file__)
+    if __name__ == '__main__':
+        scene.run()
+"""
+
+from . import palette
+from .layout import figure, style_axes, legend
+from .options import configure, parse_frames
+from .scene import Scene, discover, load_scene
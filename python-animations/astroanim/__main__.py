@@ -0,0 +1,5 @@
+import sys
+
+from .batch import main
+
+main(sys.argv[1:])
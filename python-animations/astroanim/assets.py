@@ -0,0 +1,158 @@
+"""
+Pre-encoded animation assets for the Streamlit app.
+
+  python -m astroanim.assets                 # → ../streamlit-legacy/static/animations
+  python -m astroanim.assets --force --jobs 4
+
+Renders the four scenes and a few parameter variants to APNG files
+named by content hash (`transit_method.3f9c…e1.png`) and writes
+`manifest.json` mapping each asset key to its file.  The output is
+committed, so assets are kept small: a third of the script frame rate,
+low dpi, and every frame quantised (undithered) to one shared
+256-colour palette, which compresses several times better than RGB.
+`build` warns about any asset over MAX_BYTES.  Content-hashed
+names never change meaning, so the app can serve them with long cache
+lifetimes; an asset is only re-rendered when the animation sources or
+its settings change.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+import matplotlib
+
+from . import options
+from .scene import SCRIPT_DIR, discover, load_scene, sources_digest
+
+OUT_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'streamlit-legacy', 'static', 'animations')
+MANIFEST = 'manifest.json'
+FPS = 10                 # a third of the script rate: same duration, a third of the frames
+DPI = 48
+COLORS = 256
+MAX_BYTES = 2_000_000    # budget per committed asset
+
+# key: (scene, overrides, title, caption)
+ASSETS = {
+    'transit_method': (
+        'transit_method', (), 'Transit photometry',
+        'A hot Jupiter crosses its limb-darkened star; the light curve dips by (Rp/R★)².'),
+    'transit_method-grazing': (
+        'transit_method', ('IMPACT=0.85',), 'Grazing transit',
+        'At high impact parameter the planet clips the darker limb — a shallower, V-shaped dip.'),
+    'transit_method-earth': (
+        'transit_method', ('R_PLANET=0.04',), 'Small-planet transit',
+        'A super-Earth blocks about 0.2% of the light — buried close to the photon noise.'),
+    'radial_velocity': (
+        'radial_velocity', (), 'Radial velocity',
+        'The star wobbles around the barycentre; its spectral lines shift by Δλ/λ = v/c.'),
+    'direct_imaging': (
+        'direct_imaging', (), 'Direct imaging',
+        'A coronagraph suppresses the star so the orbiting planet shows up in the infrared.'),
+    'microlensing': (
+        'microlensing', (), 'Gravitational microlensing',
+        'A lens star magnifies a background star; its planet adds a brief caustic spike.'),
+    'microlensing-wide': (
+        'microlensing', ('U_MIN=0.3', 'Q=0.005'), 'Microlensing, wider approach',
+        'A wider source path and a heavier planet: lower peak, planet still detectable.'),
+}
+
+
+def write_apng(images, path, fps, colors=COLORS):
+    """
+    Save RGB frames as a palette APNG.  The palette is taken from a sheet
+    of up to eight frames spread over the animation, so colours that
+    only appear later (planets, curves) get entries too.
+    """
+    from PIL import Image
+    sample = images[::max(1, len(images) // 8)][:8]
+    w, h = sample[0].size
+    sheet = Image.new('RGB', (w, h * len(sample)))
+    for i, image in enumerate(sample):
+        sheet.paste(image, (0, i * h))
+    palette = sheet.quantize(colors, method=Image.Quantize.FASTOCTREE)
+    frames = [image.quantize(palette=palette, dither=Image.Dither.NONE) for image in images]
+    frames[0].save(path, format='PNG', save_all=True, append_images=frames[1:],
+                   duration=1000 / fps, loop=0)
+
+
+def build(out=OUT_DIR, keys=None, fps=FPS, dpi=DPI, jobs=1, force=False):
+    """Render missing or stale assets into `out`; returns the manifest."""
+    import matplotlib.pyplot as plt
+    from PIL import Image
+    os.makedirs(out, exist_ok=True)
+    path = os.path.join(out, MANIFEST)
+    manifest = {}
+    if os.path.exists(path):
+        with open(path) as fh:
+            manifest = json.load(fh)
+    scenes = discover()
+    sources = sources_digest()
+
+    for key in keys or ASSETS:
+        scene_name, overrides, title, caption = ASSETS[key]
+        inputs = hashlib.sha256(json.dumps(
+            [sources, scene_name, overrides, fps, dpi]).encode()).hexdigest()
+        entry = manifest.get(key)
+        if not force and entry and entry['inputs'] == inputs and \
+                os.path.exists(os.path.join(out, entry['file'])):
+            print(f"{key:24s} up to date  {entry['file']}")
+            continue
+
+        opts = options.build_parser().parse_args(
+            ['--fps', str(fps)] + [a for o in overrides for a in ('--set', o)])
+        opts.batch, opts.flags = False, []
+        scene = load_scene(scenes[scene_name], opts)
+        tmp = os.path.join(out, f'.{key}.tmp.png')
+        start = time.perf_counter()
+        write_apng(list(scene.frames(dpi=dpi, fmt='apng', jobs=jobs)), tmp, scene.fps)
+        elapsed = time.perf_counter() - start
+        plt.close(scene.fig)
+
+        with open(tmp, 'rb') as fh:
+            content = hashlib.sha256(fh.read()).hexdigest()[:16]
+        name = f'{key}.{content}.png'
+        os.replace(tmp, os.path.join(out, name))
+        if entry and entry['file'] != name:
+            stale = os.path.join(out, entry['file'])
+            if os.path.exists(stale):
+                os.remove(stale)
+        with Image.open(os.path.join(out, name)) as im:
+            width, height = im.size
+        manifest[key] = {'file': name, 'hash': content, 'title': title, 'caption': caption,
+                         'width': width, 'height': height, 'frames': scene.n_frames,
+                         'fps': scene.fps, 'bytes': os.path.getsize(os.path.join(out, name)),
+                         'inputs': inputs}
+        with open(path, 'w') as fh:
+            json.dump(manifest, fh, indent=2)
+        print(f"{key:24s} {scene.n_frames:4d} frames {elapsed:6.1f} s "
+              f"{manifest[key]['bytes'] / 1e6:6.1f} MB  {name}")
+        if manifest[key]['bytes'] > MAX_BYTES:
+            print(f"warning: {name} is over {MAX_BYTES / 1e6:g} MB; "
+                  f"lower --dpi or --fps before committing it", file=sys.stderr)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m astroanim.assets',
+                                     description='Build the Streamlit animation assets')
+    parser.add_argument('keys', nargs='*', help=f"assets (default: all of {', '.join(ASSETS)})")
+    parser.add_argument('--out', default=OUT_DIR)
+    parser.add_argument('--fps', type=float, default=FPS)
+    parser.add_argument('--dpi', type=float, default=DPI)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--force', action='store_true', help='re-render up-to-date assets')
+    args = parser.parse_args(argv)
+    unknown = set(args.keys) - set(ASSETS)
+    if unknown:
+        raise SystemExit(f"unknown assets {sorted(unknown)}")
+
+    matplotlib.use('Agg')
+    build(args.out, args.keys, args.fps, args.dpi, args.jobs, args.force)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
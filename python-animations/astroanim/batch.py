@@ -0,0 +1,71 @@
+"""
+Headless batch rendering of any subset of the animations.
+
+  python -m astroanim                          # all scenes → renders/*.gif
+  python -m astroanim transit microlensing --format apng --jobs 4
+  python -m astroanim microlensing --set U_MIN=0.3 --frames 0:300:10
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import matplotlib
+
+from . import options
+from .scene import discover, load_scene, EXTENSIONS
+
+
+def select(names, available):
+    """Scene names for the given names, numbers ('01') or unique prefixes."""
+    if not names:
+        return list(available)
+    numbered = {os.path.basename(p)[:2]: n for n, p in available.items()}
+    chosen = []
+    for name in names:
+        matches = [n for n in available if n == name] or \
+            ([numbered[name]] if name in numbered else []) or \
+            [n for n in available if n.startswith(name)]
+        if len(matches) != 1:
+            raise SystemExit(f"unknown or ambiguous scene {name!r}; "
+                             f"choose from {', '.join(available)}")
+        chosen.append(matches[0])
+    return chosen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m astroanim',
+                                     description='Render animations headlessly')
+    parser.add_argument('scenes', nargs='*', help='scene names (default: all)')
+    parser.add_argument('--out', default='renders', help='output directory')
+    parser.add_argument('--list', action='store_true', help='list scenes and exit')
+    options.add_render_options(parser)
+    opts = parser.parse_args(argv)
+    opts.batch, opts.flags, opts.save, opts.output = True, [], True, None
+
+    available = discover()
+    if opts.list:
+        for name, path in available.items():
+            print(f"{name:20s} {os.path.basename(path)}")
+        return
+
+    matplotlib.use('Agg')
+    names = select(opts.scenes, available)
+    scenes = [load_scene(available[name], opts) for name in names]
+    unused = set(options.parse_overrides(opts.overrides)) - opts.applied
+    if unused:
+        raise SystemExit(f"--set keys not used by any selected scene: {sorted(unused)}")
+
+    os.makedirs(opts.out, exist_ok=True)
+    for scene in scenes:
+        frames = options.parse_frames(opts.frames, scene.n_frames)
+        path = os.path.join(opts.out, scene.name + EXTENSIONS[opts.format])
+        start = time.perf_counter()
+        scene.save(path, opts.format, opts.dpi, frames, opts.jobs, not opts.no_cache)
+        print(f"{scene.name:20s} {len(frames):4d} frames  "
+              f"{time.perf_counter() - start:6.1f} s  → {path}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,156 @@
+"""
+Compact galleries for parameter sweeps (see `sweep.py`).
+
+  - `TransitGallery`: stellar disk with the planet's chord and the
+    limb-darkened light curve — R_PLANET, IMPACT, U1, U2
+  - `MicrolensingGallery`: lens plane with caustics and source path,
+    and the binary-lens light curve — U_MIN, Q, SEP_P, ALPHA_P
+
+Defaults match the full scripts.  Thumbnails use point-source binary
+curves: a ray-shooting map per (SEP_P, Q) variant (`finite_source.py`)
+costs more than the whole gallery, and at thumbnail size only the
+caustic-crossing peak heights differ.
+"""
+
+import numpy as np
+from matplotlib.patches import Circle
+
+import transit_model
+import binary_lens
+import finite_source
+from . import layout
+from .palette import (BG, TEXT_COL, DIM_COL, ACCENT, BLUE, RED, GRID_COL,
+                      STAR_COL)
+from .sweep import Gallery
+
+
+def _columns(variants, *names):
+    """Parameter columns (n_variants, 1) ready to broadcast against time."""
+    return [np.array([v[n] for v in variants], float)[:, None] for n in names]
+
+
+def _axes(fig):
+    """Square sky panel on the left, light-curve panel on the right."""
+    ax_sky = fig.add_axes([0.02, 0.05, 0.36, 0.72], facecolor=BG)
+    ax_lc = fig.add_axes([0.47, 0.17, 0.50, 0.60], facecolor=BG)
+    layout.style_axes(ax_sky, ax_lc)
+    ax_sky.set_aspect('equal')
+    ax_sky.set_xticks([]); ax_sky.set_yticks([])
+    ax_lc.tick_params(labelsize=6)
+    ax_lc.grid(color=GRID_COL, lw=0.5)
+    return ax_sky, ax_lc
+
+
+def _label(fig):
+    return fig.text(0.5, 0.90, '', color=TEXT_COL, fontsize=8,
+                    ha='center', va='center', fontfamily='monospace')
+
+
+# ── Transit ─────────────────────────────────────────────────────────────────
+class TransitGallery(Gallery):
+    name = 'transit'
+    params = {'R_PLANET': 0.13, 'IMPACT': 0.10, 'U1': 0.40, 'U2': 0.26}
+    grid = {'R_PLANET': [0.05, 0.10, 0.15], 'IMPACT': [0.0, 0.5, 0.85]}
+    n_frames = 270
+    still = 180                      # planet on the disk, past mid-transit
+    X_SPAN = 2.2                     # planet path, stellar radii either side
+
+    def physics(self, variants):
+        rp, b, u1, u2 = _columns(variants, 'R_PLANET', 'IMPACT', 'U1', 'U2')
+        x = np.linspace(-self.X_SPAN, self.X_SPAN, self.n_frames)
+        flux = transit_model.transit_flux(np.hypot(x, b), rp, u1, u2)
+        limb = sorted({(v['U1'], v['U2']) for v in variants})
+        return {'x': x, 'flux': flux, 'rp': rp[:, 0], 'b': b[:, 0],
+                'limb': [limb.index((v['U1'], v['U2'])) for v in variants],
+                'disks': [transit_model.disk_image(256, *ld) for ld in limb],
+                'labels': [self.label(v) for v in variants]}
+
+    def build(self, fig, data):
+        ax_sky, ax_lc = _axes(fig)
+        ax_sky.set_xlim(-1.45, 1.45); ax_sky.set_ylim(-1.45, 1.45)
+        disk = ax_sky.imshow(data['disks'][0], extent=(-1, 1, -1, 1), origin='lower',
+                             interpolation='bilinear', zorder=2)
+        ax_lc.set_xlim(-self.X_SPAN, self.X_SPAN)
+        depth = 1 - data['flux'].min()
+        ax_lc.set_ylim(1 - 1.15 * depth, 1 + 0.25 * depth)
+        ax_lc.set_xlabel('Planet position (R★)', color=DIM_COL, fontsize=6)
+        ax_lc.set_ylabel('Flux', color=DIM_COL, fontsize=6)
+
+        chord, = ax_sky.plot([], [], color=DIM_COL, lw=0.6, ls=':', zorder=3)
+        planet = ax_sky.add_patch(Circle((0, 0), 0.1, color='#2d5fa6', zorder=4))
+        curve, = ax_lc.plot([], [], color=BLUE, lw=1.2)
+        dot, = ax_lc.plot([], [], 'o', color=ACCENT, ms=3)
+        # The stellar disk only needs redrawing when limb darkening is swept
+        return [disk] * (len(data['disks']) > 1) + [chord, planet, curve, dot, _label(fig)]
+
+    def draw(self, artists, data, i, frame):
+        *disk, chord, planet, curve, dot, label = artists
+        x, b = data['x'], data['b'][i]
+        chord.set_data([-1.45, 1.45], [b, b])
+        planet.center, planet.radius = (x[frame], b), data['rp'][i]
+        curve.set_data(x[:frame + 1], data['flux'][i, :frame + 1])
+        dot.set_data([x[frame]], [data['flux'][i, frame]])
+        label.set_text(data['labels'][i])
+        for image in disk:
+            image.set_data(data['disks'][data['limb'][i]])
+
+
+# ── Microlensing ────────────────────────────────────────────────────────────
+class MicrolensingGallery(Gallery):
+    name = 'microlensing'
+    params = {'U_MIN': 0.12, 'Q': 0.001, 'SEP_P': 1.3, 'ALPHA_P': -0.25}
+    grid = {'U_MIN': [0.05, 0.12, 0.3], 'Q': [3e-4, 1e-3, 5e-3]}
+    n_frames = 300
+    N_LC = 1500                      # light-curve samples per variant
+    T_SPAN = 2.5                     # Einstein times either side of t₀
+
+    def physics(self, variants):
+        u_min, q, s, alpha = _columns(variants, 'U_MIN', 'Q', 'SEP_P', 'ALPHA_P')
+        t = np.linspace(-self.T_SPAN, self.T_SPAN, self.N_LC)
+        zeta = binary_lens.source_trajectory(t, 0.0, 1.0, u_min, alpha)
+        mag = binary_lens.magnification(zeta, s, q)         # all variants at once
+        pspl = finite_source.point_source(np.hypot(u_min, t))
+        lenses = sorted({(v['SEP_P'], v['Q']) for v in variants})
+        caustics = [binary_lens.critical_curves(*lens, n=600)[1] for lens in lenses]
+        return {'t': t, 'zeta': zeta, 'mag': mag, 'pspl': pspl,
+                'lens': [lenses.index((v['SEP_P'], v['Q'])) for v in variants],
+                'caustics': caustics, 's': s[:, 0],
+                'peak': pspl.max(), 'labels': [self.label(v) for v in variants]}
+
+    def build(self, fig, data):
+        ax_sky, ax_lc = _axes(fig)
+        extent = 1.1 * max(1.5, data['s'].max() + 0.2)
+        ax_sky.set_xlim(-extent, extent); ax_sky.set_ylim(-extent, extent)
+        ax_sky.add_patch(Circle((0, 0), 1.0, fill=False, color=BLUE, lw=0.6,
+                                ls='--', alpha=0.5))
+        ax_sky.plot(0, 0, 'o', color=STAR_COL, ms=4, zorder=4)
+        ax_lc.set_xlim(-self.T_SPAN, self.T_SPAN)
+        # Point-source caustic crossings are unbounded; cap the shared scale
+        ax_lc.set_ylim(0.8, 1.1 * min(data['mag'].max(), 2 * data['peak']))
+        ax_lc.set_xlabel('(t − t₀) / t_E', color=DIM_COL, fontsize=6)
+        ax_lc.set_ylabel('Magnification', color=DIM_COL, fontsize=6)
+
+        caustic = [ax_sky.plot([], [], color=RED, lw=0.8, zorder=3)[0]
+                   for _ in range(4)]
+        path, = ax_sky.plot([], [], color=DIM_COL, lw=0.6, ls=':', zorder=2)
+        planet, = ax_sky.plot([], [], 'o', color=ACCENT, ms=3, zorder=4)
+        source, = ax_sky.plot([], [], 'o', color='#88aaff', ms=3, zorder=5)
+        pspl, = ax_lc.plot([], [], color=DIM_COL, lw=0.8, ls='--')
+        curve, = ax_lc.plot([], [], color=BLUE, lw=1.2)
+        return [path, planet, source, pspl, curve, _label(fig)] + caustic
+
+    def draw(self, artists, data, i, frame):
+        path, planet, source, pspl, curve, label = artists[:6]
+        k = frame * (self.N_LC - 1) // (self.n_frames - 1) + 1
+        t, zeta = data['t'], data['zeta'][i]
+        path.set_data(zeta.real, zeta.imag)
+        planet.set_data([data['s'][i]], [0.0])
+        source.set_data([zeta[k - 1].real], [zeta[k - 1].imag])
+        pspl.set_data(t[:k], data['pspl'][i, :k])
+        curve.set_data(t[:k], data['mag'][i, :k])
+        label.set_text(data['labels'][i])
+        for line, branch in zip(artists[6:], data['caustics'][data['lens'][i]]):
+            line.set_data(branch.real, branch.imag)
+
+
+GALLERIES = {g.name: g for g in (TransitGallery, MicrolensingGallery)}
@@ -0,0 +1,28 @@
+"""Figure scaffolding shared by the animations: title block, axes, legends."""
+
+import matplotlib.pyplot as plt
+
+from .palette import BG, TEXT_COL, DIM_COL, SPINE_COL
+
+
+def figure(title, subtitle, figsize=(15, 8)):
+    """Dark figure with the bold title and dim subtitle used by every scene."""
+    fig = plt.figure(figsize=figsize, facecolor=BG)
+    fig.text(0.5, 0.965, title, ha='center', fontsize=17, color='white',
+             fontweight='bold')
+    fig.text(0.5, 0.935, subtitle, ha='center', fontsize=10, color=DIM_COL)
+    return fig
+
+
+def style_axes(*axes):
+    """Dark background and muted spines for each axes."""
+    for ax in axes:
+        ax.set_facecolor(BG)
+        for spine in ax.spines.values():
+            spine.set_color(SPINE_COL)
+
+
+def legend(ax, fontsize=8, **kwargs):
+    """Legend in the shared dark style (extra kwargs go to `ax.legend`)."""
+    return ax.legend(facecolor=BG, edgecolor=SPINE_COL, labelcolor=TEXT_COL,
+                     fontsize=fontsize, **kwargs)
@@ -0,0 +1,161 @@
+"""
+Command-line options shared by every animation script and the batch
+renderer, and `configure`, which applies `--set KEY=VALUE` overrides to
+a script's module-level parameters.
+"""
+
+import os
+import re
+import ast
+import sys
+import argparse
+
+FORMATS = ('gif', 'apng', 'png', 'mp4')
+_TRUE = {'1', 'true', 'yes', 'on'}
+_FALSE = {'0', 'false', 'no', 'off'}
+
+_active = None           # options of the scene being built
+
+
+def add_render_options(parser):
+    """Options common to single scripts and the batch renderer."""
+    parser.add_argument('--format', choices=FORMATS, default='gif',
+                        help='output format; png writes one file per frame')
+    parser.add_argument('--fps', type=float, default=None,
+                        help='frames per second (overrides the script)')
+    parser.add_argument('--dpi', type=float, default=100)
+    parser.add_argument('--frames', default=None, metavar='SPEC',
+                        help="frames to render, e.g. '0:90', '0:300:5' or '10,20,30'")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='worker processes rendering frames in parallel')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='render every frame, ignoring the frame cache')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        dest='overrides', help='override a module-level parameter '
+                        '(repeatable; SCENE.KEY=VALUE targets one scene in batches)')
+    return parser
+
+
+def build_parser(description=None):
+    """Parser for running a single animation script."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--save', action='store_true',
+                        help='render to a file instead of opening a window')
+    parser.add_argument('--output', default=None,
+                        help='output path (default: <scene>.<format>, implies --save)')
+    return add_render_options(parser)
+
+
+def activate(opts):
+    """Make `opts` the options seen by `configure` (used by the batch renderer)."""
+    global _active
+    _active = opts
+    return opts
+
+
+def current():
+    """Active options; parsed from sys.argv the first time in a plain script run."""
+    if _active is None:
+        opts, extra = build_parser().parse_known_args(sys.argv[1:])
+        opts.flags = extra
+        opts.batch = False
+        activate(opts)
+    return _active
+
+
+def scene_name(path):
+    """'01_transit_method.py' → 'transit_method'."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r'^\d+_', '', stem)
+
+
+def parse_overrides(pairs):
+    """['KEY=VALUE', …] → {'KEY': 'VALUE', …} (keys may be SCENE.KEY)."""
+    out = {}
+    for pair in pairs:
+        key, sep, value = pair.partition('=')
+        if not sep or not key:
+            raise SystemExit(f"--set expects KEY=VALUE, got {pair!r}")
+        out[key.strip()] = value.strip()
+    return out
+
+
+def _cast(text, current_value):
+    """Parse `text` as the type of the parameter it replaces."""
+    if isinstance(current_value, bool):
+        if text.lower() in _TRUE | _FALSE:
+            return text.lower() in _TRUE
+        raise ValueError(f"expected a boolean, got {text!r}")
+    if isinstance(current_value, (int, float)):
+        value = ast.literal_eval(text)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"expected a number, got {text!r}")
+        if isinstance(current_value, int) and float(value).is_integer():
+            return int(value)
+        return float(value)
+    if isinstance(current_value, str):
+        return text
+    return ast.literal_eval(text)
+
+
+def configure(namespace):
+    """
+    Apply the active options to a script's globals (pass `globals()`,
+    after the parameter block and before anything derived from it):
+    `--fps` sets FPS, each `--set KEY=VALUE` replaces an existing
+    upper-case parameter, cast to its type, and in a plain script run
+    `--flag` switches on a boolean parameter FLAG.
+
+    Returns the options.  Unknown keys are an error, except for
+    unscoped keys in batch runs, which only need to exist in one scene.
+    """
+    opts = current()
+    name = scene_name(namespace.get('__file__', ''))
+    applied = getattr(opts, 'applied', set())
+    opts.applied = applied
+
+    def fail(message):
+        raise SystemExit(f"{name}: {message}")
+
+    updates = {}
+    if opts.fps is not None and 'FPS' in namespace:
+        updates['FPS'] = str(opts.fps)
+    for key, value in parse_overrides(opts.overrides).items():
+        scope, _, param = key.rpartition('.')
+        if scope and scope != name:
+            continue
+        if param not in namespace or not param.isupper():
+            if scope or not opts.batch:
+                fail(f"unknown parameter {param!r}")
+            continue
+        updates[param] = value
+        applied.add(key)
+    for flag in getattr(opts, 'flags', []):
+        param = flag.lstrip('-').replace('-', '_').upper()
+        if not flag.startswith('--') or not isinstance(namespace.get(param), bool):
+            fail(f"unrecognized argument {flag!r}")
+        updates[param] = 'true'
+
+    for param, value in updates.items():
+        try:
+            namespace[param] = _cast(value, namespace[param])
+        except (ValueError, SyntaxError) as exc:
+            fail(f"bad value for {param}: {exc}")
+    return opts
+
+
+def parse_frames(spec, n_frames):
+    """Frame indices from a SPEC like '0:90', '0:300:5', '10,20,30' (None = all)."""
+    if not spec:
+        return list(range(n_frames))
+    frames = []
+    for part in spec.split(','):
+        if ':' in part:
+            bounds = [int(p) if p.strip() else None for p in part.split(':')]
+            frames.extend(range(n_frames)[slice(*bounds)])
+        else:
+            frames.append(int(part))
+    bad = [f for f in frames if not 0 <= f < n_frames]
+    if bad:
+        raise SystemExit(f"frames out of range 0–{n_frames - 1}: {bad[:5]}")
+    return frames
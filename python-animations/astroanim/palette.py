@@ -0,0 +1,13 @@
+"""Colours shared by every animation (GitHub-dark inspired)."""
+
+BG        = '#070b12'    # figure and axes background
+TEXT_COL  = '#c9d1d9'    # titles, labels, tick labels
+DIM_COL   = '#484f58'    # secondary text
+GRID_COL  = '#161b22'    # grid lines
+SPINE_COL = '#30363d'    # axes spines, legend frames, reference lines
+BLUE      = '#58a6ff'    # primary data curve
+ACCENT    = '#f0883e'    # highlights and annotations (orange)
+GREEN     = '#3fb950'
+PURPLE    = '#bc8cff'
+RED       = '#ff6b6b'
+STAR_COL  = '#fff8e0'    # host star
@@ -0,0 +1,256 @@
+"""
+`Scene` — a figure plus a pure per-frame draw function — and the
+renderers built on it: interactive window, GIF / APNG / PNG frames /
+MP4, optionally with frames rendered by a pool of worker processes.
+
+Because a frame depends only on its index, rendered frames are cached
+as PNGs under .cache/frames/<scene>/<key>/, where the key digests the
+animation sources, the scene's overrides, fps and dpi.  Re-saving in
+another format, or a different frame range, only renders frames not
+seen before.  Each scene keeps its FRAME_CACHE_KEYS most recently used
+keys on disk.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+
+from . import options
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXTENSIONS = {'gif': '.gif', 'apng': '.png', 'png': '', 'mp4': '.mp4'}
+FRAME_CACHE = os.path.join(SCRIPT_DIR, '.cache', 'frames')
+FRAME_CACHE_KEYS = 4        # cached settings per scene
+
+
+def sources_digest():
+    """Digest of every source file a rendered frame can depend on."""
+    digest = hashlib.sha256()
+    paths = sorted(glob.glob(os.path.join(SCRIPT_DIR, '*.py')) +
+                   glob.glob(os.path.join(SCRIPT_DIR, 'astroanim', '*.py')))
+    for path in paths:
+        with open(path, 'rb') as fh:
+            digest.update(os.path.basename(path).encode() + b'\0' + fh.read())
+    return digest.hexdigest()
+
+
+class Scene:
+    """
+    One animation.  `draw(frame)` must set every animated artist from
+    the frame index alone (no state carried between calls), so frames
+    can be rendered in any order, skipped, or split across processes.
+
+    `source` is the script file; worker processes re-import it to build
+    their own copy of the scene.
+    """
+
+    def __init__(self, fig, draw, n_frames, fps=30, init=None, source=None,
+                 name=None):
+        self.fig = fig
+        self.draw = draw
+        self.n_frames = int(n_frames)
+        self.fps = fps
+        self.init = init
+        self.source = os.path.abspath(source) if source else None
+        self.name = name or (options.scene_name(source) if source else 'scene')
+
+    # ── Rendering ───────────────────────────────────────────────────────────
+    def render(self, frame, dpi=100):
+        """RGBA image (h, w, 4) of one frame at `dpi`, shaped as Agg drew it."""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.draw(frame)
+        fig, canvas, screen_dpi = self.fig, self.fig.canvas, self.fig.dpi
+        agg = FigureCanvasAgg(fig)
+        try:
+            fig.set_dpi(dpi)
+            agg.draw()
+            return np.asarray(agg.buffer_rgba()).copy()
+        finally:
+            fig.set_dpi(screen_dpi)
+            fig.set_canvas(canvas)
+
+    def cache_dir(self, dpi):
+        """Frame cache directory for this scene's sources, overrides, fps and dpi."""
+        opts = options.current()
+        key = hashlib.sha256(json.dumps(
+            [sources_digest(), self.name, sorted(opts.overrides), opts.fps,
+             sorted(getattr(opts, 'flags', [])), self.fps, float(dpi)]).encode()).hexdigest()[:20]
+        return os.path.join(FRAME_CACHE, self.name, key)
+
+    def frames(self, frames=None, dpi=100, fmt='gif', jobs=1, cache=True):
+        """
+        Yield encoded frames (PIL images) in order.  Cached frames are
+        read back; the rest are rendered here or by `jobs` worker
+        processes that each rebuild the scene, and stored in the cache.
+        """
+        frames = list(range(self.n_frames)) if frames is None else list(frames)
+        directory = _open_cache(self.cache_dir(dpi)) if cache and self.source else None
+        hits = set(_cached_frames(directory, frames))
+        missing = [f for f in frames if f not in hits]
+        if jobs <= 1 or self.source is None or len(missing) < 2:
+            rendered = (_render_frame(self, f, dpi, fmt, directory) for f in missing)
+            yield from _merge(frames, hits, rendered, directory, fmt)
+            return
+        chunks = [c.tolist() for c in np.array_split(missing, min(len(missing), 4 * jobs))]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_worker_init,
+                                 initargs=(self.source, options.current())) as pool:
+            rendered = (image for images in pool.map(
+                _worker_render, [(c, dpi, fmt, directory) for c in chunks]) for image in images)
+            yield from _merge(frames, hits, rendered, directory, fmt)
+
+    def animation(self, frames=None, blit=False):
+        """`FuncAnimation` over the given frames (default all)."""
+        import matplotlib.animation as animation
+        return animation.FuncAnimation(
+            self.fig, self.draw, frames=range(self.n_frames) if frames is None else frames,
+            init_func=self.init, interval=1000 / self.fps, blit=blit)
+
+    def show(self, frames=None):
+        import matplotlib.pyplot as plt
+        self._ani = self.animation(frames)      # keep a reference while shown
+        plt.show()
+
+    def save(self, path=None, fmt='gif', dpi=100, frames=None, jobs=1, cache=True):
+        """Render to `path` (default <name><ext>); returns the path."""
+        path = path or self.name + EXTENSIONS[fmt]
+        images = self.frames(frames, dpi, fmt, jobs, cache)
+        duration = 1000 / self.fps
+        if fmt in ('gif', 'apng'):
+            first = next(images)
+            first.save(path, format='GIF' if fmt == 'gif' else 'PNG', save_all=True,
+                       append_images=list(images), duration=duration, loop=0)
+        elif fmt == 'png':
+            os.makedirs(path, exist_ok=True)
+            for f, image in zip(frames or range(self.n_frames), images):
+                image.save(os.path.join(path, f'{f:04d}.png'))
+        elif fmt == 'mp4':
+            _write_mp4(path, images, self.fps)
+        return path
+
+    def run(self):
+        """Script entry point: show the scene, or save it when asked to."""
+        opts = options.current()
+        frames = options.parse_frames(opts.frames, self.n_frames)
+        if not (opts.save or opts.output):
+            self.show(frames)
+            return
+        path = opts.output or self.name + EXTENSIONS[opts.format]
+        print(f"Saving {path} …")
+        start = time.perf_counter()
+        self.save(path, opts.format, opts.dpi, frames, opts.jobs, not opts.no_cache)
+        print(f"Saved ({len(frames)} frames, {time.perf_counter() - start:.1f} s).")
+
+
+def _encode(rgba, fmt):
+    """PIL image for one RGBA (or RGB) frame: palette for GIF, RGB otherwise."""
+    from PIL import Image
+    image = Image.fromarray(rgba[..., :3])
+    return image.quantize(256) if fmt == 'gif' else image
+
+
+# ── Frame cache ─────────────────────────────────────────────────────────────
+def _open_cache(directory):
+    """Create (or touch) a cache directory, keeping the newest FRAME_CACHE_KEYS per scene."""
+    os.makedirs(directory, exist_ok=True)
+    os.utime(directory)
+    scene_dir = os.path.dirname(directory)
+    keys = sorted((os.path.join(scene_dir, k) for k in os.listdir(scene_dir)),
+                  key=os.path.getmtime, reverse=True)
+    for stale in keys[FRAME_CACHE_KEYS:]:
+        shutil.rmtree(stale, ignore_errors=True)
+    return directory
+
+
+def _frame_path(directory, frame):
+    return os.path.join(directory, f'{frame:05d}.png')
+
+
+def _cached_frames(directory, frames):
+    if directory is None:
+        return []
+    return [f for f in frames if os.path.exists(_frame_path(directory, f))]
+
+
+def _render_frame(scene, frame, dpi, fmt, directory):
+    """Encoded frame, rendered and (when `directory` is set) written to the cache."""
+    from PIL import Image
+    rgb = scene.render(frame, dpi)[..., :3]
+    if directory is not None:
+        path = _frame_path(directory, frame)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        Image.fromarray(rgb).save(tmp, format='PNG', compress_level=1)
+        os.replace(tmp, path)
+    return _encode(rgb, fmt)
+
+
+def _merge(frames, hits, rendered, directory, fmt):
+    """Frames in order: cached ones read back, the others taken from `rendered`."""
+    from PIL import Image
+    for f in frames:
+        if f in hits:
+            with Image.open(_frame_path(directory, f)) as image:
+                yield _encode(np.asarray(image.convert('RGB')), fmt)
+        else:
+            yield next(rendered)
+
+
+def _write_mp4(path, images, fps):
+    """Pipe RGB frames to ffmpeg (H.264, yuv420p)."""
+    proc = None
+    for image in images:
+        if proc is None:
+            w, h = image.size
+            cmd = [matplotlib.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                   '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{w}x{h}', '-r', str(fps),
+                   '-i', '-', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                   '-pix_fmt', 'yuv420p', path]
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        proc.stdin.write(image.tobytes())
+    if proc is not None:
+        proc.stdin.close()
+        if proc.wait():
+            raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
+
+
+# ── Loading scripts ─────────────────────────────────────────────────────────
+def discover(directory=SCRIPT_DIR):
+    """{scene name: script path} for the numbered animation scripts."""
+    paths = sorted(glob.glob(os.path.join(directory, '[0-9][0-9]_*.py')))
+    return {options.scene_name(p): p for p in paths}
+
+
+def load_scene(path, opts):
+    """Import an animation script under `opts` and return its `scene`."""
+    options.activate(opts)
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = '_astroanim_' + options.scene_name(path)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.scene
+
+
+_worker_scene = None
+
+
+def _worker_init(source, opts):
+    global _worker_scene
+    matplotlib.use('Agg', force=True)
+    _worker_scene = load_scene(source, opts)
+
+
+def _worker_render(task):
+    frames, dpi, fmt, directory = task
+    return [_render_frame(_worker_scene, f, dpi, fmt, directory) for f in frames]
@@ -0,0 +1,224 @@
+"""
+Parameter sweeps: one compact thumbnail per point of a parameter grid,
+plus a contact sheet.
+
+  python -m astroanim.sweep transit                       # default grid
+  python -m astroanim.sweep transit --grid R_PLANET=0.05,0.1,0.15 \\
+                                    --grid IMPACT=0:0.85:4 --jobs 4
+  python -m astroanim.sweep microlensing --steps 40       # animated thumbnails
+
+  - The physics of every variant is computed up front in one batched
+    call (`Gallery.physics`), before any drawing
+  - Static layers (axes, backgrounds, labels, legends) are identical for
+    every variant, so each worker renders them once and keeps the
+    raster; a variant only redraws its own artists on top (blitting)
+  - Variants are split across worker processes
+"""
+
+import os
+import abc
+import sys
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib
+
+from .palette import BG
+from .scene import SCRIPT_DIR
+
+
+# ── Grids ───────────────────────────────────────────────────────────────────
+def parse_axis(spec):
+    """'R_PLANET=0.05,0.1,0.15' or 'IMPACT=0:0.85:4' (linspace) → (name, values)."""
+    name, sep, values = spec.partition('=')
+    if not sep:
+        raise SystemExit(f"--grid expects NAME=v1,v2,… or NAME=start:stop:n, got {spec!r}")
+    if ':' in values:
+        start, stop, n = values.split(':')
+        return name.strip(), np.linspace(float(start), float(stop), int(n)).tolist()
+    return name.strip(), [float(v) for v in values.split(',')]
+
+
+def variants(defaults, grid):
+    """Every point of the grid {name: values} as a full parameter dict."""
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise SystemExit(f"unknown sweep parameters {sorted(unknown)}; "
+                         f"choose from {', '.join(defaults)}")
+    names = list(grid)
+    return [dict(defaults, **dict(zip(names, point)))
+            for point in itertools.product(*(grid[n] for n in names))]
+
+
+# ── Gallery base class ──────────────────────────────────────────────────────
+class Gallery(abc.ABC):
+    """
+    Compact figure for one scene's parameter sweep.
+
+    Subclasses set `params` (sweepable parameters and their defaults),
+    `grid` (the default sweep) and implement `physics`, `build` and
+    `draw`.  Artists returned by `build` must be the only ones that
+    depend on the variant; everything else is a static layer.
+    """
+    name = None
+    params = {}
+    grid = {}
+    swept = ()                       # names being swept, set by `render`
+    n_frames = 120
+    still = None                     # frame for still thumbnails (default: last)
+    figsize = (4.8, 2.4)
+
+    @abc.abstractmethod
+    def physics(self, variants):
+        """Batched arrays for all variants (leading axis = variant)."""
+
+    @abc.abstractmethod
+    def build(self, fig, data):
+        """Draw the static layers; return the list of per-variant artists."""
+
+    @abc.abstractmethod
+    def draw(self, artists, data, i, frame):
+        """Set the per-variant artists for variant i at `frame`."""
+
+    def label(self, variant):
+        return '  '.join(f'{k} = {variant[k]:g}' for k in self.swept)
+
+
+# ── Rendering ───────────────────────────────────────────────────────────────
+_worker = {}
+
+
+def _worker_init(gallery, data, dpi):
+    """Build the figure and rasterise its static layers once per process."""
+    import matplotlib.pyplot as plt
+    matplotlib.use('Agg', force=True)
+    fig = plt.figure(figsize=gallery.figsize, dpi=dpi, facecolor=BG)
+    artists = gallery.build(fig, data)
+    for a in artists:
+        a.set_animated(True)
+    fig.canvas.draw()
+    _worker.update(gallery=gallery, data=data, fig=fig, artists=artists,
+                   background=fig.canvas.copy_from_bbox(fig.bbox))
+
+
+def _worker_render(task):
+    """Thumbnail frames (RGB arrays) for each (variant, frames) in `task`."""
+    g, fig, artists = _worker['gallery'], _worker['fig'], _worker['artists']
+    out = []
+    for i, frames in task:
+        images = []
+        for frame in frames:
+            fig.canvas.restore_region(_worker['background'])
+            g.draw(artists, _worker['data'], i, frame)
+            for a in artists:
+                fig.draw_artist(a)
+            images.append(np.asarray(fig.canvas.buffer_rgba())[..., :3].copy())
+        out.append((i, images))
+    return out
+
+
+def render(gallery, grid=None, out='gallery', steps=1, dpi=100, jobs=1, columns=None):
+    """
+    Render every variant of `grid` (default `gallery.grid`) as a PNG
+    thumbnail (an animated GIF when steps > 1) and a contact sheet.
+    Returns timings and the written paths.
+    """
+    from PIL import Image
+    grid = dict(gallery.grid if grid is None else grid)
+    points = variants(gallery.params, grid)
+    gallery.swept = tuple(grid)
+    os.makedirs(out, exist_ok=True)
+
+    start = time.perf_counter()
+    data = gallery.physics(points)
+    t_physics = time.perf_counter() - start
+
+    last = gallery.n_frames - 1
+    frames = [last if gallery.still is None else gallery.still] if steps <= 1 else \
+        np.linspace(0, last, steps).round().astype(int).tolist()
+    tasks = [[(i, frames) for i in chunk]
+             for chunk in np.array_split(np.arange(len(points)), max(1, min(len(points), 4 * jobs)))
+             if len(chunk)]
+
+    start = time.perf_counter()
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_worker_init,
+                                 initargs=(gallery, data, dpi)) as pool:
+            results = [r for part in pool.map(_worker_render, tasks) for r in part]
+    else:
+        _worker_init(gallery, data, dpi)
+        results = [r for task in tasks for r in _worker_render(task)]
+    t_render = time.perf_counter() - start
+
+    paths, stills = [], {}
+    for i, images in sorted(results, key=lambda r: r[0]):
+        pil = [Image.fromarray(im) for im in images]
+        stills[i] = pil[-1]
+        if len(pil) > 1:
+            path = os.path.join(out, f'{gallery.name}_{i:02d}.gif')
+            pil[0].save(path, save_all=True, append_images=pil[1:],
+                        duration=1000 * gallery.n_frames / 30 / len(pil), loop=0)
+        else:
+            path = os.path.join(out, f'{gallery.name}_{i:02d}.png')
+            pil[0].save(path)
+        paths.append(path)
+
+    columns = columns or len(list(grid.values())[-1])
+    sheet = contact_sheet([stills[i] for i in range(len(points))], columns)
+    sheet_path = os.path.join(out, f'{gallery.name}_sheet.png')
+    sheet.save(sheet_path)
+    return {'variants': len(points), 'frames_per_variant': len(frames),
+            'physics_s': t_physics, 'render_s': t_render,
+            'thumbnails': paths, 'sheet': sheet_path}
+
+
+def contact_sheet(images, columns, gap=6):
+    """Grid of equally sized PIL images on the background colour."""
+    from PIL import Image
+    w, h = images[0].size
+    rows = -(-len(images) // columns)
+    sheet = Image.new('RGB', (columns * (w + gap) + gap, rows * (h + gap) + gap),
+                      matplotlib.colors.to_hex(BG))
+    for k, im in enumerate(images):
+        r, c = divmod(k, columns)
+        sheet.paste(im, (gap + c * (w + gap), gap + r * (h + gap)))
+    return sheet
+
+
+# ── Command line ────────────────────────────────────────────────────────────
+def main(argv=None):
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    from .galleries import GALLERIES
+
+    parser = argparse.ArgumentParser(prog='python -m astroanim.sweep',
+                                     description='Render a parameter-sweep gallery')
+    parser.add_argument('scene', choices=sorted(GALLERIES))
+    parser.add_argument('--grid', action='append', default=[], metavar='NAME=VALUES',
+                        help="swept parameter, e.g. 'Q=0.0003,0.001,0.005' or "
+                             "'U_MIN=0.05:0.3:4' (repeatable; default grid if omitted)")
+    parser.add_argument('--steps', type=int, default=1,
+                        help='frames per thumbnail (1 = a still)')
+    parser.add_argument('--dpi', type=float, default=100)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--columns', type=int, default=None,
+                        help='contact sheet columns (default: values of the last axis)')
+    parser.add_argument('--out', default='gallery')
+    args = parser.parse_args(argv)
+
+    matplotlib.use('Agg')
+    gallery = GALLERIES[args.scene]()
+    grid = dict(parse_axis(g) for g in args.grid) or None
+    result = render(gallery, grid, args.out, args.steps, args.dpi, args.jobs, args.columns)
+    print(f"{args.scene}: {result['variants']} variants × {result['frames_per_variant']} frames")
+    print(f"  physics (one batched call): {result['physics_s']*1e3:.0f} ms")
+    print(f"  rendering ({args.jobs} jobs, static layers drawn once per worker): "
+          f"{result['render_s']:.2f} s")
+    print(f"  contact sheet → {result['sheet']}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
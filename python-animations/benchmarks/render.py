@@ -0,0 +1,253 @@
+"""
+Rendering Benchmarks — per-scene timing, memory and output size
+================================================================
+Runs every animation script in its own process and measures:
+
+  - precompute_s : script import up to the figure (physics tables, orbits,
+                   light curves — everything computed before drawing)
+  - figure_s     : building the figure and its static artists
+  - draw_ms      : median per-frame draw with a full canvas redraw
+  - blit_ms      : median per-frame draw blitting only the artists the
+                   frame function returns onto a cached background
+  - save_s       : wall time of `Scene.save` — what `--save` spends
+                   after import
+  - encode_s     : part of save_s spent quantising and writing the file
+  - peak_rss_mb  : peak resident memory of the scene's process
+  - file_kb      : size of the saved animation
+
+Results are written as JSON.  With `--baseline` every metric is compared
+against a stored run; metrics slower than the tolerance are flagged and
+the exit status is 1, so regressions show up in review.
+
+Usage:
+  python benchmarks/render.py                              # all scenes
+  python benchmarks/render.py transit --frames 0:270:5     # quicker subset
+  python benchmarks/render.py --json benchmarks/baseline.json        # store a baseline
+  python benchmarks/render.py --baseline benchmarks/baseline.json    # compare
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+METRICS = ('precompute_s', 'figure_s', 'draw_ms', 'blit_ms', 'save_s',
+           'encode_s', 'peak_rss_mb', 'file_kb')
+NOISE_FLOOR = {'precompute_s': 0.05, 'figure_s': 0.05, 'draw_ms': 2.0, 'blit_ms': 2.0,
+               'save_s': 0.2, 'encode_s': 0.1, 'peak_rss_mb': 10.0, 'file_kb': 10.0}
+
+
+# ── One scene (runs in a child process) ─────────────────────────────────────
+def measure(path, frames_spec=None, fmt='gif', dpi=100, samples=20):
+    """Metrics for one script; must run in a fresh process (peak RSS)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from PIL import Image
+    import astroanim
+    from astroanim import options, scene as scene_mod
+
+    # Split import time at the first astroanim.figure() call: everything
+    # before it is physics precompute, everything after is figure setup
+    marks = {}
+    figure = astroanim.figure
+
+    def timed_figure(*args, **kw):
+        marks.setdefault('figure', time.perf_counter())
+        return figure(*args, **kw)
+
+    astroanim.figure = timed_figure
+    opts = options.build_parser().parse_args([])
+    opts.batch, opts.flags = False, []
+    start = time.perf_counter()
+    scene = scene_mod.load_scene(path, opts)
+    loaded = time.perf_counter()
+    astroanim.figure = figure
+
+    fig = scene.fig
+    fig.set_dpi(dpi)
+    canvas = fig.canvas
+    picks = np.linspace(0, scene.n_frames - 1, samples).round().astype(int)
+
+    # Full redraw per frame
+    scene.draw(int(picks[0])); canvas.draw()                  # warm-up
+    draw = []
+    for f in picks:
+        t0 = time.perf_counter()
+        scene.draw(int(f))
+        canvas.draw()
+        draw.append(time.perf_counter() - t0)
+
+    # Blitting: static layers rasterised once, animated artists redrawn
+    artists = [a for a in scene.draw(int(picks[0])) if a.get_visible()]
+    for a in artists:
+        a.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    blit = []
+    for f in picks:
+        t0 = time.perf_counter()
+        canvas.restore_region(background)
+        for a in scene.draw(int(f)):
+            fig.draw_artist(a)
+        canvas.blit(fig.bbox)
+        blit.append(time.perf_counter() - t0)
+    for a in artists:
+        a.set_animated(False)
+
+    # Save, timing the two encoding stages (per-frame quantise, file write)
+    encode = [0.0]
+
+    def timed(fn):
+        def wrapper(*args, **kw):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kw)
+            finally:
+                encode[0] += time.perf_counter() - t0
+        return wrapper
+
+    scene_mod._encode = timed(scene_mod._encode)
+    Image.Image.save = timed(Image.Image.save)
+    frames = options.parse_frames(frames_spec, scene.n_frames)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, scene.name + scene_mod.EXTENSIONS[fmt])
+        t0 = time.perf_counter()
+        scene.save(out, fmt, dpi, frames, cache=False)
+        save = time.perf_counter() - t0
+        if os.path.isdir(out):
+            size = sum(os.path.getsize(os.path.join(out, f)) for f in os.listdir(out))
+        else:
+            size = os.path.getsize(out)
+
+    return {
+        'frames': len(frames),
+        'precompute_s': marks.get('figure', loaded) - start,
+        'figure_s': loaded - marks.get('figure', loaded),
+        'draw_ms': 1e3 * float(np.median(draw)),
+        'blit_ms': 1e3 * float(np.median(blit)),
+        'save_s': save,
+        'encode_s': encode[0],
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'file_kb': size / 1024,
+    }
+
+
+# ── Suite ───────────────────────────────────────────────────────────────────
+def run(names, frames_spec=None, fmt='gif', dpi=100, samples=20):
+    """{scene: metrics}, each scene measured in its own interpreter."""
+    from astroanim import discover
+    from astroanim.batch import select
+    available = discover()
+    results = {}
+    for name in select(names, available):
+        cmd = [sys.executable, os.path.abspath(__file__), '--child', available[name],
+               '--format', fmt, '--dpi', str(dpi), '--samples', str(samples)]
+        if frames_spec:
+            cmd += ['--frames', frames_spec]
+        proc = subprocess.run(cmd, cwd=SCRIPT_DIR, capture_output=True, text=True)
+        if proc.returncode:
+            raise SystemExit(f"{name} failed:\n{proc.stderr}")
+        results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(format_row(name, results[name]), flush=True)
+    return results
+
+
+def environment():
+    import matplotlib
+    import PIL
+    return {'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'matplotlib': matplotlib.__version__, 'pillow': PIL.__version__,
+            'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def compare(results, baseline, tolerance=0.20):
+    """
+    Rows (scene, metric, old, new, change, worse) and whether any metric got
+    worse by more than `tolerance` (relative) and its noise floor.
+    """
+    rows, regressed = [], False
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for metric in METRICS:
+            if metric not in old:
+                continue
+            a, b = old[metric], new[metric]
+            change = (b - a) / a if a else 0.0
+            worse = change > tolerance and b - a > NOISE_FLOOR[metric]
+            regressed |= worse
+            rows.append((name, metric, a, b, change, worse))
+    return rows, regressed
+
+
+HEADER = (f"{'scene':18s} {'frames':>6s} {'precomp':>8s} {'figure':>7s} {'draw':>8s} "
+          f"{'blit':>8s} {'save':>7s} {'encode':>7s} {'RSS':>7s} {'file':>8s}")
+
+
+def format_row(name, m):
+    return (f"{name:18s} {m['frames']:6d} {m['precompute_s']:7.2f}s {m['figure_s']:6.2f}s "
+            f"{m['draw_ms']:6.1f}ms {m['blit_ms']:6.1f}ms {m['save_s']:6.1f}s "
+            f"{m['encode_s']:6.1f}s {m['peak_rss_mb']:5.0f}MB {m['file_kb']:6.0f}kB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('scenes', nargs='*', help='scene names (default: all)')
+    parser.add_argument('--frames', default=None, metavar='SPEC',
+                        help="frames saved, e.g. '0:300:5' (default: all)")
+    parser.add_argument('--format', default='gif', choices=('gif', 'apng', 'png', 'mp4'))
+    parser.add_argument('--dpi', type=float, default=100)
+    parser.add_argument('--samples', type=int, default=20,
+                        help='frames timed for the per-frame draw medians')
+    parser.add_argument('--json', default=None, metavar='PATH', help='write results here')
+    parser.add_argument('--baseline', default=None, metavar='PATH',
+                        help='compare against a stored results file')
+    parser.add_argument('--tolerance', type=float, default=0.20,
+                        help='relative slowdown flagged as a regression')
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.frames, args.format, args.dpi,
+                                 args.samples)))
+        return
+
+    print(HEADER)
+    results = run(args.scenes, args.frames, args.format, args.dpi, args.samples)
+    report = {'environment': environment(),
+              'settings': {'format': args.format, 'dpi': args.dpi, 'frames': args.frames,
+                           'samples': args.samples},
+              'scenes': results}
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Results → {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        if baseline.get('settings') != report['settings']:
+            print(f"warning: baseline settings differ: {baseline.get('settings')}")
+        rows, regressed = compare(results, baseline['scenes'], args.tolerance)
+        print(f"\nAgainst {args.baseline} (recorded {baseline['environment']['date']}):")
+        for name, metric, a, b, change, worse in rows:
+            flag = '  ← REGRESSION' if worse else ''
+            print(f"  {name:18s} {metric:12s} {a:10.2f} → {b:10.2f}  {change:+7.1%}{flag}")
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
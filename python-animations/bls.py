@@ -0,0 +1,265 @@
+"""
+Box Least Squares — Transit Search
+==================================
+Searches a (long, multi-transit) light curve for periodic box-shaped
+dips, following Kovács, Zucker & Mazeh (2002).
+
+Algorithm:
+  - Light curve is phase-folded for a whole chunk of trial periods at
+    once and binned with `np.bincount`
+  - Cumulative sums over the (wrapped) phase bins make every trial
+    duration / epoch an O(1) difference, so each period costs O(N_bins)
+    after folding, vectorised over all durations
+  - Period chunks are farmed out to a process pool (`n_jobs`)
+
+Signal residue for a box holding weight r and weighted flux sum s
+(data centred on its weighted mean):
+    SR = s² / (r (1 − r))         depth = −s / (r (1 − r))
+
+Usage:
+  python bls.py                              # search a simulated light curve
+  python bls.py --benchmark                  # injection-recovery benchmark
+  python bls.py --benchmark --curves 5000 --jobs 4
+"""
+
+import sys
+import time
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import transit_model
+
+BLSResult = namedtuple('BLSResult',
+                       ['periods', 'power', 'duration', 't0', 'depth'])
+
+# ── Search grids ────────────────────────────────────────────────────────────
+def period_grid(baseline, min_period, max_period, min_duration, oversample=3):
+    """
+    Trial periods uniform in frequency, fine enough that a transit at the
+    end of the baseline drifts by less than `min_duration / oversample`.
+    """
+    df = min_duration / (oversample * baseline**2)
+    freqs = np.arange(1.0 / max_period, 1.0 / min_period, df)
+    return np.sort(1.0 / freqs)
+
+
+def duration_grid(min_duration, max_duration, n=8):
+    """Logarithmically spaced trial durations."""
+    return np.geomspace(min_duration, max_duration, n)
+
+
+# ── Core search ─────────────────────────────────────────────────────────────
+def _bls_chunk(args):
+    """BLS over one chunk of trial periods (runs inside pool workers)."""
+    t, y, w, periods, durations, oversample = args
+    n_p = len(periods)
+
+    # Phase resolution chosen so the shortest box at the longest period
+    # still spans `oversample` bins
+    n_bins = int(np.ceil(oversample * periods.max() / durations.min()))
+    m = np.rint(durations[None, :] / periods[:, None] * n_bins).astype(np.int64)
+    valid = durations[None, :] < 0.5 * periods[:, None]
+    m = np.clip(m, 1, n_bins - 1)
+    m_max = int(m.max())
+
+    # Fold + bin every period of the chunk in one bincount
+    phase = np.multiply.outer(1.0 / periods, t)
+    phase -= np.floor(phase)
+    phase *= n_bins
+    bins = np.minimum(phase.astype(np.int64), n_bins - 1)
+    bins += (np.arange(n_p) * n_bins)[:, None]
+    size = n_p * n_bins
+    S = np.bincount(bins.ravel(), weights=np.broadcast_to(w * y, bins.shape).ravel(),
+                    minlength=size).reshape(n_p, n_bins)
+    R = np.bincount(bins.ravel(), weights=np.broadcast_to(w, bins.shape).ravel(),
+                    minlength=size).reshape(n_p, n_bins)
+
+    # Wrapped cumulative sums: box [i, i+m) is cs[i+m] − cs[i]
+    def wrapped_cumsum(a):
+        a = np.concatenate([a, a[:, :m_max]], axis=1)
+        return np.concatenate([np.zeros((n_p, 1)), np.cumsum(a, axis=1)], axis=1)
+    cs_S = wrapped_cumsum(S)
+    cs_R = wrapped_cumsum(R)
+
+    # Gather flat indices once and reuse them for both sums
+    stop = (np.arange(n_bins)[None, None, :] + m[:, :, None]
+            + (np.arange(n_p) * cs_S.shape[1])[:, None, None])
+    s = cs_S.ravel()[stop] - cs_S[:, None, :n_bins]
+    r = cs_R.ravel()[stop] - cs_R[:, None, :n_bins]
+
+    denom = r * (1.0 - r)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        power = s * s / denom
+    power[(s >= 0) | (denom <= 0) | ~valid[:, :, None]] = 0.0
+
+    flat = power.reshape(n_p, -1).argmax(axis=1)
+    i_dur, i_start = np.unravel_index(flat, power.shape[1:])
+    rows = np.arange(n_p)
+    best_s = s[rows, i_dur, i_start]
+    best_r = r[rows, i_dur, i_start]
+    best_m = m[rows, i_dur]
+
+    return (power[rows, i_dur, i_start],
+            durations[i_dur],
+            np.mod((i_start + 0.5 * best_m) / n_bins, 1.0) * periods,
+            np.where(best_r > 0, -best_s / np.maximum(best_r * (1 - best_r), 1e-300), 0.0))
+
+
+def bls(t, flux, periods, durations, flux_err=None, oversample=4,
+        chunk_size=256, n_jobs=1):
+    """
+    Box Least Squares periodogram.
+
+    Parameters
+    ----------
+    t, flux   : observation times and fluxes (any units)
+    periods   : trial periods (same units as t)
+    durations : trial transit durations (same units as t)
+    flux_err  : per-point uncertainties (uniform weights if omitted)
+    n_jobs    : worker processes; period chunks are spread across them
+
+    Returns a `BLSResult` with, per trial period, the best signal residue
+    power and the duration, mid-transit epoch and depth that produced it.
+    """
+    t = np.asarray(t, float)
+    y = np.asarray(flux, float)
+    periods = np.asarray(periods, float)
+    durations = np.sort(np.asarray(durations, float))
+
+    w = np.ones_like(y) if flux_err is None else 1.0 / np.asarray(flux_err, float)**2
+    w = w / w.sum()
+    y = y - np.dot(w, y)
+    t_ref = t.min()
+    t = t - t_ref
+
+    order = np.argsort(periods)
+    sorted_p = periods[order]
+    tasks = [(t, y, w, sorted_p[i:i + chunk_size], durations, oversample)
+             for i in range(0, len(sorted_p), chunk_size)]
+
+    if n_jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_bls_chunk, tasks))
+    else:
+        parts = [_bls_chunk(task) for task in tasks]
+
+    power, dur, t0, depth = (np.concatenate(col) for col in zip(*parts))
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return BLSResult(periods, power[inverse], dur[inverse],
+                     t0[inverse] + t_ref, depth[inverse])
+
+
+def best_period(result):
+    """Period, epoch, duration and depth of the strongest BLS peak."""
+    i = int(np.argmax(result.power))
+    return (result.periods[i], result.t0[i],
+            result.duration[i], result.depth[i])
+
+
+# ── Injection–recovery benchmark ────────────────────────────────────────────
+def transit_duration(period_days, rp, b, m_star=1.0, r_star=1.0):
+    """First-to-fourth contact duration (days) for a circular orbit."""
+    a_rs = 215.03 * (m_star * (period_days / 365.25)**2)**(1/3) / r_star
+    chord = np.sqrt(np.maximum((1 + rp)**2 - b**2, 0.0))
+    return period_days / np.pi * np.arcsin(np.minimum(chord / a_rs, 1.0))
+
+
+def _recover(args):
+    t, fluxes, periods, durations = args
+    return [best_period(bls(t, f, periods, durations, oversample=2))[0]
+            for f in fluxes]
+
+
+def injection_recovery(n_curves=2000, baseline=27.0, cadence_min=30.0,
+                       noise_ppm=180.0, min_period=1.0, max_period=8.0,
+                       n_jobs=1, seed=0):
+    """
+    Inject random transits into synthetic light curves, run BLS on each
+    and report the recovery fraction and throughput (curves / second).
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(0.0, baseline, cadence_min / 1440.0)
+
+    P = rng.uniform(min_period, max_period, n_curves)
+    rp = rng.uniform(0.05, 0.15, n_curves)
+    b = rng.uniform(0.0, 0.7, n_curves)
+    t0 = rng.uniform(0.0, P)
+    dur = transit_duration(P, rp, b)
+
+    t_gen = time.perf_counter()
+    fluxes = transit_model.light_curve(t[None, :], P[:, None], t0[:, None],
+                                       dur[:, None], rp[:, None], b[:, None],
+                                       noise=noise_ppm * 1e-6, rng=rng)
+    t_gen = time.perf_counter() - t_gen
+
+    periods = period_grid(baseline, min_period, max_period,
+                          min_duration=dur.min(), oversample=1)
+    durations = duration_grid(dur.min(), dur.max(), 6)
+
+    t_search = time.perf_counter()
+    batches = np.array_split(np.arange(n_curves), max(1, 4 * n_jobs))
+    tasks = [(t, fluxes[idx], periods, durations) for idx in batches if len(idx)]
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            found = np.concatenate([np.asarray(r) for r in pool.map(_recover, tasks)])
+    else:
+        found = np.concatenate([np.asarray(_recover(task)) for task in tasks])
+    t_search = time.perf_counter() - t_search
+
+    recovered = np.abs(found / P - 1.0) < 0.01
+    return {
+        'n_curves': n_curves,
+        'n_points': len(t),
+        'n_periods': len(periods),
+        'n_durations': len(durations),
+        'generate_s': t_gen,
+        'search_s': t_search,
+        'curves_per_s': n_curves / t_search,
+        'recovery_fraction': float(recovered.mean()),
+    }
+
+
+# ── CLI ─────────────────────────────────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--benchmark', action='store_true',
+                        help='run the injection-recovery benchmark')
+    parser.add_argument('--curves', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        stats = injection_recovery(args.curves, n_jobs=args.jobs, seed=args.seed)
+        print(f"{stats['n_curves']} curves × {stats['n_points']} points, "
+              f"{stats['n_periods']} periods × {stats['n_durations']} durations")
+        print(f"  generation : {stats['generate_s']:.2f} s")
+        print(f"  search     : {stats['search_s']:.2f} s  "
+              f"({stats['curves_per_s']:.1f} curves/s)")
+        print(f"  recovered  : {stats['recovery_fraction']*100:.1f}%")
+        return
+
+    # Single search on a Kepler-like hot Jupiter (same Rp/R★ and noise as
+    # the transit animation), one 27-day sector at 30-minute cadence
+    rng = np.random.default_rng(args.seed)
+    t = np.arange(0.0, 27.0, 30.0 / 1440.0)
+    P_true, rp, b = 3.52, 0.13, 0.10
+    dur = transit_duration(P_true, rp, b)
+    flux = transit_model.light_curve(t, P_true, 1.3, dur, rp, b,
+                                     noise=180e-6, rng=rng)
+    periods = period_grid(np.ptp(t), 1.0, 10.0, min_duration=0.06, oversample=2)
+    start = time.perf_counter()
+    res = bls(t, flux, periods, duration_grid(0.06, 0.3), n_jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+    P, t0, D, depth = best_period(res)
+    print(f"{len(periods)} trial periods in {elapsed:.2f} s")
+    print(f"Injected P = {P_true:.4f} d   Recovered P = {P:.4f} d  "
+          f"t0 = {t0:.3f} d  duration = {D*24:.2f} h  depth = {depth*1e6:.0f} ppm")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
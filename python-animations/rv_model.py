@@ -0,0 +1,190 @@
+"""
+Radial Velocity Model — Keplerian orbits and periodograms
+=========================================================
+Array engine behind `02_radial_velocity.py`.
+
+Physics:
+  - Kepler's equation M = E − e sin E solved by Newton iteration over
+    whole time arrays (and whole planet systems) at once
+  - Stellar reflex velocity v_r = K [cos(ν + ω) + e cos ω]
+  - Multi-planet signals are a plain superposition along a planet axis
+  - Minimum mass from the full mass function (no small-K shortcuts)
+
+Periodogram:
+  - Generalised Lomb–Scargle (Zechmeister & Kürster 2009): floating
+    mean, per-point weights
+  - The trigonometric sums are evaluated on a regular frequency grid
+    with Press & Rybicki (1989) extirpolation + FFT, so a periodogram
+    of N points on N_f frequencies costs O(N + N_f log N_f)
+
+All angles are in radians, times and periods share the same unit.
+"""
+
+import numpy as np
+
+G_SI    = 6.674e-11
+M_SUN   = 1.989e30
+M_JUP   = 1.898e27
+DAY_S   = 86400.0
+
+# ── Kepler's equation ───────────────────────────────────────────────────────
+def solve_kepler(M, e, tol=1e-12, max_iter=50):
+    """Eccentric anomaly E for mean anomaly M (any shape, broadcast with e)."""
+    M, e = np.broadcast_arrays(np.asarray(M, float), np.asarray(e, float))
+    M = np.mod(M, 2*np.pi)
+    E = np.where(e < 0.8, M, np.pi)     # standard robust starting guess
+    for _ in range(max_iter):
+        f = E - e*np.sin(E) - M
+        dE = f / (1.0 - e*np.cos(E))
+        E = E - dE
+        if np.max(np.abs(dE), initial=0.0) < tol:
+            break
+    return E
+
+
+def true_anomaly(M, e):
+    """True anomaly ν for mean anomaly M."""
+    E = solve_kepler(M, e)
+    return 2.0 * np.arctan2(np.sqrt(1 + e) * np.sin(E / 2),
+                            np.sqrt(1 - e) * np.cos(E / 2))
+
+
+def mean_anomaly(t, period, tp):
+    """Mean anomaly at time t for periastron passage tp."""
+    return 2*np.pi * (t - tp) / period
+
+
+# ── Radial velocities ───────────────────────────────────────────────────────
+def rv_curve(t, period, K, e=0.0, omega=0.0, tp=0.0):
+    """Stellar radial velocity (units of K) for a single Keplerian orbit."""
+    nu = true_anomaly(mean_anomaly(t, period, tp), e)
+    return K * (np.cos(nu + omega) + e*np.cos(omega))
+
+
+def rv_system(t, period, K, e=0.0, omega=0.0, tp=0.0):
+    """
+    Superposed RV of several planets.
+
+    Orbital elements are 1-D arrays (one entry per planet); the result is
+    summed over planets and has the shape of `t`.
+    """
+    t = np.asarray(t, float)
+    el = [np.asarray(x, float).reshape((-1,) + (1,)*t.ndim)
+          for x in (period, K, e, omega, tp)]
+    return rv_curve(t[None, ...], *el).sum(axis=0)
+
+
+def orbit_position(t, period, e=0.0, omega=0.0, tp=0.0):
+    """
+    Orbital separation r/a and position angle θ = ν + ω of the star
+    relative to the centre of mass (the planet sits at θ + π).
+    """
+    nu = true_anomaly(mean_anomaly(t, period, tp), e)
+    r = (1 - e**2) / (1 + e*np.cos(nu))
+    return r, nu + omega
+
+
+def minimum_mass(period_days, K, e=0.0, m_star=1.0):
+    """
+    Planet minimum mass Mp sin(i) in Jupiter masses from the mass
+    function (iterated for the Mp ≪ M★ correction).
+    """
+    P = period_days * DAY_S
+    Ms = m_star * M_SUN
+    f = K**3 * (1 - e**2)**1.5 * P / (2*np.pi*G_SI)   # mass function (kg)
+    mp = (f * Ms**2)**(1/3)
+    for _ in range(5):
+        mp = (f * (Ms + mp)**2)**(1/3)
+    return mp / M_JUP
+
+
+# ── Fast generalised Lomb–Scargle ──────────────────────────────────────────
+def _extirpolate(x, y, n, order=4):
+    """
+    Spread the values y at fractional grid positions x onto an integer
+    grid of length n so that Σ y f(x) is preserved for smooth f
+    (Lagrange weights over `order` neighbours).
+    """
+    x = np.asarray(x, float)
+    y = np.asarray(y)
+    result = np.zeros(n, dtype=y.dtype)
+    exact = np.mod(x, 1) == 0
+    if exact.any():
+        np.add.at(result, x[exact].astype(int), y[exact])
+        x, y = x[~exact], y[~exact]
+    lo = np.clip((x - order // 2).astype(int), 0, n - order)
+    nodes = lo + np.arange(order)[:, None]
+    numerator = y * np.prod(x - nodes, axis=0)
+    denom = float(np.prod(np.arange(1, order)))    # (order−1)!
+    for j in range(order):
+        if j > 0:
+            denom *= j / (j - order)
+        ind = lo + (order - 1 - j)
+        w = numerator / (denom * (x - ind))
+        result += np.bincount(ind, weights=w.real, minlength=n)
+        if np.iscomplexobj(w):
+            result += 1j * np.bincount(ind, weights=w.imag, minlength=n)
+    return result
+
+
+def trig_sums(t, h, f0, df, n_freq, freq_factor=1, oversampling=5, order=4):
+    """
+    Σ h cos(2π f t) and Σ h sin(2π f t) on f = freq_factor·(f0 + k·df),
+    k = 0 … n_freq−1, via extirpolation onto a grid and one inverse FFT.
+    """
+    df = df * freq_factor
+    f0 = f0 * freq_factor
+    n_fft = 1 << int(np.ceil(np.log2(n_freq * oversampling)))
+    t0 = t.min()
+    h = h * np.exp(2j*np.pi * f0 * (t - t0)) if f0 > 0 else h.astype(complex)
+    tnorm = np.mod((t - t0) * n_fft * df, n_fft)
+    grid = _extirpolate(tnorm, h, n_fft, order)
+    sums = np.fft.ifft(grid)[:n_freq] * n_fft
+    f = f0 + df * np.arange(n_freq)
+    sums *= np.exp(2j*np.pi * t0 * f)
+    return sums.real, sums.imag
+
+
+def frequency_grid(t, samples_per_peak=5, nyquist_factor=5, f_min=None):
+    """(f0, df, n) of an automatic regular frequency grid for times t."""
+    baseline = np.ptp(t)
+    df = 1.0 / (samples_per_peak * baseline)
+    f0 = df / 2 if f_min is None else f_min
+    f_max = 0.5 * nyquist_factor * len(t) / baseline
+    return f0, df, int(np.ceil((f_max - f0) / df))
+
+
+def gls_periodogram(t, y, dy=None, f0=None, df=None, n_freq=None):
+    """
+    Generalised Lomb–Scargle periodogram (floating mean, weighted).
+
+    Returns (frequencies, power) with power normalised to [0, 1]
+    (fraction of χ² explained by the best-fit sinusoid at each frequency).
+    """
+    t = np.asarray(t, float)
+    y = np.asarray(y, float)
+    if f0 is None or df is None or n_freq is None:
+        f0, df, n_freq = frequency_grid(t)
+    w = np.ones_like(y) if dy is None else 1.0 / np.asarray(dy, float)**2
+    w = w / w.sum()
+    y = y - np.dot(w, y)
+
+    Ch, Sh = trig_sums(t, w, f0, df, n_freq)
+    C2, S2 = trig_sums(t, w, f0, df, n_freq, freq_factor=2)
+    YC, YS = trig_sums(t, w * y, f0, df, n_freq)
+
+    # Rotate to the frequency-dependent τ that decouples sin and cos terms
+    tan_2wt = (S2 - 2*Sh*Ch) / (C2 - (Ch*Ch - Sh*Sh))
+    C2w = 1 / np.sqrt(1 + tan_2wt**2)
+    S2w = tan_2wt * C2w
+    Cw = np.sqrt(0.5 * (1 + C2w))
+    Sw = np.sqrt(0.5 * (1 - C2w)) * np.sign(S2w)
+
+    YY = np.dot(w, y*y)
+    YCw = YC*Cw + YS*Sw
+    YSw = YS*Cw - YC*Sw
+    CC = 0.5*(1 + C2*C2w + S2*S2w) - (Ch*Cw + Sh*Sw)**2
+    SS = 0.5*(1 - C2*C2w - S2*S2w) - (Sh*Cw - Ch*Sw)**2
+
+    power = (YCw**2 / CC + YSw**2 / SS) / YY
+    return f0 + df*np.arange(n_freq), power
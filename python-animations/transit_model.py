@@ -0,0 +1,99 @@
+"""
+Transit Model — vectorised light-curve physics
+==============================================
+Array versions of the transit geometry used by `01_transit_method.py`,
+so whole light curves (or batches of light curves) can be built in a
+single NumPy expression.
+
+Physics:
+  - Exact circular-overlap area between star and planet discs
+  - Quadratic limb darkening: I(mu) = 1 - u1*(1-mu) - u2*(1-mu)^2
+  - Blocked flux weighted by the local intensity under the planet centre
+
+Every function broadcasts over its arguments, so `rp`, `b`, `period`
+etc. may be arrays of shape (n_curves, 1) against a time axis of
+shape (n_times,) to produce an (n_curves, n_times) batch.
+"""
+
+import numpy as np
+
+U1_SOLAR, U2_SOLAR = 0.40, 0.26   # quadratic limb darkening (solar-type)
+
+
+def circle_overlap(d, r1, r2):
+    """Area of intersection of two circles with radii r1, r2 separated by d."""
+    d, r1, r2 = np.broadcast_arrays(np.asarray(d, float),
+                                    np.asarray(r1, float),
+                                    np.asarray(r2, float))
+    cos_a = np.clip((r1**2 + d**2 - r2**2) / (2*r1*d + 1e-14), -1, 1)
+    cos_b = np.clip((r2**2 + d**2 - r1**2) / (2*r2*d + 1e-14), -1, 1)
+    a = np.arccos(cos_a)
+    b = np.arccos(cos_b)
+    lens = r1**2*(a - np.sin(a)*np.cos(a)) + r2**2*(b - np.sin(b)*np.cos(b))
+    rmin = np.minimum(r1, r2)
+    area = np.where(d + rmin <= np.maximum(r1, r2), np.pi * rmin**2, lens)
+    return np.where(d >= r1 + r2, 0.0, area)
+
+
+def limb_darkening(mu, u1=U1_SOLAR, u2=U2_SOLAR):
+    """Quadratic limb-darkening law I(mu) / I(1)."""
+    return 1.0 - u1*(1.0 - mu) - u2*(1.0 - mu)**2
+
+
+def disk_image(res=512, u1=U1_SOLAR, u2=U2_SOLAR):
+    """RGBA image (res, res, 4) of the limb-darkened disk spanning [-1, 1]²."""
+    x = np.linspace(-1.0, 1.0, res)
+    r2 = x[None, :]**2 + x[:, None]**2
+    mu = np.sqrt(np.clip(1.0 - r2, 0.0, 1.0))
+    brightness = np.maximum(0.05, limb_darkening(mu, u1, u2)) * 0.98
+    img = np.empty((res, res, 4))
+    img[..., 0] = np.minimum(1, brightness + 0.02)
+    img[..., 1] = np.minimum(1, brightness * 0.96)
+    img[..., 2] = np.minimum(1, brightness * 0.78)
+    img[..., 3] = r2 <= 1.0
+    return img
+
+
+def transit_flux(d, rp, u1=U1_SOLAR, u2=U2_SOLAR):
+    """
+    Normalised stellar flux with a planet of radius `rp` (stellar radii)
+    whose centre lies a projected distance `d` from the stellar centre.
+    """
+    d = np.abs(d)
+    overlap = circle_overlap(d, 1.0, rp)
+    r_centre = np.minimum(d, 1.0 - 1e-6)
+    mu = np.sqrt(np.maximum(0.0, 1.0 - r_centre**2))
+    local_I = limb_darkening(mu, u1, u2)
+    I_total = 1.0 - u1/3.0 - u2/6.0          # disk-integrated intensity
+    flux_drop = overlap / np.pi * local_I / I_total
+    return np.maximum(0.0, 1.0 - flux_drop)
+
+
+def sky_separation(t, period, t0, duration, rp, b):
+    """
+    Projected star–planet separation for a periodic transit.
+
+    The chord is crossed at constant speed so that first-to-fourth
+    contact takes `duration` (same time units as `t` and `period`).
+    """
+    phase = np.mod(t - t0 + 0.5*period, period) - 0.5*period
+    half_chord = np.sqrt(np.maximum((1.0 + rp)**2 - b**2, 1e-12))
+    x = phase / (0.5*duration) * half_chord
+    return np.sqrt(x**2 + b**2)
+
+
+def light_curve(t, period, t0, duration, rp, b=0.0, noise=0.0, rng=None,
+                u1=U1_SOLAR, u2=U2_SOLAR):
+    """
+    Multi-transit light curve sampled at times `t`.
+
+    `noise` is the Gaussian white-noise level in relative flux
+    (e.g. 180e-6 for 180 ppm).  Parameters broadcast, so passing
+    column vectors produces a batch of light curves in one call.
+    """
+    d = sky_separation(t, period, t0, duration, rp, b)
+    flux = transit_flux(d, rp, u1, u2)
+    if noise:
+        rng = np.random.default_rng() if rng is None else rng
+        flux = flux + rng.normal(0.0, 1.0, flux.shape) * noise
+    return flux
@@ -0,0 +1,68 @@
+"""
+Pre-rendered exoplanet detection animations served as static files.
+
+The APNGs in static/animations/ are built offline from python-animations
+(`python -m astroanim.assets`) and committed: the Docker and Railway
+builds only see this directory, so they cannot render them.  Each is a
+palette APNG kept under about 2 MB.  Pages embed them with zero
+per-request compute.  File names carry a content hash and URLs a
+matching `?v=` query, which makes Streamlit's static file server send a
+long-lived cache lifetime; `loading="lazy"` defers the download until
+the image scrolls into view (or its tab or expander opens).
+"""
+
+import os
+import json
+import html
+from functools import lru_cache
+
+import streamlit as st
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "animations")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+URL_PREFIX = "app/static/animations/"
+
+
+@lru_cache(maxsize=4)
+def _read_manifest(mtime: float) -> dict:
+    with open(MANIFEST_PATH) as fh:
+        return json.load(fh)
+
+
+def load_manifest() -> dict:
+    """Asset manifest ({} when the assets have not been built)."""
+    try:
+        return _read_manifest(os.path.getmtime(MANIFEST_PATH))
+    except (OSError, ValueError):
+        return {}
+
+
+def animations_available(*keys: str) -> bool:
+    """True when every given asset (or, with no keys, any asset) is built."""
+    manifest = load_manifest()
+    return all(k in manifest for k in keys) if keys else bool(manifest)
+
+
+def animation_html(key: str, caption: bool = True) -> str:
+    """Lazy-loaded <img> for one asset, or '' if it is missing."""
+    entry = load_manifest().get(key)
+    if entry is None:
+        return ""
+    src = f"{URL_PREFIX}{entry['file']}?v={entry['hash']}"
+    title = html.escape(entry["title"])
+    figcaption = (f'<figcaption style="color: #9ca3af; font-size: 0.85rem; margin-top: 0.4rem;">'
+                  f'<b style="color: #e5e7eb;">{title}</b> — {html.escape(entry["caption"])}'
+                  f'</figcaption>') if caption else ""
+    return (f'<figure style="margin: 0.5rem 0 1rem 0;">'
+            f'<img src="{src}" alt="{title}" loading="lazy" decoding="async" '
+            f'width="{entry["width"]}" height="{entry["height"]}" '
+            f'style="width: 100%; height: auto; border-radius: 8px;">'
+            f'{figcaption}</figure>')
+
+
+def render_animation(key: str, caption: bool = True) -> bool:
+    """Show one animation; returns False (and shows nothing) if it is missing."""
+    markup = animation_html(key, caption)
+    if markup:
+        st.markdown(markup, unsafe_allow_html=True)
+    return bool(markup)
@@ -6,12 +6,23 @@ Democratizing Space Education with Unique Perspectives
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime, date, timedelta
 import folium
 from streamlit_folium import st_folium
 import math
 
+from animation_assets import render_animation, animations_available
+import spectra
+import line_id
+import retrieval
+import transmission
+from figure_cache import render_png
+import exoarchive
+import lightcurves
+import lod
+import habitability
+import transits
+
 # Auth and Premium Features
 AUTH_AVAILABLE = False
 AUTH_ERROR = None
@@ -524,6 +535,10 @@ EXOPLANETS = [
     {"name": "Kepler-452b", "star": "Kepler-452", "distance_ly": 1400, "habitable": True, "year": 2015},
 ]
 
+# Full NASA Exoplanet Archive snapshots, when present in data/ (see exoarchive.py)
+EXO_ARCHIVE = exoarchive.load("pscomppars")
+TOI_ARCHIVE = exoarchive.load("toi")
+
 # ============== ASTROLOGICAL DATA ==============
 
 # Zodiac signs (Western/Tropical)
@@ -1525,6 +1540,7 @@ with st.sidebar:
                 "🌌 Galaxy Quest",
                 "🔭 Star Hunter",
                 "🔬 Real Data Discovery",
+                "📈 Light Curve Lab",
                 "🎯 Sky Bingo",
                 "🌟 Star Stories",
                 "📊 My Sky Data"
@@ -4662,11 +4678,54 @@ elif page == "🔭 Light's Journey":
 elif page == "🪐 Exoplanet Explorer":
     st.header("🪐 Potentially Habitable Worlds")
 
+    explorer_planets = EXOPLANETS
+    if EXO_ARCHIVE is not None:
+        with st.expander(f"🔎 Filter {len(EXO_ARCHIVE):,} planets from the NASA Exoplanet Archive", expanded=True):
+            f1, f2, f3 = st.columns(3)
+            with f1:
+                hz_only = st.checkbox("Habitable zone only", value=True, key="exo_hz")
+                distance_range = st.slider("Distance (light-years)", 0, 5000, (0, 500), step=10, key="exo_dist")
+            with f2:
+                methods = st.multiselect("Discovery method", EXO_ARCHIVE.categories["method"], key="exo_methods")
+                year_range = st.slider("Discovery year", 1989, datetime.now().year,
+                                       (1989, datetime.now().year), key="exo_years")
+            with f3:
+                sort_labels = {"distance_ly": "Distance", "year": "Discovery year",
+                               "radius_earth": "Radius", "temp_k": "Temperature"}
+                sort_by = st.selectbox("Sort by", list(sort_labels), format_func=sort_labels.get, key="exo_sort")
+                newest_first = st.checkbox("Descending", value=sort_by == "year", key="exo_desc")
+        filters = {"method": methods} if methods else {}
+        matches = EXO_ARCHIVE.query(sort=sort_by, descending=newest_first,
+                                    habitable=True if hz_only else None,
+                                    distance_ly=distance_range, year=year_range, **filters)
+        st.caption(f"{len(matches):,} matching planets")
+        with st.expander("⚖️ Rank matches by habitability"):
+            weight_cols = st.columns(len(habitability.FACTORS))
+            hab_weights = {f.name: weight_cols[k].slider(f.name, 0.0, 3.0, 1.0, 0.25, key=f"exo_w_{k}")
+                           for k, f in enumerate(habitability.FACTORS)}
+            archive_catalog = habitability.from_archive(EXO_ARCHIVE)
+            archive_points = habitability.factor_points(archive_catalog)
+            archive_scores = habitability.weighted_score(archive_points[:, matches], hab_weights)
+            best = np.argsort(-archive_scores, kind="stable")[:15]
+            top = matches[best]
+            top_eval = habitability.evaluate({k: v[top] for k, v in archive_catalog.items()}, hab_weights)
+            ranked = EXO_ARCHIVE.frame(top, ["name", "star", "distance_ly", "radius_earth", "temp_k"])
+            ranked["score"] = archive_scores[best].round(0)
+            ranked["ESI"] = top_eval.esi.round(2)
+            ranked["zone"] = [habitability.HZ_CLASSES[z] for z in top_eval.hz]
+            st.dataframe(ranked, hide_index=True, use_container_width=True)
+        explorer_planets = [{"name": r["name"], "star": r["star"], "distance_ly": round(r["distance_ly"], 1),
+                             "habitable": r["hz"], "year": r["year"]}
+                            for r in EXO_ARCHIVE.records(matches[:500])]
+        if not explorer_planets:
+            st.info("No planets match these filters.")
+            st.stop()
+
     col1, col2 = st.columns([1, 2])
 
     with col1:
-        selected_planet = st.selectbox("Choose an exoplanet:", [p["name"] for p in EXOPLANETS])
-        planet = next(p for p in EXOPLANETS if p["name"] == selected_planet)
+        selected_planet = st.selectbox("Choose an exoplanet:", [p["name"] for p in explorer_planets])
+        planet = next(p for p in explorer_planets if p["name"] == selected_planet)
         st.metric("Distance", f"{planet['distance_ly']} light-years")
         st.metric("Discovered", planet["year"])
 
@@ -4682,6 +4741,25 @@ elif page == "🪐 Exoplanet Explorer":
         </div>
         """, unsafe_allow_html=True)
 
+    # Pre-rendered detection-method animations (static assets, no per-request compute)
+    if animations_available():
+        st.subheader("🔭 How We Find Them")
+        method_tabs = st.tabs(["Transit", "Radial Velocity", "Direct Imaging", "Microlensing"])
+        with method_tabs[0]:
+            render_animation("transit_method")
+            col_a, col_b = st.columns(2)
+            with col_a:
+                render_animation("transit_method-grazing")
+            with col_b:
+                render_animation("transit_method-earth")
+        with method_tabs[1]:
+            render_animation("radial_velocity")
+        with method_tabs[2]:
+            render_animation("direct_imaging")
+        with method_tabs[3]:
+            render_animation("microlensing")
+            render_animation("microlensing-wide")
+
 
 elif page == "🎮 Planet Hunter":
     st.header("🎮 Planet Hunter - Exoplanet Discovery Game")
@@ -4771,6 +4849,17 @@ elif page == "🎮 Planet Hunter":
                 mass = (radius ** 2) * 10 * random.uniform(0.5, 3)
             mass = min(max(mass, 0.1), 5000)
 
+            # With an archive snapshot, take period, size and mass from a real planet instead
+            if EXO_ARCHIVE is not None:
+                pool = EXO_ARCHIVE.query(sort="radius_earth", radius_earth=(0.3, 25),
+                                         period_days=(0.5, 10000))
+                if len(pool):
+                    real = EXO_ARCHIVE.records([random.choice(pool)])[0]
+                    orbital_period = real["period_days"] * random.uniform(0.95, 1.05)
+                    radius = real["radius_earth"] * random.uniform(0.95, 1.05)
+                    if real["mass_earth"]:
+                        mass = real["mass_earth"] * random.uniform(0.95, 1.05)
+
             # Calculate equilibrium temperature
             # T_eq = T_star * sqrt(R_star / (2 * a)) * (1 - albedo)^0.25
             # Simplified: use orbital period and star temp
@@ -4814,82 +4903,17 @@ elif page == "🎮 Planet Hunter":
                 "distance_ly": round(distance, 1),
                 "discovery_year": discovery_year,
                 "discovery_method": method,
-                "semi_major_axis": round(semi_major_axis, 3)
+                "semi_major_axis": round(semi_major_axis, 3),
+                "star_mass": round(star_mass, 3)
             }
 
         def calculate_habitability_score(planet):
-            """Calculate a habitability score (0-100) based on multiple factors."""
-            score = 0
-
-            # Temperature factor (optimal: 200-320 K for liquid water)
-            temp = planet["eq_temperature"]
-            if 273 <= temp <= 373:  # 0-100C
-                score += 35
-            elif 200 <= temp <= 273 or 373 <= temp <= 400:
-                score += 25
-            elif 150 <= temp <= 200 or 400 <= temp <= 500:
-                score += 10
-            else:
-                score += 0
-
-            # Size factor (optimal: 0.5-2 Earth radii for rocky)
-            radius = planet["radius"]
-            if 0.8 <= radius <= 1.5:
-                score += 25
-            elif 0.5 <= radius <= 0.8 or 1.5 <= radius <= 2.0:
-                score += 18
-            elif 0.3 <= radius <= 0.5 or 2.0 <= radius <= 2.5:
-                score += 10
-            else:
-                score += 0
-
-            # Star type factor (K and early M stars are best for habitability)
-            star_type = planet["star_type"]
-            if star_type == "K":
-                score += 20
-            elif star_type == "G":
-                score += 18
-            elif star_type == "M":
-                score += 12  # M dwarfs have flare issues
-            elif star_type == "F":
-                score += 8
-            else:
-                score += 2
-
-            # Orbital period factor (not too short, not too long)
-            period = planet["orbital_period"]
-            if 100 <= period <= 500:
-                score += 15
-            elif 30 <= period <= 100 or 500 <= period <= 1000:
-                score += 10
-            elif 10 <= period <= 30 or 1000 <= period <= 2000:
-                score += 5
-            else:
-                score += 2
-
-            # Mass factor (affects gravity and atmosphere retention)
-            mass = planet["mass"]
-            if 0.5 <= mass <= 3:
-                score += 5
-            elif 0.1 <= mass <= 0.5 or 3 <= mass <= 10:
-                score += 3
-            else:
-                score += 0
-
-            return min(score, 100)
+            """Habitability score (0-100) from the table-driven rules in habitability.py."""
+            return int(habitability.score(habitability.from_records([planet]))[0])
 
         def get_habitability_class(score):
             """Get habitability classification based on score."""
-            if score >= 80:
-                return ("Prime Candidate", "#22C55E", "Excellent conditions for potential life")
-            elif score >= 60:
-                return ("Promising", "#84CC16", "Good habitability potential")
-            elif score >= 40:
-                return ("Moderate", "#EAB308", "Some favorable conditions")
-            elif score >= 20:
-                return ("Challenging", "#F97316", "Harsh but not impossible")
-            else:
-                return ("Hostile", "#EF4444", "Unlikely to support life as we know it")
+            return habitability.classify(score)
 
         # Game interface
         st.markdown("""
@@ -4901,6 +4925,30 @@ elif page == "🎮 Planet Hunter":
         </div>
         """, unsafe_allow_html=True)
 
+        # Score the whole collection once per rerun (vectorised over all claimed planets)
+        claimed_planets = st.session_state["planet_hunter"]["claimed_planets"]
+        claimed_eval = habitability.evaluate(habitability.from_records(claimed_planets)) if claimed_planets else None
+        claimed_scores = claimed_eval.score.astype(int) if claimed_planets else np.zeros(0, int)
+        # Simulated light curves: one batch for planets not seen before, cached per planet id
+        current_planet = st.session_state["planet_hunter"]["current_planet"]
+        hunter_curves = transits.light_curves(claimed_planets + ([current_planet] if current_planet else []))
+        claimed_curves = hunter_curves[:len(claimed_planets)]
+
+        def draw_transit_grid(fig, hours, flux, names, columns=4):
+            """Small multiples of simulated transits (for figure_cache.render_png)."""
+            fig.patch.set_facecolor('#1a1a2e')
+            rows = -(-len(names) // columns)
+            for i, name in enumerate(names):
+                ax = fig.add_subplot(rows, columns, i + 1)
+                ax.set_facecolor('#1a1a2e')
+                ax.plot(hours[i], (flux[i] - 1.0) * 1e6, '.', color='#0693e3', markersize=1.5)
+                ax.set_title(name, color='#ffffff', fontsize=8)
+                ax.tick_params(colors='#9ca3af', labelsize=6)
+                for spine in ax.spines.values():
+                    spine.set_color('#4b5563')
+            fig.supxlabel('Hours from mid-transit', color='#e5e7eb', fontsize=8)
+            fig.supylabel('Flux (ppm)', color='#e5e7eb', fontsize=8)
+
         # Stats row
         col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
         with col_stat1:
@@ -4908,13 +4956,11 @@ elif page == "🎮 Planet Hunter":
         with col_stat2:
             st.metric("Claimed Planets", len(st.session_state["planet_hunter"]["claimed_planets"]))
         with col_stat3:
-            habitable_count = len([p for p in st.session_state["planet_hunter"]["claimed_planets"]
-                                  if calculate_habitability_score(p) >= 60])
+            habitable_count = int(np.sum(claimed_scores >= 60))
             st.metric("Habitable Worlds", habitable_count)
         with col_stat4:
-            if st.session_state["planet_hunter"]["claimed_planets"]:
-                avg_score = np.mean([calculate_habitability_score(p)
-                                    for p in st.session_state["planet_hunter"]["claimed_planets"]])
+            if claimed_planets:
+                avg_score = claimed_scores.mean()
                 st.metric("Avg Habitability", f"{avg_score:.0f}%")
             else:
                 st.metric("Avg Habitability", "N/A")
@@ -4957,7 +5003,8 @@ elif page == "🎮 Planet Hunter":
         with col_details:
             if st.session_state["planet_hunter"]["current_planet"]:
                 planet = st.session_state["planet_hunter"]["current_planet"]
-                hab_score = calculate_habitability_score(planet)
+                current_eval = habitability.evaluate(habitability.from_records([planet]))
+                hab_score = int(current_eval.score[0])
                 hab_class, hab_color, hab_desc = get_habitability_class(hab_score)
 
                 st.subheader(f"Discovery: {planet['name']}")
@@ -5003,6 +5050,8 @@ elif page == "🎮 Planet Hunter":
                         <p><b>Temperature:</b> {planet['eq_temperature']:.0f} K ({planet['eq_temperature'] - 273:.0f} C)</p>
                         <p><b>Distance:</b> {planet['distance_ly']:.1f} light-years</p>
                         <p><b>Discovery Method:</b> {planet['discovery_method']}</p>
+                        <p><b>Earth Similarity:</b> {current_eval.esi[0]:.2f} ({habitability.HZ_CLASSES[current_eval.hz[0]]}:
+                           {current_eval.hz_inner[0]:.2f}-{current_eval.hz_outer[0]:.2f} AU vs {planet['semi_major_axis']:.2f} AU)</p>
                     </div>
                     """, unsafe_allow_html=True)
 
@@ -5021,6 +5070,15 @@ elif page == "🎮 Planet Hunter":
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
+
+                # Simulated discovery light curve
+                st.markdown("#### Transit Light Curve")
+                curve = hunter_curves[-1]
+                st.line_chart(pd.DataFrame({"Flux (ppm)": (curve.flux - 1.0) * 1e6},
+                                           index=pd.Index(curve.hours, name="Hours from mid-transit")))
+                st.caption(f"Depth {curve.depth_ppm:,.0f} ppm · duration {curve.duration_h:.1f} h · "
+                           f"impact parameter {curve.impact:.2f} · noise {curve.noise_ppm:,.0f} ppm "
+                           f"per point (host m ≈ {curve.magnitude:.1f})")
             else:
                 st.info("Click 'Scan the Cosmos' to discover your first exoplanet!")
 
@@ -5035,20 +5093,20 @@ elif page == "🎮 Planet Hunter":
                 ["Discovery Order", "Habitability (High to Low)", "Distance (Near to Far)", "Size (Large to Small)"]
             )
 
-            planets = st.session_state["planet_hunter"]["claimed_planets"].copy()
-
+            order = np.arange(len(claimed_planets))
             if sort_option == "Habitability (High to Low)":
-                planets.sort(key=lambda p: calculate_habitability_score(p), reverse=True)
+                order = np.argsort(-claimed_scores, kind="stable")
             elif sort_option == "Distance (Near to Far)":
-                planets.sort(key=lambda p: p["distance_ly"])
+                order = np.argsort([p["distance_ly"] for p in claimed_planets], kind="stable")
             elif sort_option == "Size (Large to Small)":
-                planets.sort(key=lambda p: p["radius"], reverse=True)
+                order = np.argsort([-p["radius"] for p in claimed_planets], kind="stable")
 
             # Display collection as cards
             cols = st.columns(3)
-            for i, planet in enumerate(planets):
+            for i, k in enumerate(order):
+                planet = claimed_planets[k]
                 with cols[i % 3]:
-                    hab_score = calculate_habitability_score(planet)
+                    hab_score = int(claimed_scores[k])
                     hab_class, hab_color, _ = get_habitability_class(hab_score)
 
                     st.markdown(f"""
@@ -5070,11 +5128,23 @@ elif page == "🎮 Planet Hunter":
                     </div>
                     """, unsafe_allow_html=True)
 
+            # Light curves of the collection, a page of small multiples at a time
+            with st.expander("📉 Transit light curves"):
+                per_page = 12
+                pages = -(-len(order) // per_page)
+                page_no = st.number_input("Page", 1, pages, 1) if pages > 1 else 1
+                shown = order[(page_no - 1) * per_page:page_no * per_page]
+                st.image(render_png(draw_transit_grid,
+                                    np.stack([claimed_curves[k].hours for k in shown]),
+                                    np.stack([claimed_curves[k].flux for k in shown]),
+                                    tuple(claimed_planets[k]["name"] for k in shown),
+                                    figsize=(12, 2.4 * -(-len(shown) // 4))))
+
             # Export collection
             st.markdown("---")
             if st.button("Export Collection to CSV"):
                 collection_data = []
-                for p in st.session_state["planet_hunter"]["claimed_planets"]:
+                for k, p in enumerate(claimed_planets):
                     collection_data.append({
                         "Planet Name": p["name"],
                         "Host Star": p["host_star"],
@@ -5084,7 +5154,11 @@ elif page == "🎮 Planet Hunter":
                         "Mass (Earth)": p["mass"],
                         "Temperature (K)": p["eq_temperature"],
                         "Distance (ly)": p["distance_ly"],
-                        "Habitability Score": calculate_habitability_score(p),
+                        "Habitability Score": int(claimed_scores[k]),
+                        "Earth Similarity Index": round(float(claimed_eval.esi[k]), 3),
+                        "Habitable Zone": habitability.HZ_CLASSES[claimed_eval.hz[k]],
+                        "Transit Depth (ppm)": round(claimed_curves[k].depth_ppm),
+                        "Transit Duration (h)": round(claimed_curves[k].duration_h, 2),
                         "Discovery Method": p["discovery_method"]
                     })
                 df = pd.DataFrame(collection_data)
@@ -5464,6 +5538,10 @@ elif page == "🔬 Real Data Discovery":
         "SiO": {"name": "Silicon Monoxide", "wavelengths": [1100.0, 1200.0, 1300.0], "color": "#3F51B5", "rarity": "legendary", "group": "molecule"},
     }
 
+    # Sorted wavelength index over every line above, for automatic line identification
+    ELEMENT_INDEX = line_id.LineIndex.from_database(ELEMENT_DATABASE)
+    CROSS_SECTIONS = transmission.CrossSections.load(ELEMENT_DATABASE)
+
     # Badge definitions
     BADGE_DEFINITIONS = {
         "first_discovery": {"name": "First Light", "icon": "🌟", "desc": "Made your first discovery", "requirement": 1},
@@ -5478,20 +5556,34 @@ elif page == "🔬 Real Data Discovery":
         "element_master": {"name": "Periodic Pioneer", "icon": "📊", "desc": "Found 10 different elements/molecules", "requirement": 10},
     }
 
-    # Real exoplanet candidates from NASA archives (simulated based on real naming conventions)
+    # Real exoplanet candidates from NASA archives (simulated based on real naming conventions).
+    # Host star radius (R☉) and, where measured, planet mass (M⊕) feed the transmission model.
     REAL_PLANET_CANDIDATES = [
-        {"name": "TOI-700 d", "status": "Confirmed", "star": "TOI-700", "distance_ly": 101.4, "radius_earth": 1.07, "period_days": 37.4, "temp_k": 268, "discovery_method": "Transit", "year": 2020},
-        {"name": "K2-18 b", "status": "Confirmed", "star": "K2-18", "distance_ly": 124, "radius_earth": 2.71, "period_days": 32.9, "temp_k": 284, "discovery_method": "Transit", "year": 2015},
-        {"name": "LHS 1140 b", "status": "Confirmed", "star": "LHS 1140", "distance_ly": 40.7, "radius_earth": 1.73, "period_days": 24.7, "temp_k": 235, "discovery_method": "Transit", "year": 2017},
-        {"name": "TRAPPIST-1 e", "status": "Confirmed", "star": "TRAPPIST-1", "distance_ly": 39.5, "radius_earth": 0.92, "period_days": 6.1, "temp_k": 251, "discovery_method": "Transit", "year": 2017},
-        {"name": "Kepler-442 b", "status": "Confirmed", "star": "Kepler-442", "distance_ly": 112, "radius_earth": 1.34, "period_days": 112.3, "temp_k": 233, "discovery_method": "Transit", "year": 2015},
-        {"name": "Proxima Centauri b", "status": "Confirmed", "star": "Proxima Centauri", "distance_ly": 4.24, "radius_earth": 1.08, "period_days": 11.2, "temp_k": 234, "discovery_method": "Radial Velocity", "year": 2016},
-        {"name": "TOI-4481.01", "status": "Candidate", "star": "TOI-4481", "distance_ly": 215, "radius_earth": 1.89, "period_days": 28.6, "temp_k": 295, "discovery_method": "Transit", "year": 2023},
-        {"name": "TOI-5293.01", "status": "Candidate", "star": "TOI-5293", "distance_ly": 178, "radius_earth": 1.45, "period_days": 42.1, "temp_k": 272, "discovery_method": "Transit", "year": 2023},
-        {"name": "KOI-7923.01", "status": "Candidate", "star": "KOI-7923", "distance_ly": 890, "radius_earth": 1.12, "period_days": 395, "temp_k": 248, "discovery_method": "Transit", "year": 2022},
-        {"name": "TOI-6321.01", "status": "Candidate", "star": "TOI-6321", "distance_ly": 145, "radius_earth": 2.1, "period_days": 18.9, "temp_k": 310, "discovery_method": "Transit", "year": 2024},
+        {"name": "TOI-700 d", "status": "Confirmed", "star": "TOI-700", "distance_ly": 101.4, "radius_earth": 1.07, "period_days": 37.4, "temp_k": 268, "star_radius_rsun": 0.42, "discovery_method": "Transit", "year": 2020},
+        {"name": "K2-18 b", "status": "Confirmed", "star": "K2-18", "distance_ly": 124, "radius_earth": 2.71, "period_days": 32.9, "temp_k": 284, "star_radius_rsun": 0.44, "mass_earth": 8.63, "discovery_method": "Transit", "year": 2015},
+        {"name": "LHS 1140 b", "status": "Confirmed", "star": "LHS 1140", "distance_ly": 40.7, "radius_earth": 1.73, "period_days": 24.7, "temp_k": 235, "star_radius_rsun": 0.21, "mass_earth": 5.60, "discovery_method": "Transit", "year": 2017},
+        {"name": "TRAPPIST-1 e", "status": "Confirmed", "star": "TRAPPIST-1", "distance_ly": 39.5, "radius_earth": 0.92, "period_days": 6.1, "temp_k": 251, "star_radius_rsun": 0.119, "mass_earth": 0.69, "discovery_method": "Transit", "year": 2017},
+        {"name": "Kepler-442 b", "status": "Confirmed", "star": "Kepler-442", "distance_ly": 112, "radius_earth": 1.34, "period_days": 112.3, "temp_k": 233, "star_radius_rsun": 0.60, "discovery_method": "Transit", "year": 2015},
+        {"name": "Proxima Centauri b", "status": "Confirmed", "star": "Proxima Centauri", "distance_ly": 4.24, "radius_earth": 1.08, "period_days": 11.2, "temp_k": 234, "star_radius_rsun": 0.154, "discovery_method": "Radial Velocity", "year": 2016},
+        {"name": "TOI-4481.01", "status": "Candidate", "star": "TOI-4481", "distance_ly": 215, "radius_earth": 1.89, "period_days": 28.6, "temp_k": 295, "star_radius_rsun": 0.52, "discovery_method": "Transit", "year": 2023},
+        {"name": "TOI-5293.01", "status": "Candidate", "star": "TOI-5293", "distance_ly": 178, "radius_earth": 1.45, "period_days": 42.1, "temp_k": 272, "star_radius_rsun": 0.55, "discovery_method": "Transit", "year": 2023},
+        {"name": "KOI-7923.01", "status": "Candidate", "star": "KOI-7923", "distance_ly": 890, "radius_earth": 1.12, "period_days": 395, "temp_k": 248, "star_radius_rsun": 0.79, "discovery_method": "Transit", "year": 2022},
+        {"name": "TOI-6321.01", "status": "Candidate", "star": "TOI-6321", "distance_ly": 145, "radius_earth": 2.1, "period_days": 18.9, "temp_k": 310, "star_radius_rsun": 0.48, "discovery_method": "Transit", "year": 2024},
     ]
 
+    # Temperate TESS candidates from the TOI snapshot, nearest first
+    if TOI_ARCHIVE is not None:
+        for toi in TOI_ARCHIVE.records(TOI_ARCHIVE.query(
+                sort="distance_ly", distance_ly=(0, None), status=["PC", "APC"], temp_k=(150, 450),
+                radius_earth=(0.5, 4.0), star_radius_rsun=(0.05, None), limit=40)):
+            REAL_PLANET_CANDIDATES.append({
+                "name": toi["name"], "status": "Candidate", "star": toi["star"],
+                "distance_ly": toi["distance_ly"], "radius_earth": round(toi["radius_earth"], 2),
+                "period_days": round(toi["period_days"] or 0.0, 1), "temp_k": round(toi["temp_k"]),
+                "star_radius_rsun": round(toi["star_radius_rsun"], 3),
+                "discovery_method": "Transit", "year": toi["year"] or datetime.now().year,
+            })
+
     def check_and_award_badges():
         """Check and award badges based on discoveries."""
         discoveries = st.session_state["real_discoveries"]
@@ -5546,7 +5638,7 @@ elif page == "🔬 Real Data Discovery":
     def generate_atmosphere_for_planet(planet):
         """Generate realistic atmospheric composition based on planet properties."""
         import random
-        random.seed(hash(planet["name"]))
+        random.seed(spectra.stable_seed(planet["name"]))
 
         atmosphere = {}
         temp = planet["temp_k"]
@@ -5591,27 +5683,26 @@ elif page == "🔬 Real Data Discovery":
 
         return atmosphere
 
-    def generate_spectral_data(atmosphere, noise_level=0.1):
-        """Generate synthetic spectral absorption data based on atmosphere."""
-        import random
-        wavelengths = np.linspace(300, 2500, 500)
-        spectrum = np.ones(len(wavelengths))
-
-        # Add absorption features for each element
-        for element, fraction in atmosphere.items():
-            if element in ELEMENT_DATABASE:
-                elem_data = ELEMENT_DATABASE[element]
-                for line_wl in elem_data["wavelengths"]:
-                    # Gaussian absorption profile
-                    width = 5 + random.uniform(-2, 5)
-                    depth = min(0.9, fraction * 10 + random.uniform(0, 0.3))
-                    spectrum *= 1 - depth * np.exp(-((wavelengths - line_wl) ** 2) / (2 * width ** 2))
-
-        # Add noise
-        spectrum += np.random.normal(0, noise_level, len(wavelengths))
-        spectrum = np.clip(spectrum, 0, 1)
-
-        return wavelengths, spectrum
+    def generate_spectral_data(planet, atmosphere, seed, noise_level=1.0):
+        """Transmission spectrum of the planet's atmosphere (reproducible per seed)."""
+        return transmission.spectrum_for(planet, atmosphere, seed, spectra.wavelength_grid(),
+                                         CROSS_SECTIONS, noise_level=noise_level)
+
+    def draw_spectrum(fig, wavelengths, observed_ppm, model_ppm, title):
+        """Dark-theme transmission spectrum plot, depth in ppm (for figure_cache.render_png)."""
+        fig.patch.set_facecolor('#1a1a2e')
+        ax = fig.add_subplot()
+        ax.set_facecolor('#1a1a2e')
+        ax.plot(wavelengths, observed_ppm, color='#0693e3', linewidth=1, alpha=0.8, label='Observed')
+        ax.plot(wavelengths, model_ppm, color='#f59e0b', linewidth=1, label='Model')
+        ax.set_xlabel('Wavelength (nm)', color='#e5e7eb')
+        ax.set_ylabel('Transit depth (ppm)', color='#e5e7eb')
+        ax.set_title(title, color='#ffffff')
+        ax.tick_params(colors='#9ca3af')
+        for spine in ax.spines.values():
+            spine.set_color('#4b5563')
+        ax.legend(facecolor='#1a1a2e', edgecolor='#4b5563', labelcolor='#e5e7eb')
+        ax.grid(alpha=0.2, color='#4b5563')
 
     def generate_certificate(planet_name, discoverer_name, elements_found, analysis_date):
         """Generate HTML certificate for discovery."""
@@ -5705,6 +5796,10 @@ elif page == "🔬 Real Data Discovery":
             </div>
             """, unsafe_allow_html=True)
 
+            if animations_available("transit_method"):
+                with st.expander("🎬 Watch a transit: the planet's atmosphere is backlit by its star"):
+                    render_animation("transit_method")
+
             # Step 1: Select target
             st.markdown("### Step 1: Select Target Planet")
             col_select, col_info = st.columns([1, 1])
@@ -5735,36 +5830,57 @@ elif page == "🔬 Real Data Discovery":
                 st.session_state["current_spectrum"] = {
                     "planet": selected_planet,
                     "atmosphere": generate_atmosphere_for_planet(selected_planet),
+                    "seed": int(np.random.default_rng().integers(2**32)),
                     "analyzed": False
                 }
 
             if "current_spectrum" in st.session_state and st.session_state["current_spectrum"]:
                 current = st.session_state["current_spectrum"]
-                wavelengths, spectrum = generate_spectral_data(current["atmosphere"])
+                model = generate_spectral_data(current["planet"], current["atmosphere"], current["seed"])
+                wavelengths = model.wavelengths
 
-                # Plot spectrum
-                fig, ax = plt.subplots(figsize=(12, 5))
-                fig.patch.set_facecolor('#1a1a2e')
-                ax.set_facecolor('#1a1a2e')
-                ax.plot(wavelengths, spectrum, color='#0693e3', linewidth=1)
-                ax.fill_between(wavelengths, spectrum, alpha=0.3, color='#0693e3')
-                ax.set_xlabel('Wavelength (nm)', color='#e5e7eb')
-                ax.set_ylabel('Normalized Flux', color='#e5e7eb')
-                ax.set_title(f'Transmission Spectrum of {current["planet"]["name"]}', color='#ffffff')
-                ax.tick_params(colors='#9ca3af')
-                ax.spines['bottom'].set_color('#4b5563')
-                ax.spines['top'].set_color('#4b5563')
-                ax.spines['left'].set_color('#4b5563')
-                ax.spines['right'].set_color('#4b5563')
-                ax.set_ylim(0, 1.2)
-                ax.grid(alpha=0.2, color='#4b5563')
-                st.pyplot(fig)
-                plt.close()
+                # Plot spectrum (cached PNG: widget reruns do not redraw it)
+                st.image(render_png(draw_spectrum, wavelengths, model.observed_ppm, model.depth * 1e6,
+                                    f'Transmission Spectrum of {current["planet"]["name"]}'))
+                st.caption(f"Scale height {model.scale_height_km:.0f} km (μ = {model.mu:.1f} g/mol, "
+                           f"g = {model.gravity:.1f} m/s²) · features span "
+                           f"{model.amplitude_ppm:.1f} ppm of transit depth · noise "
+                           f"{model.noise_ppm:.2f} ppm per point, {model.n_transits:,} transits stacked")
 
                 # Step 3: Identify elements (mini-game)
                 st.markdown("### Step 3: Identify Absorption Features")
                 st.info("🎯 Click on elements you think are present in the spectrum based on the absorption dips!")
 
+                # Automatic detection: matched-filter features of the observed excess
+                # depth (ppm) cross-matched against the line index
+                detections, species_scores, detected_species = line_id.detect_features(
+                    wavelengths, model.absorption, ELEMENT_INDEX)
+                with st.expander(f"💡 Hint: the line finder sees {len(detections.wavelength)} absorption dips"):
+                    for wl, snr in sorted(zip(detections.wavelength, detections.snr)):
+                        candidates = ELEMENT_INDEX.lookup(wl, 3.0)
+                        st.markdown(f"- **{wl:.1f} nm** (S/N {snr:.0f}): "
+                                    f"{', '.join(candidates) if candidates else 'no catalogued line nearby'}")
+
+                with st.expander("🧪 Pro analysis: atmospheric retrieval"):
+                    fit_start = datetime.now()
+                    fit = retrieval.fit_absorption(
+                        wavelengths, line_id.subtract_continuum(wavelengths, model.absorption),
+                        ELEMENT_DATABASE)
+                    fit_ms = (datetime.now() - fit_start).total_seconds() * 1000
+                    st.caption(f"Template-bank NNLS fit over {len(retrieval.TEMPERATURES)} temperatures "
+                               f"in {fit_ms:.0f} ms · best-fit line temperature ≈ {fit.temperature:.0f} K · "
+                               f"band heights in ppm of transit depth above the continuum")
+                    retrieved = pd.DataFrame({
+                        "Species": [f"{sp} ({ELEMENT_DATABASE[sp]['name']})" for sp in fit.species],
+                        "Band height (ppm)": fit.abundance,
+                        "± 1σ": fit.sigma,
+                        "Significance (σ)": fit.abundance / np.where(fit.sigma > 0, fit.sigma, np.inf),
+                    })
+                    retrieved = retrieved[retrieved["Band height (ppm)"] > 0].sort_values(
+                        "Band height (ppm)", ascending=False)
+                    st.dataframe(retrieved.style.format(precision=3), hide_index=True,
+                                 use_container_width=True)
+
                 # Element selection grid
                 element_cols = st.columns(4)
                 user_selections = set()
@@ -5802,6 +5918,12 @@ elif page == "🔬 Real Data Discovery":
                     with res_col3:
                         st.metric("Elements Missed", len(missed))
 
+                    detector_correct = detected_species & actual_elements
+                    detector_accuracy = len(detector_correct) / max(1, len(actual_elements)) * 100
+                    st.caption(f"🤖 Automatic line finder: {detector_accuracy:.0f}% accuracy, "
+                               f"{len(detected_species - actual_elements)} false detections "
+                               f"({', '.join(sorted(detected_species)) or 'nothing'} flagged)")
+
                     # Show what was found
                     st.markdown("#### ✅ Correctly Identified:")
                     if correct:
@@ -5831,7 +5953,8 @@ elif page == "🔬 Real Data Discovery":
                         "planet": current["planet"]["name"],
                         "date": datetime.now(),
                         "accuracy": accuracy,
-                        "elements": list(correct)
+                        "elements": list(correct),
+                        "seed": current["seed"]
                     })
 
                     if accuracy >= 50:
@@ -6048,6 +6171,76 @@ elif page == "🔬 Real Data Discovery":
                     )
 
 
+# ============== LIGHT CURVE LAB PAGE ==============
+elif page == "📈 Light Curve Lab":
+    st.header("📈 Light Curve Lab")
+    st.caption("Kepler/TESS light curves, detrended and searched for transits. Charts receive only "
+               "the min/max/mean of each pixel column from precomputed level-of-detail pyramids.")
+
+    lc_index = lightcurves.load_index()
+    lc_rows = []
+    if lc_index is not None:
+        lc_rows = lc_index.query()
+        lc_rows = list(lc_rows[np.isfinite(lc_rows["bls_period"])])   # drop unreadable files
+    lc_options = ["Demo: simulated TESS sector"] + [
+        f"{row['target']} ({row['mission']}, {row['n_points']:,} cadences)" for row in lc_rows]
+    lc_choice = st.selectbox("Light curve", range(len(lc_options)), format_func=lambda i: lc_options[i],
+                             key="lc_target")
+    if not lc_rows:
+        st.info("Add Kepler/TESS light-curve FITS files to `data/lightcurves/` and run "
+                "`python lightcurves.py` to index them; until then a simulated sector is shown.")
+
+    if lc_choice == 0:
+        lc_source = ("demo", 0)
+
+        def load_light_curve():
+            demo = lightcurves.synthetic(seed=0)
+            return demo.time, lightcurves.detrend(demo.time, demo.flux)[0]
+
+        if "lc_demo_bls" not in st.session_state:
+            demo_time, demo_flat = load_light_curve()
+            demo_bls = lightcurves.bls(demo_time, demo_flat)
+            st.session_state["lc_demo_bls"] = {
+                "period": demo_bls.period, "t0": demo_bls.t0, "depth_ppm": demo_bls.depth * 1e6,
+                "snr": demo_bls.snr, "cdpp_ppm": lightcurves.cdpp(demo_time, demo_flat)}
+        lc_summary = st.session_state["lc_demo_bls"]
+    else:
+        lc_row = lc_rows[lc_choice - 1]
+        lc_source = (str(lc_row["path"]), float(lc_row["mtime"]))
+
+        def load_light_curve():
+            lc = lightcurves.read_lightcurve(str(lc_row["path"]))
+            return lc.time, lightcurves.detrend(lc.time, lc.flux)[0]
+
+        lc_summary = {"period": float(lc_row["bls_period"]), "t0": float(lc_row["bls_t0"]),
+                      "depth_ppm": float(lc_row["bls_depth_ppm"]), "snr": float(lc_row["bls_snr"]),
+                      "cdpp_ppm": float(lc_row["cdpp_ppm"])}
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("CDPP (6.5 h)", f"{lc_summary['cdpp_ppm']:.0f} ppm")
+    m2.metric("BLS period", f"{lc_summary['period']:.4f} d")
+    m3.metric("Transit depth", f"{lc_summary['depth_ppm']:.0f} ppm")
+    m4.metric("BLS S/N", f"{lc_summary['snr']:.1f}")
+
+    lc_view_mode = st.radio("View", ["Time series", "Phase folded"], horizontal=True, key="lc_view")
+    chart_pixels = 1200
+    if lc_view_mode == "Time series":
+        pyramid = lod.time_pyramid(lc_source, load_light_curve)
+        t_start, t_end = pyramid.extent
+        window = st.slider("Time window (days)", t_start, t_end, (t_start, t_end), key="lc_time_window")
+    else:
+        fold_period = st.number_input("Fold period (days)", min_value=0.1, value=round(lc_summary["period"], 5),
+                                      step=0.0001, format="%.5f", key="lc_period")
+        pyramid = lod.phase_pyramid(lc_source, load_light_curve, fold_period, lc_summary["t0"])
+        window = st.slider("Phase window", -0.5, 0.5, (-0.5, 0.5), step=0.001, key="lc_phase_window")
+
+    view = pyramid.window(window[0], window[1], chart_pixels)
+    st.line_chart(pd.DataFrame({"max": view.high, "mean": view.mean, "min": view.low}, index=view.x),
+                  height=360)
+    st.caption(f"{len(view.x):,} bins of {pyramid.n_points:,} cadences sent to the browser "
+               f"({'raw points' if view.level < 0 else f'pyramid level {view.level}'})")
+
+
 # ============== ASTEROID HUNTER PAGE (PRO FEATURE) ==============
 elif page == "☄️ Asteroid Hunter":
     st.header("☄️ Asteroid Hunter")
@@ -0,0 +1,296 @@
+"""
+Offline NASA Exoplanet Archive snapshots with a columnar index.
+
+A PSCompPars (confirmed planets) or TOI (TESS candidates) CSV snapshot
+in data/ is converted once into a compact column store under .cache/:
+one typed .npy per column (float32 measurements, int16 years, uint8
+category codes, fixed-width strings).  Every sortable column also gets a
+precomputed argsort.  Opening a store memory-maps the columns, so
+loading costs nothing and every session in the process shares one copy.
+
+Queries are index arithmetic on those arrays.  A range on the sort
+column is two `searchsorted` calls into its sorted order.  Other filters
+are boolean masks over just that slice.  Thousands of rows filter and
+sort in well under a millisecond.
+
+    python exoarchive.py --download     # fetch snapshots (needs astroquery)
+    python exoarchive.py                # (re)build the column stores
+"""
+
+import os
+import csv
+import json
+import hashlib
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache", "exoarchive")
+
+PC_TO_LY = 3.26156
+HZ_INSOLATION = (0.32, 1.77)     # S⊕, optimistic habitable zone (Kopparapu et al. 2013)
+
+# column → (source column, storage kind, transform of the raw string)
+Column = namedtuple("Column", ["source", "kind", "convert"])
+
+
+def _float(scale=1.0):
+    return lambda v: float(v) * scale if v not in ("", None) else np.nan
+
+
+def _year(v):
+    return int(str(v)[:4]) if v not in ("", None) else -1
+
+
+SCHEMAS = {
+    "pscomppars": {
+        "name": Column("pl_name", "str", str.strip),
+        "star": Column("hostname", "str", str.strip),
+        "method": Column("discoverymethod", "cat", str.strip),
+        "year": Column("disc_year", "i2", _year),
+        "distance_ly": Column("sy_dist", "f4", _float(PC_TO_LY)),
+        "radius_earth": Column("pl_rade", "f4", _float()),
+        "mass_earth": Column("pl_bmasse", "f4", _float()),
+        "period_days": Column("pl_orbper", "f4", _float()),
+        "semi_major_au": Column("pl_orbsmax", "f4", _float()),
+        "temp_k": Column("pl_eqt", "f4", _float()),
+        "insolation": Column("pl_insol", "f4", _float()),
+        "star_teff": Column("st_teff", "f4", _float()),
+        "star_radius_rsun": Column("st_rad", "f4", _float()),
+        "star_mass": Column("st_mass", "f4", _float()),
+        "ra": Column("ra", "f4", _float()),
+        "dec": Column("dec", "f4", _float()),
+    },
+    "toi": {
+        "name": Column("toi", "str", lambda v: f"TOI-{float(v):.2f}"),
+        "star": Column("tid", "str", lambda v: f"TIC {v.strip()}"),
+        "status": Column("tfopwg_disp", "cat", str.strip),
+        "year": Column("toi_created", "i2", _year),
+        "distance_ly": Column("st_dist", "f4", _float(PC_TO_LY)),
+        "radius_earth": Column("pl_rade", "f4", _float()),
+        "period_days": Column("pl_orbper", "f4", _float()),
+        "temp_k": Column("pl_eqt", "f4", _float()),
+        "insolation": Column("pl_insol", "f4", _float()),
+        "star_teff": Column("st_teff", "f4", _float()),
+        "star_radius_rsun": Column("st_rad", "f4", _float()),
+        "ra": Column("ra", "f4", _float()),
+        "dec": Column("dec", "f4", _float()),
+    },
+}
+SNAPSHOTS = {kind: os.path.join(DATA_DIR, f"{kind}.csv") for kind in SCHEMAS}
+
+
+# ── Conversion ──────────────────────────────────────────────────────────────
+def _read_rows(csv_path):
+    """Rows of an archive CSV export ('#' header comments skipped)."""
+    with open(csv_path, newline="") as fh:
+        return list(csv.DictReader(line for line in fh if not line.startswith("#")))
+
+
+def _habitable_zone(columns):
+    """
+    Insolation inside HZ_INSOLATION: measured, else from Teff, R★ and a,
+    else from the zero-albedo equilibrium temperature (Earth: 278.6 K).
+    """
+    insolation = columns["insolation"].astype(np.float64)
+    if "semi_major_au" in columns:
+        derived = (columns["star_radius_rsun"].astype(np.float64) ** 2
+                   * (columns["star_teff"] / 5772.0) ** 4 / columns["semi_major_au"] ** 2)
+        insolation = np.where(np.isnan(insolation), derived, insolation)
+    insolation = np.where(np.isnan(insolation), (columns["temp_k"] / 278.6) ** 4, insolation)
+    with np.errstate(invalid="ignore"):
+        return (insolation >= HZ_INSOLATION[0]) & (insolation <= HZ_INSOLATION[1])
+
+
+def convert(csv_path, kind, out_dir):
+    """Write the column store for one snapshot; returns its metadata."""
+    schema = SCHEMAS[kind]
+    rows = _read_rows(csv_path)
+    columns, categories = {}, {}
+    for name, col in schema.items():
+        values = [col.convert(r.get(col.source) or "") for r in rows]
+        if col.kind == "cat":
+            labels, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+            categories[name] = labels.tolist()
+            columns[name] = codes.astype(np.uint8)
+        elif col.kind == "str":
+            columns[name] = np.array(values, dtype=str)
+        else:
+            columns[name] = np.array(values, dtype=col.kind)
+    columns["hz"] = _habitable_zone(columns)
+
+    os.makedirs(out_dir, exist_ok=True)
+    sortable = [n for n, c in schema.items() if c.kind in ("f4", "i2")]
+    for name, values in columns.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), values)
+    for name in sortable:
+        # NaN (and -1 "unknown" years) sort last
+        key = columns[name].astype(np.float64)
+        if columns[name].dtype.kind == "i":
+            key[columns[name] < 0] = np.nan
+        np.save(os.path.join(out_dir, f"order_{name}.npy"), np.argsort(key, kind="stable"))
+    meta = {"kind": kind, "rows": len(rows), "columns": list(columns),
+            "sortable": sortable, "categories": categories}
+    with open(os.path.join(out_dir, "meta.json"), "w") as fh:
+        json.dump(meta, fh)
+    return meta
+
+
+# ── Queries ─────────────────────────────────────────────────────────────────
+class Archive:
+    """Memory-mapped column store with filtered, sorted queries."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as fh:
+            self.meta = json.load(fh)
+        self.kind = self.meta["kind"]
+        self.categories = self.meta["categories"]
+        self.columns = {n: np.load(os.path.join(path, f"{n}.npy"), mmap_mode="r")
+                        for n in self.meta["columns"]}
+        self.orders, self.sorted, self.known = {}, {}, {}
+        for name in self.meta["sortable"]:
+            order = np.load(os.path.join(path, f"order_{name}.npy"), mmap_mode="r")
+            values = self.columns[name][order].astype(np.float64)
+            if self.columns[name].dtype.kind == "i":
+                values[values < 0] = np.nan
+            self.orders[name] = order
+            self.sorted[name] = values
+            self.known[name] = int(np.count_nonzero(~np.isnan(values)))
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def query(self, sort="distance_ly", descending=False, limit=None, habitable=None,
+              **filters):
+        """
+        Row indices ordered by `sort` (unknown values last).
+
+        `filters` are either ranges, column=(lo, hi) with None for an
+        open end, or category values, column="label" or column=[labels].
+        """
+        order, values = self.orders[sort], self.sorted[sort]
+        lo, hi = 0, self.known[sort]
+        if sort in filters:
+            a, b = filters.pop(sort)
+            if a is not None:
+                lo = int(np.searchsorted(values[:hi], a, side="left"))
+            if b is not None:
+                hi = int(np.searchsorted(values[:hi], b, side="right"))
+            tail = np.empty(0, np.int64)
+        else:
+            tail = order[hi:]
+        idx = np.concatenate([order[lo:hi], tail])
+        if descending:
+            head = len(idx) - len(tail)
+            idx = np.concatenate([idx[:head][::-1], tail])
+
+        mask = np.ones(len(idx), bool)
+        if habitable is not None:
+            mask &= self.columns["hz"][idx] == habitable
+        for name, wanted in filters.items():
+            column = self.columns[name][idx]
+            if name in self.categories:
+                labels = [wanted] if isinstance(wanted, str) else list(wanted)
+                codes = [self.categories[name].index(x) for x in labels
+                         if x in self.categories[name]]
+                mask &= np.isin(column, codes)
+            else:
+                a, b = wanted
+                if column.dtype.kind == "i":
+                    mask &= column >= 0              # unknown years
+                with np.errstate(invalid="ignore"):
+                    if a is not None:
+                        mask &= column >= a
+                    if b is not None:
+                        mask &= column <= b
+        idx = idx[mask]
+        return idx[:limit] if limit is not None else idx
+
+    def value(self, name, i):
+        """One cell as a Python value (category labels decoded, NaN → None)."""
+        v = self.columns[name][i]
+        if name in self.categories:
+            return self.categories[name][int(v)]
+        if isinstance(v, np.floating):
+            return None if np.isnan(v) else float(v)
+        if isinstance(v, np.integer):
+            return None if v < 0 else int(v)
+        return v.item() if hasattr(v, "item") else v
+
+    def records(self, idx):
+        """Rows as dicts."""
+        return [{n: self.value(n, i) for n in self.columns} for i in np.asarray(idx)]
+
+    def frame(self, idx, columns=None):
+        """Rows as a pandas DataFrame."""
+        import pandas as pd
+        idx = np.asarray(idx)
+        data = {}
+        for n in columns or list(self.columns):
+            values = self.columns[n][idx]
+            data[n] = (np.asarray(self.categories[n], dtype=object)[values]
+                       if n in self.categories else np.asarray(values))
+        return pd.DataFrame(data)
+
+
+_archives = {}          # (path, mtime, size) → Archive, shared across sessions
+
+
+def load(kind, csv_path=None):
+    """Archive for the `kind` snapshot (converted on first use), or None if absent."""
+    csv_path = csv_path or SNAPSHOTS[kind]
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return None
+    key = (csv_path, stat.st_mtime_ns, stat.st_size)
+    if key not in _archives:
+        with open(csv_path, "rb") as fh:
+            digest = hashlib.sha1(fh.read()).hexdigest()[:16]
+        out_dir = os.path.join(CACHE_DIR, f"{kind}_{digest}")
+        if not os.path.exists(os.path.join(out_dir, "meta.json")):
+            tmp = f"{out_dir}.{os.getpid()}.tmp"
+            convert(csv_path, kind, tmp)
+            try:
+                os.replace(tmp, out_dir)
+            except OSError:          # another process built it first
+                pass
+        _archives[key] = Archive(out_dir)
+    return _archives[key]
+
+
+# ── Snapshots ───────────────────────────────────────────────────────────────
+def download(kind, path=None):
+    """Fetch a fresh snapshot from the archive's TAP service (astroquery)."""
+    from astroquery.ipac.nexsci.nasa_exoplanet_archive import NasaExoplanetArchive
+
+    columns = ",".join(c.source for c in SCHEMAS[kind].values())
+    table = NasaExoplanetArchive.query_criteria(table=kind, select=columns)
+    path = path or SNAPSHOTS[kind]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table.to_pandas().to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--download", action="store_true",
+                        help="fetch fresh snapshots from the NASA Exoplanet Archive first")
+    parser.add_argument("--kind", choices=sorted(SCHEMAS), action="append",
+                        help="snapshot(s) to process (default: all)")
+    args = parser.parse_args(argv)
+    for kind in args.kind or sorted(SCHEMAS):
+        if args.download:
+            print(f"downloaded {download(kind)}")
+        archive = load(kind)
+        if archive is None:
+            print(f"{kind}: no snapshot at {SNAPSHOTS[kind]}")
+        else:
+            print(f"{kind}: {len(archive)} rows, {int(archive.columns['hz'].sum())} in the habitable zone")
+
+
+if __name__ == "__main__":
+    main()
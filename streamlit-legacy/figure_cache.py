@@ -0,0 +1,79 @@
+"""
+Cached matplotlib rendering: plotted data + style → PNG bytes.
+
+`st.pyplot` draws and encodes its figure again on every rerun, even when
+the rerun came from an unrelated widget.  `render_png` keys each figure
+on a hash of its drawing function, the data arrays (dtype, shape and
+raw bytes) and the style arguments.  It draws only on a miss.
+
+  - Figures are built with the object-oriented `Figure` API on an Agg
+    canvas, never through pyplot, so no global figure state is shared
+    between concurrent sessions.
+  - The cache is a process-wide LRU bounded by the total PNG size
+    (MAX_BYTES), guarded by a lock.
+"""
+
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+MAX_BYTES = 32 * 1024 * 1024
+DPI = 150
+
+_cache = OrderedDict()          # key → PNG bytes, least recently used first
+_cache_bytes = 0
+_lock = threading.Lock()
+
+
+def _digest(draw, args, options):
+    h = hashlib.sha1(f"{draw.__module__}.{draw.__qualname__}".encode())
+    for value in args:
+        if isinstance(value, np.ndarray):
+            value = np.ascontiguousarray(value)
+            h.update(f"{value.dtype}{value.shape}".encode())
+            h.update(value.tobytes())
+        else:
+            h.update(repr(value).encode())
+        h.update(b"\x1f")
+    h.update(repr(sorted(options.items())).encode())
+    return h.hexdigest()
+
+
+def render_png(draw, *args, figsize=(12, 5), dpi=DPI, **style) -> bytes:
+    """
+    PNG of `draw(fig, *args, **style)` on a fresh Figure, from the cache
+    when the same function, data and style were rendered before.
+    `draw` must depend only on its arguments.
+    """
+    global _cache_bytes
+    key = _digest(draw, args, dict(style, figsize=figsize, dpi=dpi))
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    draw(fig, *args, **style)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", facecolor=fig.get_facecolor())
+    png = buffer.getvalue()
+
+    with _lock:
+        if key not in _cache:
+            _cache[key] = png
+            _cache_bytes += len(png)
+            while _cache_bytes > MAX_BYTES and len(_cache) > 1:
+                _cache_bytes -= len(_cache.popitem(last=False)[1])
+    return png
+
+
+def cache_info():
+    """(entries, total bytes) currently held."""
+    with _lock:
+        return len(_cache), _cache_bytes
@@ -0,0 +1,205 @@
+"""
+Habitability scoring as table-driven rules over whole catalogues.
+
+A catalogue is a dict of equal-length NumPy columns:
+  - eq_temperature (K), radius (R⊕), mass (M⊕), orbital_period (days)
+  - star_temp (K), star_mass (M☉); star_class, when given, overrides the
+    class derived from star_temp
+
+Each `Factor` is a set of bin edges and the points per bin.
+`np.digitize` scores one factor for every planet at once.  The
+habitability score is the weighted sum, scaled so that the maximum is
+100.  With the default weights this reproduces the Planet Hunter scores
+exactly.  Unknown (NaN) values score 0 for their factor.  The
+per-factor points do not depend on the weights, so after new weights
+`weighted_score` is a single matrix-vector product: a few microseconds
+for a 6k-planet archive.
+
+Also provided:
+  - `esi`: the Earth Similarity Index (Schulze-Makuch et al. 2011) from
+    radius, bulk density, escape velocity and equilibrium temperature
+  - `habitable_zone`: conservative/optimistic limits (Kopparapu et al.
+    2013) from stellar luminosity and Teff
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+Factor = namedtuple("Factor", ["name", "field", "edges", "points"])
+
+
+def _through(x):
+    """Edge that keeps `x` itself in the lower bin (closed upper bound)."""
+    return float(np.nextafter(x, np.inf))
+
+
+SPECTRAL_CLASSES = ["M", "K", "G", "F", "A", "B"]
+SPECTRAL_EDGES = [3700.0, 5200.0, 6000.0, 7500.0, 10000.0]      # Teff lower bounds of K..B
+
+FACTORS = [
+    # Liquid water: best 0–100 °C
+    Factor("Temperature", "eq_temperature",
+           [150.0, 200.0, 273.0, _through(373.0), _through(400.0), _through(500.0)],
+           [0, 10, 25, 35, 25, 10, 0]),
+    # Rocky sizes: best 0.8–1.5 R⊕
+    Factor("Size", "radius",
+           [0.3, 0.5, 0.8, _through(1.5), _through(2.0), _through(2.5)],
+           [0, 10, 18, 25, 18, 10, 0]),
+    # K and G dwarfs best, M dwarfs flare
+    Factor("Star type", "star_class", [0.5, 1.5, 2.5, 3.5, 4.5],
+           [12, 20, 18, 8, 2, 2]),
+    # Neither tidally baked nor frozen
+    Factor("Orbit", "orbital_period",
+           [10.0, 30.0, 100.0, _through(500.0), _through(1000.0), _through(2000.0)],
+           [2, 5, 10, 15, 10, 5, 2]),
+    # Gravity enough to hold an atmosphere
+    Factor("Mass", "mass", [0.1, 0.5, _through(3.0), _through(10.0)],
+           [0, 3, 5, 3, 0]),
+]
+DEFAULT_WEIGHTS = {f.name: 1.0 for f in FACTORS}
+
+# Earth Similarity Index: (field, Earth value, weight)
+ESI_TERMS = [("radius", 1.0, 0.57), ("density", 1.0, 1.07),
+             ("escape_velocity", 1.0, 0.70), ("eq_temperature", 255.0, 5.58)]
+
+# Kopparapu et al. (2013) S_eff = S☉ + aT + bT² + cT³ + dT⁴, T = Teff − 5780 K
+HZ_LIMITS = {
+    "recent_venus":      (1.7753, 1.4316e-4, 2.9875e-9, -7.5702e-12, -1.1635e-15),
+    "runaway_greenhouse": (1.0512, 1.3242e-4, 1.5418e-8, -7.9895e-12, -1.8328e-15),
+    "maximum_greenhouse": (0.3438, 5.8942e-5, 1.6558e-9, -3.0045e-12, -5.2983e-16),
+    "early_mars":        (0.3179, 5.4513e-5, 1.5313e-9, -2.7786e-12, -4.8997e-16),
+}
+HZ_CLASSES = ["Outside", "Optimistic HZ", "Conservative HZ"]
+
+CLASSES = [  # (minimum score, label, colour, description), best first
+    (80, "Prime Candidate", "#22C55E", "Excellent conditions for potential life"),
+    (60, "Promising", "#84CC16", "Good habitability potential"),
+    (40, "Moderate", "#EAB308", "Some favorable conditions"),
+    (20, "Challenging", "#F97316", "Harsh but not impossible"),
+    (0, "Hostile", "#EF4444", "Unlikely to support life as we know it"),
+]
+
+Scores = namedtuple("Scores", ["score", "esi", "hz", "hz_inner", "hz_outer", "factors"])
+
+
+# ── Catalogues ──────────────────────────────────────────────────────────────
+def spectral_class(star_temp):
+    """Index into SPECTRAL_CLASSES for each Teff."""
+    return np.digitize(np.asarray(star_temp, float), SPECTRAL_EDGES).astype(float)
+
+
+def from_records(planets):
+    """Catalogue columns from Planet Hunter planet dicts."""
+    def column(key, default=np.nan):
+        return np.array([p.get(key, default) if p.get(key) is not None else default
+                         for p in planets], float)
+
+    period_years = column("orbital_period") / 365.25
+    # Older saved planets carry only a and P: recover M★ from Kepler's third law
+    star_mass = np.where(np.isnan(column("star_mass")),
+                         column("semi_major_axis") ** 3 / period_years ** 2, column("star_mass"))
+    return {
+        "eq_temperature": column("eq_temperature"), "radius": column("radius"),
+        "mass": column("mass"), "orbital_period": column("orbital_period"),
+        "semi_major_axis": column("semi_major_axis"), "star_temp": column("star_temp"),
+        "star_mass": star_mass,
+        "star_class": np.array([SPECTRAL_CLASSES.index(p["star_type"])
+                                if p.get("star_type") in SPECTRAL_CLASSES else np.nan
+                                for p in planets], float),
+    }
+
+
+def from_archive(archive):
+    """Catalogue columns from an exoarchive.Archive (PSCompPars)."""
+    c = archive.columns
+    return {
+        "eq_temperature": np.asarray(c["temp_k"], float), "radius": np.asarray(c["radius_earth"], float),
+        "mass": np.asarray(c["mass_earth"], float), "orbital_period": np.asarray(c["period_days"], float),
+        "semi_major_axis": np.asarray(c["semi_major_au"], float),
+        "star_temp": np.asarray(c["star_teff"], float), "star_mass": np.asarray(c["star_mass"], float),
+        "star_radius": np.asarray(c["star_radius_rsun"], float),
+    }
+
+
+# ── Scoring ─────────────────────────────────────────────────────────────────
+def factor_points(catalog, factors=FACTORS):
+    """(n_factors, n_planets) points, 0 where the input is unknown."""
+    n = len(next(iter(catalog.values())))
+    out = np.zeros((len(factors), n))
+    for k, f in enumerate(factors):
+        if f.field == "star_class":
+            values = spectral_class(catalog["star_temp"])
+            values[np.isnan(catalog["star_temp"])] = np.nan
+            if "star_class" in catalog:
+                values = np.where(np.isnan(catalog["star_class"]), values, catalog["star_class"])
+        else:
+            values = np.asarray(catalog[f.field], float)
+        points = np.asarray(f.points, float)[np.digitize(values, f.edges)]
+        out[k] = np.where(np.isnan(values), 0.0, points)
+    return out
+
+
+def weighted_score(points, weights=None, factors=FACTORS):
+    """Score 0–100 from precomputed `factor_points` (a matrix-vector product)."""
+    w = np.array([(weights or DEFAULT_WEIGHTS).get(f.name, 1.0) for f in factors])
+    best = np.array([max(f.points) for f in factors])
+    return np.minimum(100.0, (w @ points) * 100.0 / max(w @ best, 1e-12))
+
+
+def score(catalog, weights=None, factors=FACTORS):
+    """Weighted habitability score 0–100 per planet (integers with default weights)."""
+    return weighted_score(factor_points(catalog, factors), weights, factors)
+
+
+def esi(catalog):
+    """Earth Similarity Index in [0, 1] (NaN where radius, mass or temperature is unknown)."""
+    r, m = catalog["radius"], catalog["mass"]
+    values = {"radius": r, "density": m / r ** 3, "escape_velocity": np.sqrt(m / r),
+              "eq_temperature": catalog["eq_temperature"]}
+    n = len(ESI_TERMS)
+    out = np.ones(len(r))
+    for field, earth, weight in ESI_TERMS:
+        x = values[field]
+        out *= (1.0 - np.abs(x - earth) / (x + earth)) ** (weight / n)
+    return out
+
+
+def luminosity(catalog):
+    """L★ (L☉): from R★ and Teff when known, else from a piecewise mass–luminosity relation."""
+    m = catalog["star_mass"]
+    from_mass = np.where(m < 0.43, 0.23 * m ** 2.3, np.where(m < 2.0, m ** 4, 1.4 * m ** 3.5))
+    if "star_radius" in catalog:
+        from_radius = catalog["star_radius"] ** 2 * (catalog["star_temp"] / 5772.0) ** 4
+        return np.where(np.isnan(from_radius), from_mass, from_radius)
+    return from_mass
+
+
+def habitable_zone(catalog):
+    """(class index into HZ_CLASSES, conservative inner AU, conservative outer AU) per planet."""
+    t = np.clip(catalog["star_temp"], 2600.0, 7200.0) - 5780.0
+    lum = luminosity(catalog)
+    bounds = {}
+    for name, (s0, a, b, c, d) in HZ_LIMITS.items():
+        s_eff = s0 + a * t + b * t ** 2 + c * t ** 3 + d * t ** 4
+        bounds[name] = np.sqrt(lum / s_eff)
+    a = catalog["semi_major_axis"]
+    with np.errstate(invalid="ignore"):
+        optimistic = (a >= bounds["recent_venus"]) & (a <= bounds["early_mars"])
+        conservative = (a >= bounds["runaway_greenhouse"]) & (a <= bounds["maximum_greenhouse"])
+    return (optimistic.astype(int) + conservative.astype(int),
+            bounds["runaway_greenhouse"], bounds["maximum_greenhouse"])
+
+
+def evaluate(catalog, weights=None):
+    """Score, ESI, HZ class and limits, and per-factor points for a catalogue."""
+    hz, inner, outer = habitable_zone(catalog)
+    return Scores(score(catalog, weights), esi(catalog), hz, inner, outer, factor_points(catalog))
+
+
+def classify(value):
+    """(label, colour, description) for one score."""
+    for minimum, label, colour, description in CLASSES:
+        if value >= minimum:
+            return label, colour, description
+    return CLASSES[-1][1:]
@@ -0,0 +1,229 @@
+"""
+Level-of-detail pyramids for plotting long light curves.
+
+A chart only needs about two points per pixel column: the minimum and
+maximum of the data falling into it (M4-style decimation).  A `Pyramid`
+precomputes that once for a series.  Level 0 bins the x axis at roughly
+the sampling step, and every further level merges pairs of bins.  Each
+level keeps only non-empty bins, with their x centre, min, max, mean
+and count, as sorted arrays.
+
+`Pyramid.window(x0, x1, pixels)` picks the finest level whose bins are
+at least one pixel wide, slices the window out with two `searchsorted`
+calls and returns at most about `pixels` bins.  When the window
+holds few enough raw points, it returns those instead.  Cost depends on
+the pixel width, not on the number of cadences.
+
+Pyramids over time, and over phase for each (period, t0) fold, are
+built once per light curve, saved as .npz under .cache/lod/ and kept in
+a small in-process LRU.  A cache hit never touches the light curve
+itself.  Only time pyramids store the raw points.  A phase pyramid
+stores its levels and folds the time pyramid's points when a window
+first needs them.  The directory is kept under DISK_BYTES by deleting
+the least recently used files.
+"""
+
+import os
+import hashlib
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "lod")
+MEMORY_ENTRIES = 16
+DISK_BYTES = 512 * 1024 * 1024
+
+View = namedtuple("View", ["x", "low", "high", "mean", "level"])
+
+
+class Pyramid:
+    """
+    Min/max/mean pyramid of y(x) over uniform x bins, finest level first.
+    The raw points are either held or fetched on first use from
+    `raw()` → (x, y) sorted by x.
+    """
+
+    def __init__(self, x, y, levels, extent=None, raw=None):
+        self._points = (x, y) if x is not None else None
+        self._raw = raw
+        self.levels = levels            # list of dicts: width, x, low, high, mean, count
+        if extent is None:
+            extent = (float(x[0]), float(x[-1])) if len(x) else (0.0, 0.0)
+        self.extent = extent
+
+    def points(self):
+        """(x, y) raw points, fetched from `raw()` on first use if not held."""
+        if self._points is None:
+            self._points = self._raw()
+        return self._points
+
+    @property
+    def x(self):
+        return self.points()[0]
+
+    @property
+    def y(self):
+        return self.points()[1]
+
+    @property
+    def n_points(self):
+        return int(self.levels[0]["count"].sum())
+
+    @classmethod
+    def build(cls, x, y, base_width=None):
+        order = np.argsort(x, kind="stable")
+        x, y = np.asarray(x, float)[order], np.asarray(y, float)[order]
+        if base_width is None:
+            base_width = float(np.median(np.diff(x))) if len(x) > 1 else 1.0
+        idx = np.floor((x - x[0]) / base_width).astype(np.int64)
+        levels = []
+        width = base_width
+        # Level 0 from the raw points, then pairwise merges of non-empty bins
+        bins, starts = np.unique(idx, return_index=True)
+        low = np.minimum.reduceat(y, starts)
+        high = np.maximum.reduceat(y, starts)
+        total = np.add.reduceat(y, starts)
+        count = np.diff(np.append(starts, len(y)))
+        sum_x = np.add.reduceat(x, starts)
+        while True:
+            levels.append({"width": width, "x": sum_x / count, "low": low, "high": high,
+                           "mean": total / count, "count": count})
+            if len(bins) <= 1:
+                break
+            merged = bins // 2
+            bins, starts = np.unique(merged, return_index=True)
+            low = np.minimum.reduceat(low, starts)
+            high = np.maximum.reduceat(high, starts)
+            total = np.add.reduceat(total, starts)
+            sum_x = np.add.reduceat(sum_x, starts)
+            count = np.add.reduceat(count, starts)
+            width *= 2
+        return cls(x, y, levels)
+
+    def save(self, path, points=True):
+        """Write as .npz; with `points=False` only the levels and extent are stored."""
+        arrays = {"extent": np.array(self.extent)}
+        if points:
+            arrays.update(x=self.x, y=self.y)
+        for k, level in enumerate(self.levels):
+            for name, values in level.items():
+                arrays[f"{k}_{name}"] = np.asarray(values)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, raw=None):
+        """Read a saved pyramid; `raw` supplies the points when they were not stored."""
+        with np.load(path) as data:
+            n = 1 + max(int(key.split("_")[0]) for key in data.files if key[0].isdigit())
+            levels = [{name: (float(data[f"{k}_{name}"]) if name == "width" else data[f"{k}_{name}"])
+                       for name in ("width", "x", "low", "high", "mean", "count")}
+                      for k in range(n)]
+            if "x" in data.files:
+                return cls(data["x"], data["y"], levels)
+            return cls(None, None, levels, tuple(float(v) for v in data["extent"]), raw)
+
+    def window(self, x0=None, x1=None, pixels=1000):
+        """About `pixels` bins at most (or ≤ 2·`pixels` raw points) covering [x0, x1]."""
+        x0 = self.extent[0] if x0 is None else x0
+        x1 = self.extent[1] if x1 is None else x1
+        # Points in the window, counted on level 0 so unheld points stay unloaded
+        base = self.levels[0]
+        lo = np.searchsorted(base["x"], x0, side="left")
+        hi = np.searchsorted(base["x"], x1, side="right")
+        if base["count"][lo:hi].sum() <= 2 * pixels:
+            lo = np.searchsorted(self.x, x0, side="left")
+            hi = np.searchsorted(self.x, x1, side="right")
+            y = self.y[lo:hi]
+            return View(self.x[lo:hi], y, y, y, -1)
+        # Finest level with bins at least one pixel wide
+        target = (x1 - x0) / pixels
+        k = 0
+        while k + 1 < len(self.levels) and self.levels[k]["width"] < target:
+            k += 1
+        level = self.levels[k]
+        lo = np.searchsorted(level["x"], x0, side="left")
+        hi = np.searchsorted(level["x"], x1, side="right")
+        return View(level["x"][lo:hi], level["low"][lo:hi], level["high"][lo:hi],
+                    level["mean"][lo:hi], k)
+
+
+def polyline(view):
+    """(x, y) through each bin's min and max in turn (what an M4 line plot draws)."""
+    x = np.repeat(view.x, 2)
+    y = np.empty(len(x))
+    y[0::2], y[1::2] = view.low, view.high
+    return x, y
+
+
+# ── Cached pyramids ─────────────────────────────────────────────────────────
+_memory = OrderedDict()
+
+
+def _prune(keep):
+    """Delete the least recently used .npz files until the directory fits DISK_BYTES."""
+    files = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith(".npz") and entry.path != keep:
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in files) + os.path.getsize(keep)
+    for _, size, path in sorted(files):
+        if total <= DISK_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass                    # already pruned by another process
+        total -= size
+
+
+def _cached(key, build, raw=None):
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+    path = os.path.join(CACHE_DIR, f"{key}.npz")
+    try:
+        pyramid = Pyramid.load(path, raw)
+        os.utime(path)              # mtime marks recent use for _prune
+    except FileNotFoundError:
+        pyramid = build()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pyramid.save(path, points=raw is None)
+        _prune(path)
+    _memory[key] = pyramid
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+    return pyramid
+
+
+def _key(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+
+def time_pyramid(source, load):
+    """
+    Pyramid of flux over time.  `source` identifies the light curve
+    (e.g. its path and mtime); `load()` → (time, flux) is only called
+    when neither the memory nor the disk cache has it.
+    """
+    return _cached(_key(source, "time"), lambda: Pyramid.build(*load()))
+
+
+def phase_pyramid(source, load, period, t0):
+    """
+    Pyramid of flux over phase [-0.5, 0.5) for one (period, t0) fold.
+    Its raw points are the time pyramid's, folded when first needed.
+    """
+    def fold():
+        series = time_pyramid(source, load)
+        phase = ((series.x - t0) / period + 0.5) % 1.0 - 0.5
+        order = np.argsort(phase, kind="stable")
+        return phase[order], series.y[order]
+
+    def build():
+        phase, flux = fold()
+        pyramid = Pyramid.build(phase, flux, base_width=1.0 / max(1, len(phase)))
+        return Pyramid(None, None, pyramid.levels, pyramid.extent, fold)
+    return _cached(_key(source, "phase", round(period, 8), round(t0, 6)), build, fold)
@@ -0,0 +1,159 @@
+"""
+Atmospheric retrieval from a precomputed template bank ("Pro analysis").
+
+The bank holds, for every temperature of a coarse grid, one
+unit-absorption template per species on the wavelength grid: the
+species' lines as Gaussians of unit optical depth, broadened as √T.  It
+also holds a flat continuum template.  An absorption signal y (e.g.
+excess transit depth in ppm, `fit_absorption`, or the optical
+depth −ln(flux) of a flux spectrum, `retrieve`) is modelled as
+y ≈ Σ aₛ Tₛ(λ; T), so the band strengths aₛ ≥ 0 come from non-negative
+least squares.
+
+  - The bank and its Gram matrices TᵀT are built once, saved as .npy
+    under .cache/ and memory-mapped.  Every session in the process
+    shares one copy, and other processes share the OS page cache.
+  - Fitting projects the spectrum onto every template at every
+    temperature in one matrix product.  Each temperature then needs only
+    an NNLS solve on its small Gram matrix (Lawson–Hanson active set),
+    plus a residual from the same dense products.  A 5000-point
+    spectrum fits in a few milliseconds.
+"""
+
+import os
+import json
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+TEMPERATURES = np.geomspace(100.0, 2500.0, 12)    # K, coarse retrieval grid
+WIDTH_REF, T_REF = 6.5, 300.0                      # nm line σ at T_REF; σ ∝ √T
+WINDOW = 5.0                                        # template lines within ±WINDOW σ
+MIN_FLUX = 1e-3                                     # floor before taking −ln(flux)
+
+Bank = namedtuple("Bank", ["species", "wavelengths", "temperatures", "templates", "gram"])
+Retrieval = namedtuple("Retrieval", ["species", "abundance", "sigma", "temperature",
+                                     "chi2", "chi2_grid", "continuum", "model"])
+
+
+def line_width(temperature):
+    """Gaussian line σ (nm) at `temperature` (thermal broadening, σ ∝ √T)."""
+    return WIDTH_REF * np.sqrt(np.asarray(temperature, float) / T_REF)
+
+
+def _bank_key(database, wavelengths, temperatures):
+    lines = {s: database[s]["wavelengths"] for s in sorted(database)}
+    payload = json.dumps([lines, wavelengths[0], wavelengths[-1], len(wavelengths),
+                          list(temperatures), WIDTH_REF, T_REF, WINDOW])
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _templates(database, species, wavelengths, temperatures):
+    """(n_T, n_species + 1, n_wl) float32: unit-depth line templates + continuum."""
+    out = np.zeros((len(temperatures), len(species) + 1, len(wavelengths)), np.float32)
+    for i, width in enumerate(line_width(temperatures)):
+        for k, s in enumerate(species):
+            for centre in database[s]["wavelengths"]:
+                lo, hi = np.searchsorted(wavelengths, [centre - WINDOW * width,
+                                                       centre + WINDOW * width])
+                x = (wavelengths[lo:hi] - centre) / width
+                out[i, k, lo:hi] += np.exp(-0.5 * x * x)
+        out[i, -1] = 1.0
+    return out
+
+
+_banks = {}             # key → Bank, shared by every session in this process
+
+
+def load_bank(database, wavelengths, temperatures=TEMPERATURES):
+    """Template bank for this line list and grid, built on first use, then memory-mapped."""
+    wavelengths = np.asarray(wavelengths, float)
+    key = _bank_key(database, wavelengths, temperatures)
+    if key in _banks:
+        return _banks[key]
+    species = sorted(database)
+    paths = {name: os.path.join(CACHE_DIR, f"retrieval_{key}_{name}.npy")
+             for name in ("templates", "gram")}
+    if not all(os.path.exists(p) for p in paths.values()):
+        templates = _templates(database, species, wavelengths, temperatures)
+        t64 = templates.astype(np.float64)
+        arrays = {"templates": templates, "gram": np.matmul(t64, t64.transpose(0, 2, 1))}
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for name, path in paths.items():
+            tmp = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp, arrays[name])
+            os.replace(tmp, path)          # atomic: concurrent builders are harmless
+    _banks[key] = Bank(species, wavelengths, np.asarray(temperatures, float),
+                       np.load(paths["templates"], mmap_mode="r"),
+                       np.load(paths["gram"], mmap_mode="r"))
+    return _banks[key]
+
+
+def nnls_gram(gram, rhs, tol=1e-10, max_iter=None):
+    """
+    Lawson–Hanson NNLS in normal-equation form: minimise xᵀGx − 2xᵀb
+    subject to x ≥ 0 (equivalent to ‖Ax − y‖ with G = AᵀA, b = Aᵀy).
+    """
+    n = len(rhs)
+    x = np.zeros(n)
+    passive = np.zeros(n, bool)
+    for _ in range(max_iter or 3 * n):
+        w = rhs - gram @ x
+        if np.all(passive | (w <= tol)):
+            break
+        passive[np.argmax(np.where(passive, -np.inf, w))] = True
+        while True:
+            s = np.zeros(n)
+            idx = np.flatnonzero(passive)
+            s[idx] = np.linalg.lstsq(gram[np.ix_(idx, idx)], rhs[idx], rcond=None)[0]
+            if np.all(s[idx] > tol):
+                x = s
+                break
+            neg = passive & (s <= tol)
+            alpha = np.min(x[neg] / (x[neg] - s[neg]))
+            x = x + alpha * (s - x)
+            passive &= x > tol
+            x[~passive] = 0.0
+    return x
+
+
+def retrieve(wavelengths, flux, database, temperatures=TEMPERATURES):
+    """
+    `fit_absorption` of a flux spectrum in optical depth −ln(flux):
+    abundances are in units of peak optical depth and `model` is a flux.
+    """
+    y = -np.log(np.clip(np.asarray(flux, float), MIN_FLUX, None))
+    fit = fit_absorption(wavelengths, y, database, temperatures)
+    return fit._replace(model=np.exp(-fit.model))
+
+
+def fit_absorption(wavelengths, absorption, database, temperatures=TEMPERATURES):
+    """
+    Best-fitting temperature and non-negative band strengths (in the
+    units of `absorption`, per unit template peak) for one absorption
+    signal.  `sigma` is the 1σ uncertainty of each strength from the
+    residual scatter; `model` is in the units of `absorption`.
+    """
+    bank = load_bank(database, wavelengths, temperatures)
+    y = np.asarray(absorption, float)
+    proj = np.matmul(bank.templates, y.astype(np.float32)).astype(np.float64)  # (n_T, n_s+1)
+    yy = y @ y
+
+    fits = [nnls_gram(np.asarray(g), b) for g, b in zip(bank.gram, proj)]
+    chi2 = np.array([yy - 2 * x @ b + x @ g @ x
+                     for x, g, b in zip(fits, bank.gram, proj)]) / len(y)
+    best = int(np.argmin(chi2))
+    x, gram = fits[best], np.asarray(bank.gram[best])
+
+    active = np.flatnonzero(x > 0)
+    sigma = np.zeros_like(x)
+    if len(active):
+        dof = max(1, len(y) - len(active))
+        var = max(chi2[best], 0.0) * len(y) / dof
+        cov = np.linalg.pinv(gram[np.ix_(active, active)]) * var
+        sigma[active] = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    model = x @ np.asarray(bank.templates[best], np.float64)
+    return Retrieval(bank.species, x[:-1], sigma[:-1], float(bank.temperatures[best]),
+                     float(chi2[best]), chi2, float(x[-1]), model)
@@ -0,0 +1,102 @@
+"""
+Synthetic line-list spectra, plus the wavelength grid and seeding shared
+by the Real Data Discovery spectra (which come from transmission.py).
+
+All lines of all species go into one table (centre, width, depth).
+Each line is evaluated only inside a ±5σ window, found with
+`searchsorted` on the sorted wavelength grid. The log-transmission of
+all windows is accumulated with a single `np.bincount`, so the cost
+scales with the number of lines × window size, not lines × grid. A
+batch of spectra is one more index dimension in the same call.
+
+Every random draw, here and in transmission.py, comes from a
+`numpy.random.Generator` seeded per spectrum. A (seed, atmosphere,
+grid) triple therefore always gives a bit-identical spectrum, alone or
+in a batch, and a saved discovery only needs to store its seed.
+"""
+
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+WINDOW = 5.0                      # evaluate each line within ±WINDOW σ
+WL_MIN, WL_MAX = 300.0, 2500.0    # nm
+N_POINTS = 500
+
+LineTable = namedtuple("LineTable", ["centre", "width", "depth", "species"])
+
+
+def wavelength_grid(n_points=N_POINTS, wl_min=WL_MIN, wl_max=WL_MAX):
+    """Evenly spaced, sorted wavelength grid in nm (up to ~50k points is fine)."""
+    return np.linspace(wl_min, wl_max, n_points)
+
+
+def stable_seed(*parts) -> int:
+    """Seed from strings/numbers that is the same in every process (unlike hash())."""
+    return zlib.crc32("\x1f".join(map(str, parts)).encode())
+
+
+def line_table(atmosphere, database, rng):
+    """
+    Lines of every species in `atmosphere` ({species: fraction}) with
+    wavelengths from `database`; widths and depths drawn from `rng`.
+    """
+    species = [s for s in atmosphere if s in database]
+    centre = np.array([wl for s in species for wl in database[s]["wavelengths"]], float)
+    index = np.repeat(np.arange(len(species)),
+                      [len(database[s]["wavelengths"]) for s in species])
+    fraction = np.array([atmosphere[s] for s in species], float)[index]
+    width = 5.0 + rng.uniform(-2.0, 5.0, len(centre))
+    depth = np.minimum(0.9, fraction * 10.0 + rng.uniform(0.0, 0.3, len(centre)))
+    return LineTable(centre, width, depth, np.array(species, dtype=object)[index])
+
+
+def absorption(wavelengths, tables):
+    """
+    Transmission (n_spectra, n_wavelengths) for a list of line tables:
+    the product of 1 − depth·exp(−x²/2) over each table's lines.
+    """
+    wavelengths = np.asarray(wavelengths, float)
+    n_wl = len(wavelengths)
+    if not tables:
+        return np.ones((0, n_wl))
+    centre = np.concatenate([t.centre for t in tables])
+    width = np.concatenate([t.width for t in tables])
+    depth = np.concatenate([t.depth for t in tables])
+    owner = np.repeat(np.arange(len(tables)), [len(t.centre) for t in tables])
+
+    lo = np.searchsorted(wavelengths, centre - WINDOW * width)
+    hi = np.searchsorted(wavelengths, centre + WINDOW * width, side="right")
+    counts = hi - lo
+    line = np.repeat(np.arange(len(centre)), counts)
+    start = np.repeat(np.cumsum(counts) - counts, counts)
+    pixel = lo[line] + np.arange(counts.sum()) - start
+
+    x = (wavelengths[pixel] - centre[line]) / width[line]
+    log_t = np.log1p(-depth[line] * np.exp(-0.5 * x * x))
+    total = np.bincount(owner[line] * n_wl + pixel, weights=log_t,
+                        minlength=len(tables) * n_wl)
+    return np.exp(total).reshape(len(tables), n_wl)
+
+
+def synthesize(atmospheres, seeds, database, wavelengths=None, noise_level=0.1):
+    """
+    Noisy spectra for a batch of atmospheres, one seed each.
+
+    Returns (wavelengths, spectra) with spectra of shape
+    (len(atmospheres), len(wavelengths)), clipped to [0, 1].
+    """
+    wavelengths = wavelength_grid() if wavelengths is None else np.asarray(wavelengths, float)
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    tables = [line_table(atm, database, rng) for atm, rng in zip(atmospheres, rngs)]
+    spectra = absorption(wavelengths, tables)
+    if noise_level and rngs:
+        spectra += np.stack([rng.normal(0.0, noise_level, len(wavelengths)) for rng in rngs])
+    return wavelengths, np.clip(spectra, 0.0, 1.0)
+
+
+def generate_spectrum(atmosphere, seed, database, wavelengths=None, noise_level=0.1):
+    """Single-spectrum form of `synthesize`: (wavelengths, spectrum)."""
+    wavelengths, spectra = synthesize([atmosphere], [seed], database, wavelengths, noise_level)
+    return wavelengths, spectra[0]
@@ -0,0 +1,30 @@
+import numpy as np
+
+import spectra
+
+DATABASE = {"Na": {"wavelengths": [589.0, 589.6]},
+            "H2O": {"wavelengths": [720.0, 820.0, 940.0, 1130.0, 1380.0, 1870.0]},
+            "CH4": {"wavelengths": [890.0, 1160.0, 1660.0, 2300.0]}}
+ATMOSPHERES = [{"Na": 0.01, "H2O": 0.05}, {"CH4": 0.02, "H2O": 0.01}, {"Na": 0.03}]
+
+
+def test_windowed_lines_match_full_evaluation():
+    wavelengths = spectra.wavelength_grid(50_000)
+    table = spectra.line_table(ATMOSPHERES[0], DATABASE, np.random.default_rng(3))
+    x = (wavelengths[None, :] - table.centre[:, None]) / table.width[:, None]
+    full = np.prod(1.0 - table.depth[:, None] * np.exp(-0.5 * x * x), axis=0)
+    windowed = spectra.absorption(wavelengths, [table])[0]
+    assert np.max(np.abs(windowed - full)) < 1e-5
+
+
+def test_batch_is_bit_identical_to_single_spectra():
+    seeds = [spectra.stable_seed("Kepler-22b", i) for i in range(len(ATMOSPHERES))]
+    _, batch = spectra.synthesize(ATMOSPHERES, seeds, DATABASE)
+    for atmosphere, seed, row in zip(ATMOSPHERES, seeds, batch):
+        _, single = spectra.generate_spectrum(atmosphere, seed, DATABASE)
+        assert np.array_equal(single, row)
+
+
+def test_empty_batch():
+    wavelengths, batch = spectra.synthesize([], [], DATABASE)
+    assert batch.shape == (0, len(wavelengths))
@@ -0,0 +1,142 @@
+"""
+Simulated transit light curves for Planet Hunter discoveries.
+
+The model is the same physics as python-animations/transit_model.py,
+kept here because the app is deployed on its own:
+  - exact star/planet disc overlap, weighted by quadratic limb darkening
+    at the planet centre
+  - depth from the radius ratio k = Rp/R★ (R★ from a main-sequence
+    mass–radius relation)
+  - duration T₁₄ from the period and stellar mass (Kepler's third law,
+    circular orbit, impact parameter drawn per planet)
+  - white noise from the host's apparent bolometric magnitude: photon
+    noise scaled from 60 ppm/30 min at m = 10 plus a 20 ppm floor
+
+Every curve has the same shape: N_POINTS samples across ±WINDOW
+durations of mid-transit.  A collection is therefore one
+(n_planets, N_POINTS) broadcast.  Results are cached per planet id in a
+bounded in-process LRU, shared by every session thread under a lock
+(simulation runs outside it).  Each rerun computes only planets not
+seen before, in one batch, and a given planet always gets the same
+noise.
+"""
+
+import zlib
+import threading
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+
+import habitability
+
+U1, U2 = 0.40, 0.26             # quadratic limb darkening (solar-type)
+N_POINTS = 400
+WINDOW = 1.5                    # half-width of the curve, in transit durations
+R_EARTH_RSUN = 1.0 / 109.1
+AU_RSUN = 215.03
+LY_TO_PC = 1.0 / 3.26156
+CACHE_ENTRIES = 4096
+
+Curve = namedtuple("Curve", ["hours", "flux", "depth_ppm", "duration_h", "noise_ppm",
+                             "magnitude", "impact"])
+
+
+def circle_overlap(d, r1, r2):
+    """Area of intersection of two circles with radii r1, r2 separated by d."""
+    d, r1, r2 = np.broadcast_arrays(np.asarray(d, float), np.asarray(r1, float),
+                                    np.asarray(r2, float))
+    cos_a = np.clip((r1 ** 2 + d ** 2 - r2 ** 2) / (2 * r1 * d + 1e-14), -1, 1)
+    cos_b = np.clip((r2 ** 2 + d ** 2 - r1 ** 2) / (2 * r2 * d + 1e-14), -1, 1)
+    a, b = np.arccos(cos_a), np.arccos(cos_b)
+    lens = r1 ** 2 * (a - np.sin(a) * np.cos(a)) + r2 ** 2 * (b - np.sin(b) * np.cos(b))
+    rmin = np.minimum(r1, r2)
+    area = np.where(d + rmin <= np.maximum(r1, r2), np.pi * rmin ** 2, lens)
+    return np.where(d >= r1 + r2, 0.0, area)
+
+
+def transit_model(time, period, t0, duration, k, b=0.0, u1=U1, u2=U2):
+    """
+    Relative flux of a periodic transit.  Parameters broadcast against
+    `time`: pass (n, 1) columns with a (m,) time axis for a batch.
+    """
+    dt = np.mod(time - t0 + 0.5 * period, period) - 0.5 * period
+    half_chord = np.sqrt(np.maximum((1.0 + k) ** 2 - b ** 2, 1e-12))
+    d = np.hypot(dt / (0.5 * duration) * half_chord, b)
+    mu = np.sqrt(np.maximum(0.0, 1.0 - np.minimum(d, 1.0 - 1e-6) ** 2))
+    local = 1.0 - u1 * (1.0 - mu) - u2 * (1.0 - mu) ** 2
+    drop = circle_overlap(d, 1.0, k) / np.pi * local / (1.0 - u1 / 3.0 - u2 / 6.0)
+    return np.maximum(0.0, 1.0 - drop)
+
+
+def star_radius(mass):
+    """Main-sequence radius (R☉) from mass (M☉)."""
+    mass = np.asarray(mass, float)
+    return np.where(mass <= 1.0, mass ** 0.8, mass ** 0.57)
+
+
+def transit_duration(period, a_rsun, k, b):
+    """First-to-fourth contact time (units of `period`) for a circular orbit."""
+    chord = np.sqrt(np.maximum((1.0 + k) ** 2 - b ** 2, 0.0)) / a_rsun
+    return period / np.pi * np.arcsin(np.minimum(1.0, chord))
+
+
+def noise_ppm(magnitude):
+    """Per-point white noise (ppm) for an apparent magnitude."""
+    return np.hypot(60.0 * 10 ** (0.2 * (magnitude - 10.0)), 20.0)
+
+
+def planet_id(planet):
+    """Cache key: name plus the parameters the curve depends on."""
+    return (planet["name"], planet["radius"], planet["orbital_period"],
+            planet.get("star_mass"), planet.get("semi_major_axis"), planet["distance_ly"])
+
+
+def simulate(planets):
+    """Curves for a batch of Planet Hunter planet dicts (no caching)."""
+    catalog = habitability.from_records(planets)
+    period = catalog["orbital_period"][:, None]
+    mass = catalog["star_mass"]
+    r_star = star_radius(mass)
+    k = catalog["radius"] * R_EARTH_RSUN / r_star
+    a_rsun = (mass * (catalog["orbital_period"] / 365.25) ** 2) ** (1 / 3) * AU_RSUN / r_star
+    seeds = [zlib.crc32(repr(planet_id(p)).encode()) for p in planets]
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    b = np.array([rng.uniform(0.0, 0.9) for rng in rngs])
+    duration = transit_duration(period[:, 0], a_rsun, k, b)
+
+    distance_pc = np.array([p["distance_ly"] for p in planets], float) * LY_TO_PC
+    magnitude = 4.74 - 2.5 * np.log10(habitability.luminosity(catalog)) + 5 * np.log10(distance_pc / 10.0)
+    sigma = noise_ppm(magnitude) * 1e-6
+
+    x = np.linspace(-WINDOW, WINDOW, N_POINTS)
+    time = x[None, :] * duration[:, None]                       # days from mid-transit
+    flux = transit_model(time, period, 0.0, duration[:, None], k[:, None], b[:, None])
+    flux += np.stack([rng.normal(0.0, 1.0, N_POINTS) for rng in rngs]) * sigma[:, None]
+    depth = (1.0 - transit_model(0.0, period[:, 0], 0.0, duration, k, b)) * 1e6
+    return [Curve((time[i] * 24.0).astype(np.float32), flux[i].astype(np.float32), float(depth[i]),
+                  float(duration[i] * 24.0), float(sigma[i] * 1e6), float(magnitude[i]), float(b[i]))
+            for i in range(len(planets))]
+
+
+_curves = OrderedDict()         # planet_id → Curve, shared by every session in this process
+_lock = threading.Lock()
+
+
+def light_curves(planets):
+    """Curves for `planets`, computing only the ones not cached yet (in one batch)."""
+    keys = [planet_id(p) for p in planets]
+    found = {}
+    with _lock:
+        for key in keys:
+            if key in _curves:
+                _curves.move_to_end(key)
+                found[key] = _curves[key]
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if missing:
+        computed = simulate([planets[i] for i in missing])
+        with _lock:
+            for i, curve in zip(missing, computed):
+                found[keys[i]] = _curves[keys[i]] = curve
+            while len(_curves) > max(CACHE_ENTRIES, len(keys)):
+                _curves.popitem(last=False)
+    return [found[key] for key in keys]
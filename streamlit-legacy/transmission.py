@@ -0,0 +1,282 @@
+"""
+Transmission spectra of exoplanet atmospheres from first principles.
+
+Transit depth vs. wavelength comes from an isothermal, layered
+atmosphere above the planet's 1-bar radius R₀:
+
+    H = k T / (μ m_u g)                        scale height
+    τ(z, λ) = σ_mix(λ) n₀ e^(−z/H) √(2π R₀ H)    slant optical depth
+    R_eff² = R₀² + 2 ∫ (R₀ + z)(1 − e^(−τ)) dz   depth = (R_eff / R★)²
+
+σ_mix(λ) = Σ χₛ σₛ(λ, T) + Rayleigh.  It is evaluated over all layers
+and wavelengths as one array, for CHUNK planets at a time, so the whole
+catalogue takes a few milliseconds and memory stays bounded for any
+batch size.
+
+Cross sections σₛ(λ, T) come from a local table (`data/cross_sections.npz`:
+species, wavelength [nm], temperature [K], sigma [cm²] of shape
+(n_species, n_T, n_wl), e.g. extracted from ExoMol/HITRAN).  Without one,
+an approximate table is built from the app's line list and cached.
+Interpolation onto (T, output grid) is cached per temperature.
+
+Observed spectra add seeded white noise in ppm of transit depth.  The
+observation is planned to resolve the features: the per-point noise is
+the feature amplitude / TARGET_SNR, down to a NOISE_FLOOR_PPM
+systematics floor.  Reaching it takes `n_transits` stacked transits,
+each with `noise_ppm` of photon noise scaled from the host's apparent
+magnitude (estimated from its radius and distance when the candidate
+does not give one, `host_magnitude`).  Small planets around faint hosts
+therefore cost thousands of transits.
+"""
+
+import os
+import json
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+
+import habitability
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cross_sections.npz")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+K_B = 1.380649e-23          # J/K
+M_U = 1.66053907e-27        # kg
+G_NEWTON = 6.674e-11        # m³/(kg s²)
+R_EARTH = 6.371e6           # m
+M_EARTH = 5.972e24          # kg
+R_SUN = 6.957e8             # m
+P_REF = 1.0e5               # Pa at R₀
+
+N_LAYERS = 96
+TOP = 30.0                  # atmosphere top, in scale heights
+RAYLEIGH_500 = 1.0e-26      # cm² per molecule at 500 nm (∝ λ⁻⁴)
+WIDTH_REF, T_REF = 6.5, 300.0                  # band σ (nm) at T_REF, σ ∝ √T
+TABLE_TEMPERATURES = (100.0, 200.0, 400.0, 800.0, 1600.0, 3200.0)
+PRECISION_PPM = 60.0        # per-point depth noise of one transit, host at magnitude 10
+NOISE_FLOOR_PPM = 0.1       # systematics floor of the stacked spectrum
+TARGET_SNR = 32.0           # feature amplitude / per-point noise the observation aims for
+LY_TO_PC = 1.0 / 3.26156
+CHUNK = 64                  # planets per (planet, layer, wavelength) block
+
+# Bulk molar masses (g/mol); atomic hydrogen in an envelope is H₂
+MOLAR_MASS = {"H": 2.016, "He": 4.003, "H2O": 18.015, "CH4": 16.04, "CO2": 44.01,
+              "O2": 32.00, "O3": 48.00, "N2": 28.01, "Na": 22.99, "K": 39.10,
+              "Fe": 55.85, "Ti": 47.87, "V": 50.94, "NH3": 17.03, "CO": 28.01,
+              "SiO": 44.08}
+# Peak band cross sections (cm²) for the line-list table at T_REF
+BAND_STRENGTH = {"Na": 1e-19, "K": 1e-19, "Fe": 1e-20, "Ti": 1e-20, "V": 1e-20,
+                 "H": 1e-23, "He": 1e-24}
+DEFAULT_STRENGTH = 1e-21
+
+Spectrum = namedtuple("Spectrum", ["wavelengths", "depth", "observed_ppm", "absorption",
+                                   "noise_ppm", "n_transits", "scale_height_km", "mu",
+                                   "gravity", "amplitude_ppm"])
+
+
+def line_width(temperature):
+    """Gaussian band σ (nm) at `temperature` (thermal broadening, σ ∝ √T)."""
+    return WIDTH_REF * np.sqrt(np.asarray(temperature, float) / T_REF)
+
+
+# ── Cross sections ──────────────────────────────────────────────────────────
+class CrossSections:
+    """σₛ(λ, T) table with cached interpolation per (temperature, grid)."""
+
+    def __init__(self, species, wavelengths, temperatures, sigma):
+        self.species = list(species)
+        self.wavelengths = np.asarray(wavelengths, float)
+        self.temperatures = np.asarray(temperatures, float)
+        self.log_sigma = np.log(np.maximum(np.asarray(sigma, float), 1e-60))
+        self._cache = {}
+
+    @classmethod
+    def from_file(cls, path=DATA_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["species"].tolist(), data["wavelength"],
+                       data["temperature"], data["sigma"])
+
+    @classmethod
+    def from_line_list(cls, database, temperatures=TABLE_TEMPERATURES,
+                       wavelengths=np.arange(250.0, 5000.0, 1.0)):
+        """Approximate table: each catalogued line as a √T-broadened Gaussian band."""
+        species = sorted(database)
+        sigma = np.zeros((len(species), len(temperatures), len(wavelengths)))
+        for j, T in enumerate(temperatures):
+            width = float(line_width(T))
+            scale = WIDTH_REF / width            # constant band-integrated strength
+            for i, s in enumerate(species):
+                centres = np.asarray(database[s]["wavelengths"], float)
+                x = (wavelengths[None, :] - centres[:, None]) / width
+                sigma[i, j] = BAND_STRENGTH.get(s, DEFAULT_STRENGTH) * scale * \
+                    np.exp(-0.5 * x * x).sum(axis=0)
+        return cls(species, wavelengths, temperatures, sigma)
+
+    @classmethod
+    def load(cls, database, path=DATA_PATH):
+        """
+        The local table if present, else the line-list table (saved under
+        .cache/).  Either is loaded once per process, so the per-temperature
+        interpolation cache survives Streamlit reruns.
+        """
+        if path in _tables:
+            return _tables[path]
+        if os.path.exists(path):
+            _tables[path] = cls.from_file(path)
+            return _tables[path]
+        lines = {s: database[s]["wavelengths"] for s in sorted(database)}
+        key = hashlib.sha1(json.dumps([lines, TABLE_TEMPERATURES, WIDTH_REF, T_REF,
+                                       BAND_STRENGTH, DEFAULT_STRENGTH]).encode()).hexdigest()[:16]
+        cached = os.path.join(CACHE_DIR, f"cross_sections_{key}.npz")
+        if cached in _tables:
+            return _tables[cached]
+        if not os.path.exists(cached):
+            table = cls.from_line_list(database)
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = f"{cached}.{os.getpid()}.tmp.npz"
+            np.savez(tmp, species=np.array(table.species), wavelength=table.wavelengths,
+                     temperature=table.temperatures, sigma=np.exp(table.log_sigma))
+            os.replace(tmp, cached)          # atomic: concurrent builders are harmless
+        _tables[cached] = cls.from_file(cached)
+        return _tables[cached]
+
+    def at(self, temperature, wavelengths):
+        """(n_species, n_wl) cross sections at `temperature` on `wavelengths`."""
+        wavelengths = np.asarray(wavelengths, float)
+        key = (round(float(temperature)), len(wavelengths), wavelengths[0], wavelengths[-1])
+        if key not in self._cache:
+            # Linear in log σ and log T between table temperatures (clamped)
+            logT = np.log(np.clip(temperature, self.temperatures[0], self.temperatures[-1]))
+            nodes = np.log(self.temperatures)
+            j = int(np.clip(np.searchsorted(nodes, logT) - 1, 0, len(nodes) - 2))
+            w = (logT - nodes[j]) / (nodes[j + 1] - nodes[j])
+            log_sigma = (1 - w) * self.log_sigma[:, j] + w * self.log_sigma[:, j + 1]
+            self._cache[key] = np.exp(np.stack(
+                [np.interp(wavelengths, self.wavelengths, row) for row in log_sigma]))
+        return self._cache[key]
+
+
+_tables = {}            # path → CrossSections, shared by every session in this process
+
+
+# ── Bulk properties ─────────────────────────────────────────────────────────
+def mass_from_radius(radius_earth):
+    """Chen & Kipping (2017) mass (M⊕) for planets without a measured mass."""
+    r = np.asarray(radius_earth, float)
+    return np.where(r < 1.23, r ** (1 / 0.279),
+                    1.23 ** (1 / 0.279) * (r / 1.23) ** (1 / 0.589))
+
+
+def mean_molecular_weight(atmosphere):
+    """μ (g/mol) of a {species: fraction} atmosphere (fractions renormalised)."""
+    total = sum(atmosphere.values())
+    if total <= 0:
+        return MOLAR_MASS["N2"]
+    return sum(f * MOLAR_MASS.get(s, MOLAR_MASS["N2"]) for s, f in atmosphere.items()) / total
+
+
+def planet_properties(planet):
+    """(R₀ [m], g [m/s²], R★ [m]) from a candidate dict."""
+    radius = planet["radius_earth"] * R_EARTH
+    mass = planet.get("mass_earth") or float(mass_from_radius(planet["radius_earth"]))
+    gravity = G_NEWTON * mass * M_EARTH / radius ** 2
+    return radius, gravity, planet["star_radius_rsun"] * R_SUN
+
+
+def host_magnitude(planet):
+    """
+    Apparent bolometric magnitude of the host: `star_mag` if given, else
+    from a main-sequence mass (inverting R★ = M^0.8, or M^0.57 above
+    1 M☉), its luminosity and the distance.
+    """
+    if planet.get("star_mag") is not None:
+        return float(planet["star_mag"])
+    r = planet["star_radius_rsun"]
+    mass = r ** (1 / 0.8) if r <= 1.0 else r ** (1 / 0.57)
+    lum = float(habitability.luminosity({"star_mass": np.array([mass])})[0])
+    distance_pc = planet["distance_ly"] * LY_TO_PC
+    return 4.74 - 2.5 * np.log10(lum) + 5 * np.log10(distance_pc / 10.0)
+
+
+def noise_ppm(magnitude):
+    """Per-point transit-depth noise (ppm) of one transit: photon noise scaled from magnitude 10."""
+    return PRECISION_PPM * 10 ** (0.2 * (np.asarray(magnitude, float) - 10.0))
+
+
+def observing_noise(amplitude_ppm, single_ppm):
+    """
+    (per-point noise in ppm, transits stacked) for features of
+    `amplitude_ppm` observed to TARGET_SNR, with `single_ppm` per transit.
+    """
+    sigma = np.maximum(np.asarray(amplitude_ppm, float) / TARGET_SNR, NOISE_FLOOR_PPM)
+    n_transits = np.maximum(1, np.ceil((np.asarray(single_ppm, float) / sigma) ** 2))
+    return np.minimum(sigma, single_ppm), n_transits.astype(np.int64)
+
+
+# ── Spectra ─────────────────────────────────────────────────────────────────
+def transit_depth(planets, atmospheres, wavelengths, xsec):
+    """
+    Transit depth (n_planets, n_wl) and scale heights (m), μ and g for a
+    batch of planets with their atmospheres.
+    """
+    wavelengths = np.asarray(wavelengths, float)
+    n = len(planets)
+    R0, g, Rs, H, mu, n0 = (np.empty(n) for _ in range(6))
+    sigma_mix = np.empty((n, len(wavelengths)))
+    rayleigh = RAYLEIGH_500 * (wavelengths / 500.0) ** -4
+    for p, (planet, atmosphere) in enumerate(zip(planets, atmospheres)):
+        T = planet["temp_k"]
+        R0[p], g[p], Rs[p] = planet_properties(planet)
+        mu[p] = mean_molecular_weight(atmosphere)
+        H[p] = K_B * T / (mu[p] * M_U * g[p])
+        n0[p] = P_REF / (K_B * T) * 1e-6                  # cm⁻³
+        total = sum(atmosphere.values()) or 1.0
+        chi = np.array([atmosphere.get(s, 0.0) / total for s in xsec.species])
+        sigma_mix[p] = chi @ xsec.at(T, wavelengths) + rayleigh
+
+    # Layers z = s·H, s ∈ [0, TOP]; (planet, layer, wavelength) blocks of CHUNK planets
+    s = np.linspace(0.0, TOP, N_LAYERS)
+    integral = np.empty((n, len(wavelengths)))
+    for lo in range(0, n, CHUNK):
+        hi = min(n, lo + CHUNK)
+        z = H[lo:hi, None] * s[None, :]                                       # m
+        column = n0[lo:hi, None] * np.exp(-s)[None, :] * \
+            np.sqrt(2 * np.pi * (R0[lo:hi, None] + z) * H[lo:hi, None]) * 100.0  # cm⁻²
+        tau = column[:, :, None] * sigma_mix[lo:hi, None, :]
+        absorbed = (R0[lo:hi, None] + z)[:, :, None] * -np.expm1(-tau)
+        dz = H[lo:hi] * (s[1] - s[0])
+        integral[lo:hi] = dz[:, None] * (absorbed[:, 1:].sum(axis=1) +
+                                         absorbed[:, :-1].sum(axis=1)) / 2
+    depth = (R0[:, None] ** 2 + 2 * integral) / Rs[:, None] ** 2
+    return depth, H, mu, g
+
+
+def spectra_for(planets, atmospheres, seeds, wavelengths, xsec, noise_level=1.0):
+    """
+    Observed spectra for a batch of planets.  `observed_ppm` is the
+    model depth plus seeded Gaussian noise of `noise_ppm` per point, from
+    `n_transits` stacked transits (× `noise_level`; 0 gives the
+    noiseless model).  `absorption` is the observed depth above the
+    model's lowest depth, in ppm: the signal for line finding and
+    retrieval.
+    """
+    wavelengths = np.asarray(wavelengths, float)
+    depth, H, mu, g = transit_depth(planets, atmospheres, wavelengths, xsec)
+    amplitude = (depth.max(axis=1) - depth.min(axis=1)) * 1e6
+    single = noise_ppm([host_magnitude(p) for p in planets])
+    sigma, n_transits = observing_noise(amplitude, single)
+    sigma = sigma * noise_level
+    observed = depth * 1e6
+    if noise_level:
+        observed = observed + sigma[:, None] * np.stack(
+            [np.random.default_rng(seed).normal(0.0, 1.0, len(wavelengths)) for seed in seeds])
+    absorption = observed - depth.min(axis=1, keepdims=True) * 1e6
+    return [Spectrum(wavelengths, depth[i], observed[i], absorption[i], sigma[i],
+                     int(n_transits[i]), H[i] / 1e3, mu[i], g[i], amplitude[i])
+            for i in range(len(planets))]
+
+
+def spectrum_for(planet, atmosphere, seed, wavelengths, xsec, noise_level=1.0):
+    """Single-planet form of `spectra_for`."""
+    return spectra_for([planet], [atmosphere], [seed], wavelengths, xsec, noise_level)[0]